@@ -15,6 +15,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import dj_database_url
+from celery.schedules import crontab
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
@@ -45,6 +46,7 @@ ALLOWED_HOSTS = ["*"]
 # Application definition
 
 INSTALLED_APPS = [
+    "daphne",
     "django_light",
     "django.contrib.admin",
     "django.contrib.auth",
@@ -53,6 +55,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
     # third party apps
     "rest_framework",
     "rest_framework.authtoken",
@@ -108,12 +111,55 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Under ASGI each request runs in a new thread with its own connection,
+# so persistent connections are never reused and pile up until they
+# expire (Django ticket #33497). ASGI servers close them after each
+# request by default, a transaction pooler (DATABASE_POOLER) keeps the
+# server connections open instead.
+DEFAULT_CONN_MAX_AGE = (
+    0 if os.environ.get("SERVER_MODE", "asgi") == "asgi" else 60
+)
+
 DATABASES = {
     "default": dj_database_url.config(
-        default=os.getenv("DATABASE_URL"), test_options={"NAME": "mytestdb"}
+        default=os.getenv("DATABASE_URL"),
+        # connections are kept open and reused by the following requests
+        conn_max_age=int(
+            os.environ.get("DATABASE_CONN_MAX_AGE", DEFAULT_CONN_MAX_AGE)
+        ),
+        conn_health_checks=True,
+        test_options={"NAME": "mytestdb"},
     )
 }
+# A transaction pooler (e.g. PgBouncer in transaction mode) can hand out
+# a different server connection to each transaction,
+# so the server-side cursors of QuerySet.iterator() cannot be used.
+if os.environ.get("DATABASE_POOLER") == "True":
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+# The local memory cache is only meant for development and tests, as it is
+# not shared between processes. Production servers require CACHE_URL.
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+if os.environ.get("CACHE_URL"):
+    # a per-process LRU in front of the cache shared by all processes,
+    # entries changed by the other processes are seen after LOCAL_TIMEOUT
+    CACHES = {
+        "default": {
+            "BACKEND": "core.cache.TwoTierCache",
+            "LOCATION": "shared",
+            "OPTIONS": {"LOCAL_TIMEOUT": 5, "LOCAL_MAX_ENTRIES": 1000},
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["CACHE_URL"],
+        },
+    }
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -172,6 +218,7 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACLIST_AFTER_ROTATION": True,
+    "TOKEN_OBTAIN_SERIALIZER": "core.authentication.TokenClaimsSerializer",
 }
 
 # dj-rest-auth
@@ -181,6 +228,7 @@ REST_AUTH = {
     "JWT_AUTH_COOKIE": "access_token_social_events",
     "JWT_AUTH_REFRESH_COOKIE": "refresh_token_social_events",
     "OLD_PASSWORD_FIELD_ENABLED": True,
+    "JWT_TOKEN_CLAIMS_SERIALIZER": "core.authentication.TokenClaimsSerializer",
 }
 
 # django-allauth
@@ -216,9 +264,43 @@ AUTHENTICATION_BACKENDS = [
 
 AUTH_USER_MODEL = "users.User"
 
+# Channels settings
+ASGI_APPLICATION = "config.asgi.application"
+CHANNEL_LAYERS = {
+    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"},
+}
+if os.environ.get("CHANNEL_LAYER_URL"):
+    # the in-memory layer does not reach other processes
+    CHANNEL_LAYERS["default"] = {
+        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "CONFIG": {"hosts": [os.environ["CHANNEL_LAYER_URL"]]},
+    }
+
+# The in-memory user autocomplete index is rebuilt at least this often (seconds)
+USERS_AUTOCOMPLETE_INDEX_TTL = 60
+# Cached friend lists are dropped on changes, the timeout only bounds memory
+USERS_FRIENDS_CACHE_TIMEOUT = 60 * 60
+# Cached group and thread memberships are dropped on changes as well
+PERMISSION_CONTEXT_CACHE_TIMEOUT = 60 * 60
+# Authorization data is only cached in the cache shared by all processes,
+# without one the memberships are loaded on each request
+PERMISSION_CONTEXT_CACHE = "shared" if "shared" in CACHES else None
+# Deactivated users are dropped too, but other processes may keep their
+# local copies (see core.cache.TwoTierCache) until the timeout
+USER_ACTIVE_CACHE_TIMEOUT = 60
+
 # Celery settings
-CELERY_BROKER_URL = os.environ.get("BOKER_URL")
+CELERY_BROKER_URL = os.environ.get("BROKER_URL")
 CELERY_TIMEZONE = "Europe/Warsaw"
+CELERY_BEAT_SCHEDULE = {
+    "extend-event-occurrences": {
+        "task": "events.tasks.extend_event_occurrences",
+        "schedule": crontab(minute=0, hour=3),
+    },
+}
+
+# Recurring events are expanded into occurrences up to this far in the future
+EVENT_OCCURRENCES_HORIZON = timedelta(days=365)
 
 if DEBUG:
     # debug_toolbar
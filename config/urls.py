@@ -38,12 +38,15 @@ from drf_spectacular.views import (
 )
 from rest_framework_simplejwt.views import TokenVerifyView
 
+from core.views import CacheStatsView
+
 urlpatterns = [
     # apps endpoints
     path("users/", include("users.urls")),
     path("admin/", admin.site.urls),
     path("events/", include("events.urls")),
     path("messagebox/", include("messagebox.urls")),
+    path("cache-stats/", CacheStatsView.as_view(), name="cache-stats"),
     # swagger endpoints
     path("schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -0,0 +1,15 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # cached entries are keyed by ids, which are reused between tests
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def permission_context_cache(settings):
+    # the tests run in a single process, which shares its local memory cache
+    settings.PERMISSION_CONTEXT_CACHE = "default"
@@ -0,0 +1,102 @@
+"""
+Stateless JWT authentication.
+
+The access tokens carry the username and an is_active snapshot of
+their user, so endpoints which only need the id of the current user
+can authenticate requests without fetching the user row. Revoked
+(deactivated) users are rejected after a short-lived cached check.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from users.models import User
+
+CLAIM_FIELDS = ("username", "is_active")
+
+
+class TokenClaimsSerializer(TokenObtainPairSerializer):
+    """Adds the fields read by StatelessJWTAuthentication to the tokens."""
+
+    @classmethod
+    def get_token(cls, user: User) -> Token:
+        token = super().get_token(user)
+        for name in CLAIM_FIELDS:
+            token[name] = getattr(user, name)
+        return token
+
+
+def user_active_cache_key(user_id: int) -> str:
+    return f"users:{user_id}:is_active"
+
+
+def is_user_active(user_id: int) -> bool:
+    key = user_active_cache_key(user_id)
+    is_active = cache.get(key)
+    if is_active is None:
+        is_active = User.objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(key, is_active, settings.USER_ACTIVE_CACHE_TIMEOUT)
+    return is_active
+
+
+def invalidate_user_active(user_id: int) -> None:
+    cache.delete(user_active_cache_key(user_id))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Authenticates the user of an access token without a database query.
+
+    The user is built from the token claims, with the other fields
+    deferred, so they are only fetched when accessed. Unlike TokenUser,
+    it is a User instance, which can be used in queries and compared
+    with the loaded users.
+    """
+
+    def get_user(self, validated_token: Token) -> User:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        if not (
+            validated_token.get("is_active", True) and is_user_active(user_id)
+        ):
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        # tokens issued before the claims were added only have the id
+        claims = {
+            name: validated_token[name]
+            for name in CLAIM_FIELDS
+            if name in validated_token
+        }
+        claims[api_settings.USER_ID_FIELD] = user_id
+        # from_db expects the values in the order of the model fields
+        field_names = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if field.attname in claims
+        ]
+        return User.from_db(
+            router.db_for_read(User),
+            field_names,
+            [claims[name] for name in field_names],
+        )
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    # documents the endpoints with the same scheme as JWTAuthentication
+    target_class = StatelessJWTAuthentication
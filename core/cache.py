@@ -0,0 +1,163 @@
+"""
+Two-tier cache backend and versioned cache namespaces.
+
+TwoTierCache keeps a small per-process LRU (a local-memory cache) in front
+of a shared cache, e.g. Redis. Entries read from the shared tier are kept
+locally for at most LOCAL_TIMEOUT seconds, so changes made by the other
+processes are seen after that time at the latest.
+
+    CACHES = {
+        "default": {
+            "BACKEND": "core.cache.TwoTierCache",
+            "LOCATION": "shared",  # alias of the shared cache
+            "OPTIONS": {"LOCAL_TIMEOUT": 5, "LOCAL_MAX_ENTRIES": 1000},
+        },
+        "shared": {...},
+    }
+
+Cached data, which depends on many rows, is invalidated by bumping
+the version of its namespace (see bump_version) instead of deleting
+every key which might be affected.
+"""
+
+import time
+from collections import Counter
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location: str, params: dict) -> None:
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.shared_alias = location
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self.local = LocMemCache(
+            f"two-tier-{location}",
+            {
+                "TIMEOUT": self.local_timeout,
+                "OPTIONS": {
+                    "MAX_ENTRIES": options.get("LOCAL_MAX_ENTRIES", 1000)
+                },
+            },
+        )
+        # counted per process
+        self.stats = Counter(local_hits=0, shared_hits=0, misses=0)
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self.shared_alias]
+
+    def get_local_timeout(self, timeout=DEFAULT_TIMEOUT):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def get(self, key, default=None, version=None):
+        missing = object()
+        value = self.local.get(key, missing, version=version)
+        if value is not missing:
+            self.stats["local_hits"] += 1
+            return value
+        value = self.shared.get(key, missing, version=version)
+        if value is missing:
+            self.stats["misses"] += 1
+            return default
+        self.stats["shared_hits"] += 1
+        self.local.set(key, value, self.local_timeout, version=version)
+        return value
+
+    def get_many(self, keys, version=None) -> dict:
+        values = self.local.get_many(keys, version=version)
+        self.stats["local_hits"] += len(values)
+        missing_keys = [key for key in keys if key not in values]
+        if missing_keys:
+            shared_values = self.shared.get_many(missing_keys, version=version)
+            self.stats["shared_hits"] += len(shared_values)
+            self.stats["misses"] += len(missing_keys) - len(shared_values)
+            self.local.set_many(
+                shared_values, self.local_timeout, version=version
+            )
+            values.update(shared_values)
+        return values
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self.local.set(
+            key, value, self.get_local_timeout(timeout), version=version
+        )
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None) -> list:
+        failed_keys = self.shared.set_many(data, timeout, version=version)
+        self.local.set_many(
+            data, self.get_local_timeout(timeout), version=version
+        )
+        return failed_keys
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None) -> bool:
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self.local.set(
+                key, value, self.get_local_timeout(timeout), version=version
+            )
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None) -> bool:
+        self.local.touch(key, self.get_local_timeout(timeout), version=version)
+        return self.shared.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None) -> int:
+        self.local.delete(key, version=version)
+        return self.shared.incr(key, delta, version=version)
+
+    def delete(self, key, version=None) -> bool:
+        self.local.delete(key, version=version)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None) -> None:
+        self.local.delete_many(keys, version=version)
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None) -> bool:
+        return self.local.has_key(key, version=version) or self.shared.has_key(
+            key, version=version
+        )
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs) -> None:
+        self.shared.close(**kwargs)
+
+
+def version_cache_key(namespace: str) -> str:
+    return f"{namespace}:version"
+
+
+def get_versions(
+    namespaces: list[str], using: BaseCache | None = None
+) -> list[int]:
+    using = cache if using is None else using
+    keys = [version_cache_key(namespace) for namespace in namespaces]
+    versions = using.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # an evicted version must not be reused, or stale entries would
+            # be valid again, so new versions start from the current time
+            using.add(key, time.time_ns(), None)
+            versions[key] = using.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(*namespaces: str, using: BaseCache | None = None) -> None:
+    """Invalidates all the entries cached under the namespaces."""
+    using = cache if using is None else using
+    for namespace in namespaces:
+        try:
+            using.incr(version_cache_key(namespace))
+        except ValueError:
+            # nothing was cached under the namespace since its eviction
+            pass
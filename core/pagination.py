@@ -0,0 +1,164 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seeks the next page by the ordering values of the last returned row,
+    so neither COUNT(*) nor OFFSET queries are made.
+
+    The ordering fields must be non-nullable and the last one has to be unique.
+    """
+
+    page_size = 10
+    ordering: tuple[str, ...] = ("-id",)
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        queryset = self.seek(queryset, request)
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def seek(self, queryset: QuerySet, request) -> QuerySet:
+        """Orders the queryset and skips the rows of the previous pages."""
+        self.model = queryset.model
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_seek_filter(cursor))
+        return queryset
+
+    def get_seek_filter(self, cursor: list) -> Q:
+        # (a, b) > (x, y) is expanded to: a > x OR (a = x AND b > y)
+        seek_filter = Q()
+        preceding_fields = {}
+        for field, value in zip(self.ordering, cursor):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            seek_filter |= Q(
+                **preceding_fields, **{f"{name}__{lookup}": value}
+            )
+            preceding_fields[name] = value
+        return seek_filter
+
+    def decode_cursor(self, request) -> list | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self.model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance) -> str:
+        values = [
+            self.model._meta.get_field(field.lstrip("-")).value_to_string(
+                instance
+            )
+            for field in self.ordering
+        ]
+        return urlsafe_b64encode(json.dumps(values).encode("ascii")).decode()
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1]),
+        )
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)])
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Page number pagination, which switches to the keyset pagination
+    when a client asks for it with ?pagination=cursor (or sends a cursor).
+    """
+
+    keyset_pagination_class: type[KeysetPagination] | None = None
+    pagination_query_param = "pagination"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        self.keyset_paginator = None
+        if self.is_keyset_requested(request):
+            self.display_page_controls = False
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def is_keyset_requested(self, request) -> bool:
+        if self.keyset_pagination_class is None:
+            return False
+        return (
+            request.query_params.get(self.pagination_query_param) == "cursor"
+            or self.keyset_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def get_paginated_response(self, data) -> Response:
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view) -> list:
+        parameters = super().get_schema_operation_parameters(view)
+        if self.keyset_pagination_class is None:
+            return parameters
+        return parameters + [
+            {
+                "name": self.pagination_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Use 'cursor' to paginate with cursors, "
+                "without the total count.",
+                "schema": {"type": "string", "enum": ["page", "cursor"]},
+            },
+            *self.keyset_pagination_class().get_schema_operation_parameters(
+                view
+            ),
+        ]
@@ -0,0 +1,127 @@
+"""
+Request-scoped permission context.
+
+The ids of the user groups and message threads a user belongs to are
+resolved with a single query, cached until the memberships change
+(see the m2m_changed handlers in users.signals and messagebox.signals)
+and shared by all permission classes checked during a request.
+
+The memberships are only cached in the cache shared by all processes
+(settings.PERMISSION_CONTEXT_CACHE), as a process-local copy would keep
+granting access after a change made by another process. They are cached
+under the version of the user's namespace read before loading them, so
+memberships loaded before a change are never read after it.
+"""
+
+from collections.abc import Iterable
+from functools import cached_property
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.db.models import F, Value
+from rest_framework.request import Request
+
+from core.cache import bump_version, get_versions
+from messagebox.models import MessageThread
+from users.models import UserGroup
+
+GROUP_ADMIN = "group_admin"
+GROUP_MEMBER = "group_member"
+THREAD_PARTICIPANT = "thread_participant"
+
+MEMBERSHIPS = [
+    (GROUP_ADMIN, UserGroup.administrators.through, "usergroup_id"),
+    (GROUP_MEMBER, UserGroup.members.through, "usergroup_id"),
+    (
+        THREAD_PARTICIPANT,
+        MessageThread.participants.through,
+        "messagethread_id",
+    ),
+]
+
+
+def permission_context_namespace(user_id: int) -> str:
+    return f"permissions:{user_id}"
+
+
+def load_memberships(user_id: int) -> dict[str, frozenset[int]]:
+    # each part of the union is resolved by the user_id index of its table
+    kind_querysets = [
+        through.objects.filter(user_id=user_id)
+        .annotate(kind=Value(kind), object_id=F(column))
+        .values_list("kind", "object_id")
+        for kind, through, column in MEMBERSHIPS
+    ]
+    memberships = {kind: set() for kind, _, _ in MEMBERSHIPS}
+    for kind, object_id in kind_querysets[0].union(
+        *kind_querysets[1:], all=True
+    ):
+        memberships[kind].add(object_id)
+    return {kind: frozenset(ids) for kind, ids in memberships.items()}
+
+
+def get_permission_context_cache() -> BaseCache | None:
+    alias = settings.PERMISSION_CONTEXT_CACHE
+    return None if alias is None else caches[alias]
+
+
+def invalidate_permission_context(user_ids: Iterable[int]) -> None:
+    cache = get_permission_context_cache()
+    if cache is None:
+        return
+    namespaces = [
+        permission_context_namespace(user_id) for user_id in user_ids
+    ]
+    bump_version(*namespaces, using=cache)
+    # requests which loaded the memberships before the commit
+    # cached them under the version bumped above
+    transaction.on_commit(lambda: bump_version(*namespaces, using=cache))
+
+
+class PermissionContext:
+    def __init__(self, user_id: int | None) -> None:
+        self.user_id = user_id
+
+    @cached_property
+    def memberships(self) -> dict[str, frozenset[int]]:
+        if self.user_id is None:
+            return {kind: frozenset() for kind, _, _ in MEMBERSHIPS}
+        cache = get_permission_context_cache()
+        if cache is None:
+            return load_memberships(self.user_id)
+        namespace = permission_context_namespace(self.user_id)
+        # read before loading, memberships changed meanwhile are
+        # cached under an outdated version
+        [version] = get_versions([namespace], using=cache)
+        memberships = cache.get(namespace, version=version)
+        if memberships is None:
+            memberships = load_memberships(self.user_id)
+            cache.set(
+                namespace,
+                memberships,
+                settings.PERMISSION_CONTEXT_CACHE_TIMEOUT,
+                version=version,
+            )
+        return memberships
+
+    @property
+    def admin_group_ids(self) -> frozenset[int]:
+        return self.memberships[GROUP_ADMIN]
+
+    @property
+    def member_group_ids(self) -> frozenset[int]:
+        return self.memberships[GROUP_MEMBER]
+
+    @property
+    def thread_ids(self) -> frozenset[int]:
+        return self.memberships[THREAD_PARTICIPANT]
+
+
+def get_permission_context(request: Request) -> PermissionContext:
+    """Returns the permission context of the request's user."""
+    context = getattr(request, "_permission_context", None)
+    if context is None:
+        context = PermissionContext(request.user.pk)
+        request._permission_context = context
+    return context
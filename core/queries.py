@@ -0,0 +1,36 @@
+"""
+Query helpers shared by the apps.
+"""
+
+from django.db.models import F, QuerySet, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+
+
+def first_in_groups(
+    queryset: QuerySet, group_by: str, order_by: str, limit: int
+) -> RawSQL:
+    """
+    Subquery of the primary keys of the first rows of each group of the
+    queryset, to be used as queryset.filter(pk__in=...). The rows are
+    ranked with ROW_NUMBER(), which Django 4.1 cannot filter, so the
+    ranked query is wrapped in a raw subquery.
+    """
+    ranked = (
+        queryset.order_by()
+        .annotate(
+            ranked_pk=F("pk"),
+            group_rank=Window(
+                RowNumber(),
+                partition_by=F(group_by),
+                order_by=F(order_by).asc(),
+            ),
+        )
+        .values("ranked_pk", "group_rank")
+    )
+    sql, params = ranked.query.sql_with_params()
+    return RawSQL(
+        f"SELECT ranked.ranked_pk FROM ({sql}) ranked "
+        f"WHERE ranked.group_rank <= %s",
+        (*params, limit),
+    )
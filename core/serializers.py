@@ -0,0 +1,47 @@
+from rest_framework import serializers
+
+
+class DynamicFieldsSerializerMixin:
+    """
+    Leaves out the fields which were not requested with ?fields=
+    and the Meta.expandable_fields which were not requested with ?expand=.
+
+    The requested fields are read from the serializer context, which is
+    filled by core.views.DynamicFieldsViewMixin. Only the top-level
+    serializer is pruned, nested serializers are always complete.
+    """
+
+    def get_fields(self) -> dict:
+        fields = super().get_fields()
+        if not self.is_top_level():
+            return fields
+        requested = self.context.get("fields")
+        expanded = self.context.get("expand", set())
+        expandable = getattr(self.Meta, "expandable_fields", ())
+        for name in list(fields):
+            if (name in expandable and name not in expanded) or (
+                requested is not None and name not in requested
+            ):
+                fields.pop(name)
+        return fields
+
+    def is_top_level(self) -> bool:
+        root = self.root
+        return root is self or (
+            isinstance(root, serializers.ListSerializer) and root.child is self
+        )
+
+
+class PrimaryKeyListField(serializers.ListField):
+    """
+    Primary keys of related objects.
+
+    Unlike PrimaryKeyRelatedField(many=True), which fetches the objects one
+    at a time, only the keys are validated here, so that the serializer can
+    check all of them with a single query.
+    """
+
+    child = serializers.IntegerField(min_value=1)
+
+    def to_representation(self, value) -> list:
+        return [obj.pk for obj in value.all()]
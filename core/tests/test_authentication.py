@@ -0,0 +1,100 @@
+import pytest
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import (
+    StatelessJWTAuthentication,
+    TokenClaimsSerializer,
+)
+from users.models import User, UserGroup
+
+
+def get_access_token(user: User) -> AccessToken:
+    return TokenClaimsSerializer.get_token(user).access_token
+
+
+@pytest.mark.django_db
+class TestStatelessJWTAuthentication:
+    def test_get_user_from_claims(self, django_assert_num_queries) -> None:
+        user = baker.make(User)
+        token = get_access_token(user)
+        authentication = StatelessJWTAuthentication()
+        authentication.get_user(token)
+
+        # the is_active flag is cached
+        with django_assert_num_queries(0):
+            token_user = authentication.get_user(token)
+            assert token_user == user
+            assert token_user.username == user.username
+            assert token_user.is_active is True
+
+        # other fields are deferred
+        with django_assert_num_queries(1):
+            assert token_user.email == user.email
+
+    def test_get_user_from_token_without_claims(self) -> None:
+        user = baker.make(User)
+
+        token_user = StatelessJWTAuthentication().get_user(
+            AccessToken.for_user(user)
+        )
+
+        assert token_user.pk == user.pk
+        assert token_user.username == user.username
+
+    def test_get_deactivated_user(self) -> None:
+        user = baker.make(User)
+        token = get_access_token(user)
+        authentication = StatelessJWTAuthentication()
+        authentication.get_user(token)
+
+        user.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            authentication.get_user(token)
+
+    def test_get_inactive_user_snapshot(self) -> None:
+        user = baker.make(User, is_active=False)
+
+        with pytest.raises(AuthenticationFailed):
+            StatelessJWTAuthentication().get_user(get_access_token(user))
+
+
+@pytest.mark.django_db
+class TestStatelessJWTEndpoints:
+    def test_get_usergroups_with_token(
+        self, django_assert_num_queries
+    ) -> None:
+        api_client = APIClient()
+        user = baker.make(User)
+        baker.make(UserGroup, members=[user], administrators=[user])
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {get_access_token(user)}"
+        )
+        api_client.get(f"/users/{user.pk}/groups/", format="json")
+
+        # validators, count, groups, members and administrators
+        with django_assert_num_queries(5):
+            response = api_client.get(
+                f"/users/{user.pk}/groups/", format="json"
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+
+    def test_get_threads_as_deactivated_user(self) -> None:
+        api_client = APIClient()
+        user = baker.make(User)
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {get_access_token(user)}"
+        )
+        response = api_client.get("/messagebox/threads/", format="json")
+        assert response.status_code == status.HTTP_200_OK
+
+        user.delete()
+        response = api_client.get("/messagebox/threads/", format="json")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
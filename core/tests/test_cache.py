@@ -0,0 +1,110 @@
+import pytest
+from django.core.cache import caches
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.cache import bump_version, get_versions
+from users.models import User
+
+
+@pytest.fixture
+def two_tier_cache(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "core.cache.TwoTierCache",
+            "LOCATION": "shared",
+            "OPTIONS": {"LOCAL_TIMEOUT": 5},
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "shared",
+        },
+    }
+    cache = caches["default"]
+    yield cache
+    cache.clear()
+
+
+class TestTwoTierCache:
+    def test_get_from_shared_tier(self, two_tier_cache) -> None:
+        caches["shared"].set("key", "value")
+
+        assert two_tier_cache.get("key") == "value"
+        assert two_tier_cache.get("key") == "value"
+        assert two_tier_cache.get("missing") is None
+        assert two_tier_cache.stats == {
+            "shared_hits": 1,
+            "local_hits": 1,
+            "misses": 1,
+        }
+
+    def test_set_writes_both_tiers(self, two_tier_cache) -> None:
+        two_tier_cache.set("key", "value")
+
+        assert caches["shared"].get("key") == "value"
+        assert two_tier_cache.local.get("key") == "value"
+
+    def test_delete_removes_both_tiers(self, two_tier_cache) -> None:
+        two_tier_cache.set("key", "value")
+
+        two_tier_cache.delete("key")
+
+        assert two_tier_cache.get("key") is None
+        assert caches["shared"].get("key") is None
+
+    def test_get_many(self, two_tier_cache) -> None:
+        two_tier_cache.set("local", 1)
+        caches["shared"].set("shared", 2)
+
+        assert two_tier_cache.get_many(["local", "shared", "missing"]) == {
+            "local": 1,
+            "shared": 2,
+        }
+        assert two_tier_cache.stats == {
+            "shared_hits": 1,
+            "local_hits": 1,
+            "misses": 1,
+        }
+
+    def test_incr_drops_local_entry(self, two_tier_cache) -> None:
+        two_tier_cache.set("counter", 1)
+
+        assert two_tier_cache.incr("counter") == 2
+        assert two_tier_cache.get("counter") == 2
+
+
+class TestCacheVersions:
+    def test_bump_version(self) -> None:
+        [version] = get_versions(["namespace"])
+
+        bump_version("namespace")
+
+        assert get_versions(["namespace"]) == [version + 1]
+
+    def test_bump_missing_version(self) -> None:
+        bump_version("namespace")
+
+        assert get_versions(["namespace"]) == get_versions(["namespace"])
+
+
+@pytest.mark.django_db
+class TestCacheStats:
+    def test_get_stats_as_admin(self, two_tier_cache) -> None:
+        admin = baker.make(User, is_staff=True)
+        api_client = APIClient()
+        api_client.force_authenticate(admin)
+        two_tier_cache.get("missing")
+
+        response = api_client.get("/cache-stats/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["default"]["misses"] >= 1
+
+    def test_get_stats_as_user(self) -> None:
+        api_client = APIClient()
+        api_client.force_authenticate(baker.make(User))
+
+        response = api_client.get("/cache-stats/", format="json")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
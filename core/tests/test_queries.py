@@ -0,0 +1,30 @@
+import pytest
+from model_bakery import baker
+
+from core.queries import first_in_groups
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestFirstInGroups:
+    def test_rows_are_limited_in_each_group(self) -> None:
+        user, other_user = baker.make(User, _quantity=2)
+        friends = baker.make(User, _quantity=60)
+        user.friends.add(*friends)
+        other_user.friends.add(*friends[:3])
+        friendships = User.friends.through.objects.filter(
+            from_user__in=[user, other_user]
+        )
+
+        first_friendships = User.friends.through.objects.filter(
+            pk__in=first_in_groups(
+                friendships, "from_user_id", "to_user_id", 50
+            )
+        )
+
+        assert first_friendships.count() == 53
+        assert {
+            friendship.to_user_id
+            for friendship in first_friendships
+            if friendship.from_user_id == user.pk
+        } == {friend.pk for friend in friends[:50]}
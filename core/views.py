@@ -0,0 +1,248 @@
+import hashlib
+from datetime import datetime
+
+from django.core.cache import cache, caches
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max, QuerySet
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import get_versions
+
+
+class DynamicFieldsViewMixin:
+    """
+    Passes the ?fields= and ?expand= query parameters of read requests
+    to the serializer (see core.serializers.DynamicFieldsSerializerMixin)
+    and lets get_queryset skip the columns and relations left out.
+    """
+
+    fields_query_param = "fields"
+    expand_query_param = "expand"
+    # model fields loaded even when they are not serialized,
+    # e.g. the ones used by permissions
+    required_fields: tuple[str, ...] = ()
+
+    def get_query_param_set(self, name: str) -> set[str] | None:
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        value = self.request.query_params.get(name, "")
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        return names or None
+
+    def get_requested_fields(self) -> set[str] | None:
+        """Names of the requested fields, None when all are requested."""
+        return self.get_query_param_set(self.fields_query_param)
+
+    def get_expanded_fields(self) -> set[str]:
+        return self.get_query_param_set(self.expand_query_param) or set()
+
+    def get_serializer_context(self) -> dict:
+        context = super().get_serializer_context()
+        context["fields"] = self.get_requested_fields()
+        context["expand"] = self.get_expanded_fields()
+        return context
+
+    def is_field_requested(self, name: str) -> bool:
+        meta = getattr(self.get_serializer_class(), "Meta", None)
+        if name in getattr(meta, "expandable_fields", ()):
+            return name in self.get_expanded_fields()
+        requested = self.get_requested_fields()
+        return requested is None or name in requested
+
+    def prune_queryset(self, queryset: QuerySet) -> QuerySet:
+        """Defers the columns which are not needed by the requested fields."""
+        if self.get_requested_fields() is None:
+            return queryset
+        model = queryset.model
+        names = {model._meta.pk.name, *self.required_fields}
+        # the keyset pagination reads the ordering values of the last row
+        paginator = self.paginator
+        keyset = getattr(paginator, "keyset_pagination_class", None)
+        ordering = getattr(keyset or paginator, "ordering", ())
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        names.update(field.lstrip("-") for field in ordering)
+        for field in self.get_serializer().fields.values():
+            try:
+                model_field = model._meta.get_field(field.source.split(".")[0])
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete and not model_field.many_to_many:
+                names.add(model_field.name)
+        return queryset.only(*names)
+
+
+class CachedResponseMixin:
+    """
+    Caches the data of successful responses of the cached_actions.
+
+    The entries are keyed by the requested URL and the versions of the
+    namespaces returned by get_cache_namespaces, which are bumped by
+    signal handlers when the serialized rows change.
+    Object permissions are only checked when the response is not cached.
+    """
+
+    cached_actions: tuple[str, ...] = ("list", "retrieve")
+    cache_timeout = 5 * 60
+
+    def get_cache_namespaces(self) -> list[str]:
+        raise NotImplementedError
+
+    def is_response_cacheable(self) -> bool:
+        return self.action in self.cached_actions
+
+    def get_response_cache_key(self) -> str:
+        namespaces = self.get_cache_namespaces()
+        versions = get_versions(namespaces)
+        url = hashlib.md5(
+            self.request.build_absolute_uri().encode()
+        ).hexdigest()
+        return ":".join(
+            [
+                "responses",
+                *(f"{n}@{v}" for n, v in zip(namespaces, versions)),
+                url,
+            ]
+        )
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(
+        self, handler, request: Request, *args, **kwargs
+    ) -> Response:
+        if not self.is_response_cacheable():
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+
+
+class ConditionalResponseMixin:
+    """
+    Answers the requests of the conditional_actions with 304 Not Modified,
+    without serializing anything, when the client's validator is current.
+
+    The validators are computed from the updated_at column: of the object
+    for retrieve, and max(updated_at) with the number of rows for list,
+    so the list's ETag changes when a row is removed as well.
+    The lists are only compared by their ETags, because Last-Modified
+    does not change when a row is removed.
+    Object permissions are only checked when the response is not 304.
+    """
+
+    conditional_actions: tuple[str, ...] = ("list", "retrieve")
+    updated_at_field = "updated_at"
+
+    def get_validators_queryset(self) -> QuerySet:
+        # without the annotations and prefetches needed by the serializer
+        return self.filter_queryset(super().get_queryset())
+
+    def get_validators(self) -> tuple[str, datetime | None] | None:
+        queryset = self.get_validators_queryset().order_by()
+        if self.action == "list":
+            state = queryset.aggregate(
+                last_modified=Max(self.updated_at_field),
+                count=Count("pk", distinct=True),
+            )
+        else:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            try:
+                last_modified = (
+                    queryset.filter(
+                        **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+                    )
+                    .values_list(self.updated_at_field, flat=True)
+                    .first()
+                )
+            except (TypeError, ValueError, ValidationError):
+                return None
+            if last_modified is None:
+                # not found, left to the handler
+                return None
+            state = {"last_modified": last_modified}
+        # the representation depends on the query and the requesting user
+        digest = hashlib.md5(
+            "|".join(
+                [
+                    self.request.get_full_path(),
+                    str(self.request.user.pk),
+                    self.request.accepted_renderer.format,
+                    *map(str, state.values()),
+                ]
+            ).encode()
+        ).hexdigest()
+        return f'W/"{digest}"', state["last_modified"]
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_conditional_response(
+        self, handler, request: Request, *args, **kwargs
+    ) -> Response:
+        if self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+        validators = self.get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        etag, last_modified = validators
+        last_modified = last_modified and int(last_modified.timestamp())
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=None if self.action == "list" else last_modified,
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response.headers["ETag"] = etag
+            if last_modified is not None:
+                response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class CacheStatsView(APIView):
+    """
+    GET: Retrieve the hit and miss counters of the caches,
+        counted by the process which serves the request.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request: Request) -> Response:
+        return Response(
+            {
+                alias: dict(caches[alias].stats)
+                for alias in caches.settings
+                if hasattr(caches[alias], "stats")
+            }
+        )
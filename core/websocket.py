@@ -0,0 +1,38 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+
+from .authentication import StatelessJWTAuthentication
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates WebSocket connections with an access token passed
+    as the ?token= query parameter, since browsers cannot set headers
+    on the handshake request.
+    """
+
+    token_query_param = "token"
+
+    async def __call__(self, scope, receive, send):
+        query_params = parse_qs(scope.get("query_string", b"").decode())
+        raw_token = query_params.get(self.token_query_param, [None])[0]
+        scope = dict(scope, user=await self.get_user(raw_token))
+        return await super().__call__(scope, receive, send)
+
+    @database_sync_to_async
+    def get_user(self, raw_token: str | None):
+        if raw_token is None:
+            return AnonymousUser()
+        authentication = StatelessJWTAuthentication()
+        try:
+            validated_token = authentication.get_validated_token(raw_token)
+            return authentication.get_user(validated_token)
+        except (AuthenticationFailed, InvalidToken):
+            return AnonymousUser()
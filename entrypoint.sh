@@ -1,2 +1,23 @@
-python manage.py migrate
-python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+#!/bin/bash
+# Usage: ./entrypoint.sh [web|release|dev]
+#   web:     multi-worker production server, see gunicorn.conf.py (default)
+#   release: one-shot step applying migrations before the web servers start
+#   dev:     migrations and the auto-reloading development server
+set -e
+
+case "${1:-web}" in
+    web)
+        exec gunicorn --config gunicorn.conf.py
+        ;;
+    release)
+        python manage.py migrate --noinput
+        ;;
+    dev)
+        python manage.py migrate
+        exec python manage.py runserver 0.0.0.0:8000
+        ;;
+    *)
+        echo "Unknown mode: $1" >&2
+        exit 1
+        ;;
+esac
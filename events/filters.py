@@ -1,10 +1,67 @@
-from django.db.models import Count
-from django_filters.rest_framework import FilterSet, TypedChoiceFilter
+from django import forms
+from django.db import connections
+from django.db.models import Exists, F, OuterRef
+from django_filters.fields import IsoDateTimeRangeField
+from django_filters.rest_framework import (
+    Filter,
+    FilterSet,
+    IsoDateTimeFilter,
+    IsoDateTimeFromToRangeFilter,
+    NumberFilter,
+    TypedChoiceFilter,
+)
 
-from .models import Event, Location
+from .geo import filter_by_distance
+from .models import Event, EventOccurrence, Location, TsTzRange
 
+DEFAULT_RADIUS_KM = 10
 
-class LocationFilter(FilterSet):
+
+class CoordinatesField(forms.CharField):
+    def clean(self, value) -> tuple[float, float] | None:
+        value = super().clean(value)
+        if not value:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in value.split(","))
+        except ValueError:
+            raise forms.ValidationError(
+                "Enter coordinates in the 'latitude,longitude' format."
+            )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise forms.ValidationError("Coordinates are out of range.")
+        return latitude, longitude
+
+
+class CoordinatesFilter(Filter):
+    field_class = CoordinatesField
+
+
+class DistanceFilterSet(FilterSet):
+    """Adds the 'near' and 'radius_km' filters, results are ordered by distance."""
+
+    near = CoordinatesFilter(
+        method="filter_near", label="Near (latitude,longitude)"
+    )
+    radius_km = NumberFilter(
+        method="filter_radius_km", min_value=0, label="Radius (km)"
+    )
+    coordinates_prefix = ""
+
+    def filter_near(self, queryset, name, value: tuple[float, float]):
+        radius_km = self.form.cleaned_data.get("radius_km")
+        if radius_km is None:
+            radius_km = DEFAULT_RADIUS_KM
+        return filter_by_distance(
+            queryset, *value, float(radius_km), prefix=self.coordinates_prefix
+        )
+
+    def filter_radius_km(self, queryset, name, value):
+        # applied by the 'near' filter
+        return queryset
+
+
+class LocationFilter(DistanceFilterSet):
     has_events = TypedChoiceFilter(
         method="filter_has_events",
         label="Has events",
@@ -17,16 +74,64 @@ class LocationFilter(FilterSet):
         fields = ["has_events"]
 
     def filter_has_events(self, queryset, name, value):
+        events = Event.objects.filter(location=OuterRef("pk"))
         if value:
-            return queryset.annotate(event_count=Count("events")).filter(
-                event_count__gt=0
-            )
-        return queryset.annotate(event_count=Count("events")).filter(
-            event_count=0
-        )
+            return queryset.filter(Exists(events))
+        return queryset.filter(~Exists(events))
 
 
-class EventFilter(FilterSet):
+class TimeWindowField(IsoDateTimeRangeField):
+    def clean(self, value) -> slice | None:
+        value = super().clean(value)
+        if value and None not in (value.start, value.stop):
+            if value.start > value.stop:
+                raise forms.ValidationError(
+                    "The window must not end before it starts."
+                )
+        return value
+
+
+class TimeWindowFilter(IsoDateTimeFromToRangeFilter):
+    field_class = TimeWindowField
+
+
+class EventFilter(DistanceFilterSet):
+    coordinates_prefix = "location__"
+
+    start_after = IsoDateTimeFilter(
+        field_name="start_time", lookup_expr="gte", label="Starts after"
+    )
+    start_before = IsoDateTimeFilter(
+        field_name="start_time", lookup_expr="lt", label="Starts before"
+    )
+    overlaps = TimeWindowFilter(
+        method="filter_overlaps", label="Overlaps time window"
+    )
+
     class Meta:
         model = Event
-        fields = {"location_id": ["exact"]}
+        fields = {"location_id": ["exact"], "status": ["exact"]}
+
+    def filter_overlaps(self, queryset, name, value: slice):
+        if connections[queryset.db].vendor == "postgresql":
+            return queryset.annotate(
+                period=TsTzRange(F("start_time"), F("end_time"))
+            ).filter(period__overlap=(value.start, value.stop))
+        if value.start is not None:
+            queryset = queryset.filter(end_time__gt=value.start)
+        if value.stop is not None:
+            queryset = queryset.filter(start_time__lt=value.stop)
+        return queryset
+
+
+class EventOccurrenceFilter(FilterSet):
+    after = IsoDateTimeFilter(
+        field_name="end_time", lookup_expr="gt", label="Ends after"
+    )
+    before = IsoDateTimeFilter(
+        field_name="start_time", lookup_expr="lt", label="Starts before"
+    )
+
+    class Meta:
+        model = EventOccurrence
+        fields = ["event", "after", "before"]
@@ -0,0 +1,75 @@
+from math import cos, radians
+
+from django.db.models import F, FloatField, QuerySet, Value
+from django.db.models.functions import (
+    ASin,
+    Cos,
+    Least,
+    Power,
+    Radians,
+    Sin,
+    Sqrt,
+)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_LATITUDE_DEGREE = 111.195
+
+
+def distance_km(latitude: float, longitude: float, prefix: str = ""):
+    """Haversine distance between the given point and the stored coordinates."""
+    stored_latitude = Radians(F(f"{prefix}latitude"))
+    stored_longitude = Radians(F(f"{prefix}longitude"))
+    haversine = Power(
+        Sin((stored_latitude - Value(radians(latitude))) / 2), 2
+    ) + Cos(stored_latitude) * Value(cos(radians(latitude))) * Power(
+        Sin((stored_longitude - Value(radians(longitude))) / 2), 2
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(
+        Least(Sqrt(haversine), Value(1.0)), output_field=FloatField()
+    )
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> dict:
+    """Coordinates range lookups, which can be resolved by the B-tree index."""
+    latitude_delta = radius_km / KM_PER_LATITUDE_DEGREE
+    min_latitude = latitude - latitude_delta
+    max_latitude = latitude + latitude_delta
+    lookups = {"latitude__gte": min_latitude, "latitude__lte": max_latitude}
+
+    # near the poles and across the antimeridian all longitudes are in range
+    if min_latitude <= -90 or max_latitude >= 90:
+        return lookups
+    widest_latitude = max(abs(min_latitude), abs(max_latitude))
+    longitude_delta = latitude_delta / cos(radians(widest_latitude))
+    if (
+        -180 <= longitude - longitude_delta
+        and longitude + longitude_delta <= 180
+    ):
+        lookups["longitude__gte"] = longitude - longitude_delta
+        lookups["longitude__lte"] = longitude + longitude_delta
+    return lookups
+
+
+def filter_by_distance(
+    queryset: QuerySet,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    prefix: str = "",
+) -> QuerySet:
+    """
+    Filters rows within the radius of the given point, nearest first.
+    The bounding box prefilter narrows the rows the exact distance is computed for.
+    """
+    lookups = {
+        f"{prefix}{lookup}": value
+        for lookup, value in bounding_box(
+            latitude, longitude, radius_km
+        ).items()
+    }
+    return (
+        queryset.filter(**lookups)
+        .annotate(distance=distance_km(latitude, longitude, prefix))
+        .filter(distance__lte=radius_km)
+        .order_by("distance")
+    )
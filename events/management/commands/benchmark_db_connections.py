@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the latency of requests opening a new database connection "
+        "with the latency of requests reusing a persistent one. "
+        "To measure an external pooler, point DATABASE_URL at it "
+        "and run the command again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/events/")
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        client = Client()
+        # the first request also imports the views and fills the caches
+        client.get(options["path"])
+        variants = {
+            "new connection": 0,
+            "persistent connection": 600,
+        }
+        for name, conn_max_age in variants.items():
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+            timings = []
+            for _ in range(options["requests"]):
+                start = time.perf_counter()
+                # the test client does not close connections by itself
+                close_old_connections()
+                response = client.get(options["path"])
+                close_old_connections()
+                timings.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                self.stderr.write(
+                    f"{options['path']} returned {response.status_code}"
+                )
+                return
+            timings.sort()
+            self.stdout.write(
+                f"{name:<22} "
+                f"avg: {sum(timings) / len(timings) * 1000:8.2f} ms  "
+                f"p50: {timings[len(timings) // 2] * 1000:8.2f} ms  "
+                f"p95: {timings[int(len(timings) * 0.95)] * 1000:8.2f} ms"
+            )
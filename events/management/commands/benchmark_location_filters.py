@@ -0,0 +1,92 @@
+import time
+from datetime import timedelta
+from random import randrange
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from events.models import Event, Location
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the COUNT annotation and EXISTS subquery variants of "
+        "the location 'has_events' filter on generated data. "
+        "Generated rows are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--locations", type=int, default=100_000)
+        parser.add_argument("--events", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.populate(
+                    options["locations"],
+                    options["events"],
+                    options["batch_size"],
+                )
+                self.benchmark(options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def populate(self, locations: int, events: int, batch_size: int) -> None:
+        self.stdout.write(f"Creating {locations} locations...")
+        Location.objects.bulk_create(
+            (
+                Location(name=f"location {i}", latitude=0, longitude=0)
+                for i in range(locations)
+            ),
+            batch_size=batch_size,
+        )
+        location_ids = list(Location.objects.values_list("id", flat=True))
+
+        # a half of the locations has no events
+        location_ids = location_ids[: len(location_ids) // 2]
+        self.stdout.write(f"Creating {events} events...")
+        start_time = timezone.now()
+        Event.objects.bulk_create(
+            (
+                Event(
+                    name=f"event {i}",
+                    description="",
+                    start_time=start_time,
+                    end_time=start_time + timedelta(hours=1),
+                    location_id=location_ids[randrange(len(location_ids))],
+                )
+                for i in range(events)
+            ),
+            batch_size=batch_size,
+        )
+
+    def benchmark(self, repeat: int) -> None:
+        events = Event.objects.filter(location=OuterRef("pk"))
+        event_count = Location.objects.annotate(event_count=Count("events"))
+        variants = {
+            "count, has events": event_count.filter(event_count__gt=0),
+            "count, no events": event_count.filter(event_count=0),
+            "exists, has events": Location.objects.filter(Exists(events)),
+            "exists, no events": Location.objects.filter(~Exists(events)),
+        }
+        for name, queryset in variants.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                # the first page of the locations list
+                list(queryset.values_list("id", flat=True)[:10])
+                queryset.count()
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(
+                f"{name:<20} best: {min(timings) * 1000:9.2f} ms  "
+                f"avg: {sum(timings) / len(timings) * 1000:9.2f} ms"
+            )
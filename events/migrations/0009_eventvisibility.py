@@ -0,0 +1,87 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_event_visibility(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventInvitation = apps.get_model("events", "EventInvitation")
+    EventVisibility = apps.get_model("events", "EventVisibility")
+
+    rows = set()
+    for event in Event.objects.prefetch_related(
+        "organizers", "participants", "group__members"
+    ):
+        if event.type == "O":
+            rows.add((event.id, None))
+            continue
+        users = list(event.organizers.all()) + list(event.participants.all())
+        if event.type == "G" and event.group and not event.group.is_deleted:
+            users += list(event.group.members.all())
+        rows.update((event.id, user.id) for user in users)
+    rows.update(
+        EventInvitation.objects.exclude(status="D")
+        .exclude(event__type="O")
+        .values_list("event_id", "receiver_id")
+    )
+    EventVisibility.objects.bulk_create(
+        [
+            EventVisibility(event_id=event_id, user_id=user_id)
+            for event_id, user_id in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("events", "0008_remove_event_access_event_type"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventVisibility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="visibility",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="visible_events",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="eventvisibility",
+            constraint=models.UniqueConstraint(
+                fields=("user", "event"), name="unique_user_event_visibility"
+            ),
+        ),
+        migrations.RunPython(
+            populate_event_visibility, migrations.RunPython.noop
+        ),
+    ]
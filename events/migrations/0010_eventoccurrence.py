@@ -0,0 +1,91 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:20
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def populate_event_occurrences(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventOccurrence = apps.get_model("events", "EventOccurrence")
+
+    until = timezone.now() + settings.EVENT_OCCURRENCES_HORIZON
+    for event in Event.objects.iterator():
+        duration = event.end_time - event.start_time
+        start_times = [event.start_time]
+        if event.recurrences is not None:
+            start_times = event.recurrences.between(
+                event.start_time, until, dtstart=event.start_time, inc=True
+            )
+        EventOccurrence.objects.bulk_create(
+            [
+                EventOccurrence(
+                    event=event,
+                    start_time=start_time,
+                    end_time=start_time + duration,
+                )
+                for start_time in start_times
+            ],
+            ignore_conflicts=True,
+        )
+    Event.objects.update(occurrences_until=until)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0009_eventvisibility"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="occurrences_until",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name="EventOccurrence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_time", models.DateTimeField()),
+                ("end_time", models.DateTimeField()),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occurrences",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["start_time", "id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="eventoccurrence",
+            index=models.Index(
+                fields=["start_time", "end_time"],
+                name="event_occurrence_time_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="eventoccurrence",
+            constraint=models.UniqueConstraint(
+                fields=("event", "start_time"),
+                name="unique_event_occurrence_start_time",
+            ),
+        ),
+        migrations.RunPython(
+            populate_event_occurrences, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:22
+
+from django.db import migrations, models
+
+import events.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0010_eventoccurrence"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["status", "start_time"],
+                name="event_status_start_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["location", "start_time"],
+                name="event_location_start_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=events.models.PostgresGistIndex(
+                events.models.TsTzRange("start_time", "end_time"),
+                name="event_period_gist_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0011_event_time_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="location",
+            index=models.Index(
+                fields=["latitude", "longitude"],
+                name="location_coordinates_idx",
+            ),
+        ),
+    ]
@@ -1,15 +1,44 @@
 from django.conf import settings
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.indexes import GistIndex
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.backends.ddl_references import Statement
+from django.db.models import Func, Q
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from recurrence.fields import RecurrenceField
 
-from users.models import UserGroup
+from users.models import User, UserGroup
 
 from .constants import EventStatus, EventType
 
 
+class TsTzRange(Func):
+    """The period of an event, indexed with GiST on PostgreSQL."""
+
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+class PostgresGistIndex(GistIndex):
+    """
+    GiST index created only on PostgreSQL, other databases fall back to
+    the B-tree indexes of the indexed columns.
+    """
+
+    def create_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return Statement("")
+        return super().create_sql(model, schema_editor, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return Statement("")
+        return super().remove_sql(model, schema_editor, **kwargs)
+
+
 class Location(models.Model):
     name = models.CharField(max_length=75)
     longitude = models.FloatField(
@@ -23,10 +52,19 @@ class Location(models.Model):
     street = models.CharField(max_length=75, blank=True, null=True)
     street_number = models.CharField(max_length=10, blank=True, null=True)
     zip_code = models.CharField(max_length=10, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["latitude", "longitude"],
+                name="location_coordinates_idx",
+            )
+        ]
+
 
 class Event(models.Model):
     name = models.CharField(max_length=255)
@@ -35,6 +73,7 @@ class Event(models.Model):
     )
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     organizers = models.ManyToManyField(
         settings.AUTH_USER_MODEL, related_name="events_organizer"
     )
@@ -63,16 +102,66 @@ class Event(models.Model):
         blank=True,
     )
     recurrences = RecurrenceField(blank=True, null=True)
+    occurrences_until = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
+
+    # the occurrences are expanded again when these fields change
+    SCHEDULE_FIELDS = ("start_time", "end_time", "recurrences")
 
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Event":
+        event = super().from_db(db, field_names, values)
+        event._saved_schedule = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.SCHEDULE_FIELDS
+        }
+        return event
+
+    def remember_schedule(self) -> None:
+        self._saved_schedule = {
+            name: getattr(self, name) for name in self.SCHEDULE_FIELDS
+        }
+
+    def has_schedule_changed(self) -> bool:
+        """Whether the schedule differs from the one loaded or last saved."""
+        saved_schedule = getattr(self, "_saved_schedule", {})
+        return any(
+            # deferred fields are not loaded, so they cannot have changed
+            name in self.__dict__
+            and (
+                name not in saved_schedule
+                or saved_schedule[name] != self.__dict__[name]
+            )
+            for name in self.SCHEDULE_FIELDS
+        )
+
     def clean(self) -> None:
         if self.start_time >= self.end_time:
             raise ValidationError(
                 "The end date of an event must be later than the start date."
             )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "start_time"],
+                name="event_status_start_time_idx",
+            ),
+            models.Index(
+                fields=["location", "start_time"],
+                name="event_location_start_time_idx",
+            ),
+            PostgresGistIndex(
+                TsTzRange("start_time", "end_time"),
+                name="event_period_gist_idx",
+            ),
+        ]
+
 
 # TODO create abstract invitation for: eventINV, friendsINV, groupINV
 class EventInvitation(models.Model):
@@ -96,3 +185,175 @@ class EventInvitation(models.Model):
         max_length=1,
         default=InvitationStatus.PENDING,
     )
+
+
+class EventVisibilityManager(models.Manager):
+    def for_user(self, user: User) -> models.QuerySet:
+        return self.filter(Q(user=user) | Q(user__isnull=True))
+
+    def refresh(self, event_ids, user_ids=None) -> None:
+        """
+        Rebuild the visibility rows of the given events.
+        Passing user_ids limits the rebuild to those users only.
+        """
+        event_ids = set(event_ids)
+        if not event_ids:
+            return
+        events = dict(
+            Event.objects.filter(pk__in=event_ids).values_list("id", "type")
+        )
+        rows = self.filter(event_id__in=event_ids)
+        if user_ids is not None:
+            rows = rows.filter(user_id__in=user_ids)
+
+        visibility = set()
+        for event_id, event_type in events.items():
+            if event_type == EventType.OPEN and user_ids is None:
+                visibility.add((event_id, None))
+        restricted_ids = [
+            event_id
+            for event_id, event_type in events.items()
+            if event_type != EventType.OPEN
+        ]
+        if restricted_ids:
+            visibility.update(
+                self._restricted_event_users(restricted_ids, user_ids)
+            )
+
+        with transaction.atomic():
+            rows.delete()
+            self.bulk_create(
+                [
+                    EventVisibility(event_id=event_id, user_id=user_id)
+                    for event_id, user_id in visibility
+                ]
+            )
+
+    def _restricted_event_users(self, event_ids, user_ids=None) -> set:
+        organizers = Event.organizers.through.objects.filter(
+            event_id__in=event_ids
+        )
+        participants = Event.participants.through.objects.filter(
+            event_id__in=event_ids
+        )
+        invited = EventInvitation.objects.filter(
+            event_id__in=event_ids
+        ).exclude(status=EventInvitation.InvitationStatus.DECLINED)
+        members_filter = Q(group__members__isnull=False)
+        if user_ids is not None:
+            members_filter = Q(group__members__in=user_ids)
+        group_members = Event.objects.filter(
+            members_filter,
+            pk__in=event_ids,
+            type=EventType.GROUP,
+            group__is_deleted=False,
+        )
+        if user_ids is not None:
+            organizers = organizers.filter(user_id__in=user_ids)
+            participants = participants.filter(user_id__in=user_ids)
+            invited = invited.filter(receiver_id__in=user_ids)
+
+        event_users = set()
+        event_users.update(organizers.values_list("event_id", "user_id"))
+        event_users.update(participants.values_list("event_id", "user_id"))
+        event_users.update(invited.values_list("event_id", "receiver_id"))
+        event_users.update(group_members.values_list("id", "group__members"))
+        return event_users
+
+
+class EventVisibility(models.Model):
+    """
+    Precomputed access index of events.
+    A row without a user marks an open event, which is visible to everyone.
+    """
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="visibility"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="visible_events",
+    )
+
+    objects = EventVisibilityManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "event"], name="unique_user_event_visibility"
+            )
+        ]
+
+
+class EventOccurrenceManager(models.Manager):
+    def expand(self, event: Event) -> None:
+        """Replace the occurrences of an event up to the rolling horizon."""
+        until = timezone.now() + settings.EVENT_OCCURRENCES_HORIZON
+        with transaction.atomic():
+            self.filter(event=event).delete()
+            self._create_occurrences(event, after=None, until=until)
+
+    def extend(self, event: Event) -> None:
+        """Add the occurrences of an event beyond its last expansion."""
+        until = timezone.now() + settings.EVENT_OCCURRENCES_HORIZON
+        with transaction.atomic():
+            self._create_occurrences(
+                event, after=event.occurrences_until, until=until
+            )
+
+    def _create_occurrences(self, event: Event, after, until) -> None:
+        duration = event.end_time - event.start_time
+        if event.recurrences is None:
+            start_times = [event.start_time]
+        else:
+            start_times = event.recurrences.between(
+                after or event.start_time,
+                until,
+                dtstart=event.start_time,
+                inc=True,
+            )
+        self.bulk_create(
+            [
+                EventOccurrence(
+                    event=event,
+                    start_time=start_time,
+                    end_time=start_time + duration,
+                )
+                for start_time in start_times
+                if after is None or start_time > after
+            ],
+            ignore_conflicts=True,
+        )
+        # update() does not trigger the re-expansion on post_save
+        Event.objects.filter(pk=event.pk).update(occurrences_until=until)
+        event.occurrences_until = until
+
+
+class EventOccurrence(models.Model):
+    """Single, materialized occurrence of a (recurring) event."""
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="occurrences"
+    )
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+
+    objects = EventOccurrenceManager()
+
+    class Meta:
+        ordering = ["start_time", "id"]
+        indexes = [
+            models.Index(
+                fields=["start_time", "end_time"],
+                name="event_occurrence_time_idx",
+            )
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "start_time"],
+                name="unique_event_occurrence_start_time",
+            )
+        ]
@@ -1,5 +1,17 @@
 from rest_framework.pagination import PageNumberPagination
 
+from core.pagination import KeysetPagination, PageNumberOrKeysetPagination
+
 
 class DefaultPagination(PageNumberPagination):
     page_size = 10
+
+
+class EventKeysetPagination(KeysetPagination):
+    page_size = 10
+    ordering = ("start_time", "id")
+
+
+class EventPagination(PageNumberOrKeysetPagination):
+    page_size = 10
+    keyset_pagination_class = EventKeysetPagination
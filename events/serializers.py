@@ -1,7 +1,8 @@
 from recurrence.fields import RecurrenceField
 from rest_framework import serializers
 
-from events.models import Event, Location
+from core.serializers import DynamicFieldsSerializerMixin
+from events.models import Event, EventOccurrence, Location
 
 
 class LocationRetrieveSerializer(serializers.ModelSerializer):
@@ -35,13 +36,12 @@ class LocationCreateUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class EventRetrieveSerializer(serializers.ModelSerializer):
-    participants_number = serializers.SerializerMethodField()
+class EventRetrieveSerializer(
+    DynamicFieldsSerializerMixin, serializers.ModelSerializer
+):
+    participants_number = serializers.IntegerField(read_only=True)
     location = LocationRetrieveSerializer()
 
-    def get_participants_number(self, obj: Event) -> int:
-        return obj.participants.count()
-
     class Meta:
         model = Event
         fields = [
@@ -61,6 +61,18 @@ class EventRetrieveSerializer(serializers.ModelSerializer):
         ]
 
 
+class EventListSerializer(EventRetrieveSerializer):
+    """
+    Events listed with their first participants only, prefetched into
+    participants_preview by the view.
+    """
+
+    participants = serializers.SerializerMethodField()
+
+    def get_participants(self, event: Event) -> list[int]:
+        return [user.pk for user in event.participants_preview]
+
+
 class EventCreateUpdateSerializer(serializers.ModelSerializer):
     recurrences = RecurrenceField()
     banner = serializers.ImageField(
@@ -84,3 +96,11 @@ class EventCreateUpdateSerializer(serializers.ModelSerializer):
         instance = Event(**attrs)
         instance.clean()
         return attrs
+
+
+class EventOccurrenceSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source="event.name", read_only=True)
+
+    class Meta:
+        model = EventOccurrence
+        fields = ["id", "event", "name", "start_time", "end_time"]
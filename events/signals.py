@@ -0,0 +1,170 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import bump_version
+from users.models import UserGroup
+
+from .models import (
+    Event,
+    EventInvitation,
+    EventOccurrence,
+    EventVisibility,
+    Location,
+)
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_visibility(sender, instance: Event, **kwargs) -> None:
+    # event type or group might have changed
+    EventVisibility.objects.refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Event.organizers.through)
+@receiver(m2m_changed, sender=Event.participants.through)
+def refresh_event_users_visibility(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    if action == "pre_clear":
+        # the cleared relations are unknown once they are removed
+        instance._cleared_pk_set = set(
+            sender.objects.filter(
+                **{"user_id" if reverse else "event_id": instance.pk}
+            ).values_list("event_id" if reverse else "user_id", flat=True)
+        )
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_pk_set", set())
+    elif action not in ("post_add", "post_remove"):
+        return
+
+    if reverse:
+        EventVisibility.objects.refresh(pk_set, user_ids=[instance.pk])
+    else:
+        EventVisibility.objects.refresh([instance.pk], user_ids=pk_set)
+
+
+@receiver(m2m_changed, sender=UserGroup.members.through)
+def refresh_group_members_visibility(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    if action == "pre_clear":
+        instance._cleared_pk_set = set(
+            sender.objects.filter(
+                **{"user_id" if reverse else "usergroup_id": instance.pk}
+            ).values_list("usergroup_id" if reverse else "user_id", flat=True)
+        )
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_pk_set", set())
+    elif action not in ("post_add", "post_remove"):
+        return
+
+    if reverse:
+        group_ids, user_ids = pk_set, [instance.pk]
+    else:
+        group_ids, user_ids = [instance.pk], pk_set
+    event_ids = Event.objects.filter(group_id__in=group_ids).values_list(
+        "id", flat=True
+    )
+    EventVisibility.objects.refresh(event_ids, user_ids=user_ids)
+
+
+@receiver(post_save, sender=UserGroup)
+def refresh_group_events_visibility(
+    sender, instance: UserGroup, **kwargs
+) -> None:
+    # a soft-deleted group no longer grants access to its events
+    event_ids = instance.event_set.values_list("id", flat=True)
+    EventVisibility.objects.refresh(event_ids)
+
+
+@receiver(pre_delete, sender=UserGroup)
+def collect_group_events(sender, instance: UserGroup, **kwargs) -> None:
+    # group events are detached (SET_NULL) without emitting post_save
+    instance._event_ids = list(instance.event_set.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=UserGroup)
+def refresh_deleted_group_visibility(
+    sender, instance: UserGroup, **kwargs
+) -> None:
+    EventVisibility.objects.refresh(instance.__dict__.pop("_event_ids", []))
+
+
+@receiver(post_save, sender=EventInvitation)
+def refresh_invitation_visibility(
+    sender, instance: EventInvitation, **kwargs
+) -> None:
+    EventVisibility.objects.refresh(
+        [instance.event_id], user_ids=[instance.receiver_id]
+    )
+
+
+@receiver(post_delete, sender=EventInvitation)
+def refresh_deleted_invitation_visibility(
+    sender, instance: EventInvitation, origin=None, **kwargs
+) -> None:
+    # cascade deletes of an event remove its visibility rows anyway
+    if isinstance(origin, EventInvitation) or (
+        getattr(origin, "model", None) is EventInvitation
+    ):
+        refresh_invitation_visibility(sender, instance)
+
+
+@receiver(post_save, sender=Event)
+def expand_event_occurrences(
+    sender, instance: Event, created: bool, update_fields, **kwargs
+) -> None:
+    if created or (
+        (update_fields is None or set(Event.SCHEDULE_FIELDS) & update_fields)
+        and instance.has_schedule_changed()
+    ):
+        EventOccurrence.objects.expand(instance)
+        instance.remember_schedule()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_cached_event(sender, instance: Event, **kwargs) -> None:
+    # "events" covers the locations filtered by their events
+    bump_version(f"events:{instance.pk}", "events")
+
+
+@receiver(m2m_changed, sender=Event.organizers.through)
+@receiver(m2m_changed, sender=Event.participants.through)
+def invalidate_cached_event_users(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    if action == "pre_clear" and reverse:
+        instance._cached_event_ids = set(
+            sender.objects.filter(user_id=instance.pk).values_list(
+                "event_id", flat=True
+            )
+        )
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cached_event_ids", set())
+    elif action not in ("post_add", "post_remove"):
+        return
+    event_ids = pk_set if reverse else [instance.pk]
+    bump_version(*(f"events:{event_id}" for event_id in event_ids))
+    # the users are serialized within the events, so their ETags change
+    Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_cached_locations(sender, **kwargs) -> None:
+    bump_version("locations")
+
+
+@receiver(post_save, sender=Location)
+def touch_location_events(sender, instance: Location, **kwargs) -> None:
+    # the location is serialized within its events
+    instance.events.update(updated_at=timezone.now())
@@ -0,0 +1,19 @@
+from celery import shared_task
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Event, EventOccurrence
+
+
+@shared_task
+def extend_event_occurrences() -> None:
+    """Moves the rolling horizon of recurring events' occurrences forward."""
+    until = timezone.now() + settings.EVENT_OCCURRENCES_HORIZON
+    recurring = Q(recurrences__isnull=False) & ~Q(recurrences="")
+    events = Event.objects.filter(
+        Q(occurrences_until__isnull=True)
+        | recurring & Q(occurrences_until__lt=until)
+    )
+    for event in events.iterator():
+        EventOccurrence.objects.extend(event)
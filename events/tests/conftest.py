@@ -0,0 +1,9 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    yield client
+    del client
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import recurrence
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Event
+
+
+@pytest.fixture
+def weekly_event():
+    start_time = datetime(2023, 5, 1, 18, tzinfo=timezone.utc)  # Monday
+    event = baker.make(
+        Event,
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        recurrences=recurrence.deserialize("RRULE:FREQ=WEEKLY;COUNT=10"),
+    )
+    yield event
+    del event
+
+
+@pytest.mark.django_db
+class TestListEventOccurrence:
+    def test_get_occurrences(self, api_client: APIClient, weekly_event):
+        response = api_client.get("/events/occurrences/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 10
+        assert response.data["results"][0]["name"] == weekly_event.name
+
+    def test_get_occurrences_in_time_window(
+        self, api_client: APIClient, weekly_event
+    ):
+        response = api_client.get(
+            "/events/occurrences/",
+            {
+                "after": "2023-05-08T00:00:00Z",
+                "before": "2023-05-15T00:00:00Z",
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+        assert response.data["results"][0]["event"] == weekly_event.pk
+        assert response.data["results"][0]["start_time"].startswith(
+            "2023-05-08T18:00:00"
+        )
+
+    def test_get_occurrences_overlapping_window_start(
+        self, api_client: APIClient, weekly_event
+    ):
+        response = api_client.get(
+            "/events/occurrences/",
+            {
+                "after": "2023-05-08T19:00:00Z",
+                "before": "2023-05-08T21:00:00Z",
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+
+    def test_get_occurrences_with_invalid_window(self, api_client: APIClient):
+        response = api_client.get(
+            "/events/occurrences/", {"after": "not a date"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,415 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.constants import EventType
+from events.models import Event
+from users.models import User
+
+
+@pytest.fixture
+def create_events():
+    def _create_events(quantity: int) -> list[Event]:
+        organizers = baker.make(User, _quantity=2)
+        participants = baker.make(User, _quantity=5)
+        return baker.make(
+            Event,
+            organizers=organizers,
+            participants=participants,
+            recurrences=None,
+            _quantity=quantity,
+        )
+
+    yield _create_events
+    del _create_events
+
+
+@pytest.mark.django_db
+class TestListEvent:
+    def test_get_events(self, api_client: APIClient, create_events) -> None:
+        create_events(3)
+
+        response = api_client.get("/events/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 3
+        for event in response.data["results"]:
+            assert event["participants_number"] == 5
+            assert len(event["participants"]) == 5
+            assert len(event["organizers"]) == 2
+
+    def test_get_events_with_first_participants(
+        self, api_client: APIClient
+    ) -> None:
+        participants = baker.make(User, _quantity=15)
+        crowded_event = baker.make(
+            Event, participants=participants, recurrences=None
+        )
+        small_event = baker.make(
+            Event, participants=participants[-2:], recurrences=None
+        )
+
+        response = api_client.get("/events/", format="json")
+
+        events = {event["id"]: event for event in response.data["results"]}
+        assert events[crowded_event.pk]["participants_number"] == 15
+        assert events[crowded_event.pk]["participants"] == [
+            participant.pk for participant in participants[:10]
+        ]
+        assert events[small_event.pk]["participants"] == [
+            participant.pk for participant in participants[-2:]
+        ]
+
+    @pytest.mark.parametrize("quantity", [1, 10])
+    def test_get_events_query_count_is_constant(
+        self,
+        api_client: APIClient,
+        create_events,
+        django_assert_num_queries,
+        quantity,
+    ) -> None:
+        create_events(quantity)
+
+        # validators, count,
+        # events with locations, organizers and participants
+        with django_assert_num_queries(5):
+            response = api_client.get("/events/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == quantity
+
+    def test_get_events_with_sparse_fields(
+        self,
+        api_client: APIClient,
+        create_events,
+        django_assert_num_queries,
+    ) -> None:
+        create_events(3)
+
+        # validators, count and events,
+        # without locations, organizers and participants
+        with django_assert_num_queries(3) as context:
+            response = api_client.get(
+                "/events/", {"fields": "id,name,start_time"}, format="json"
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert all(
+            event.keys() == {"id", "name", "start_time"}
+            for event in response.data["results"]
+        )
+        assert "description" not in context.captured_queries[-1]["sql"]
+
+    def test_get_events_with_sparse_fields_and_cursor(
+        self, api_client: APIClient, create_events
+    ) -> None:
+        create_events(12)
+
+        first_page = api_client.get(
+            "/events/", {"fields": "name", "pagination": "cursor"}
+        )
+        second_page = api_client.get(first_page.data["next"])
+
+        assert len(second_page.data["results"]) == 2
+        assert second_page.data["results"][0].keys() == {"name"}
+
+
+@pytest.mark.django_db
+class TestListEventWithCursor:
+    def test_get_events_with_cursor(self, api_client: APIClient) -> None:
+        start_time = datetime(2023, 5, 1, 10, tzinfo=timezone.utc)
+        events = [
+            baker.make(
+                Event,
+                start_time=start_time + timedelta(days=day % 4),
+                end_time=start_time + timedelta(days=5),
+                recurrences=None,
+            )
+            for day in range(12)
+        ]
+
+        first_page = api_client.get(
+            "/events/", {"pagination": "cursor"}, format="json"
+        )
+        second_page = api_client.get(first_page.data["next"], format="json")
+
+        assert len(first_page.data["results"]) == 10
+        assert len(second_page.data["results"]) == 2
+        assert [
+            event["id"]
+            for page in (first_page, second_page)
+            for event in page.data["results"]
+        ] == [
+            event.pk
+            for event in sorted(events, key=lambda e: (e.start_time, e.pk))
+        ]
+
+
+@pytest.mark.django_db
+class TestRetrieveEvent:
+    def test_get_event(self, api_client: APIClient, create_events) -> None:
+        event = create_events(1)[0]
+
+        response = api_client.get(f"/events/{event.pk}/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["name"] == event.name
+        assert response.data["participants_number"] == 5
+        assert response.data["location"]["id"] == event.location_id
+
+    def test_get_event_with_all_participants(
+        self, api_client: APIClient
+    ) -> None:
+        participants = baker.make(User, _quantity=15)
+        event = baker.make(Event, participants=participants, recurrences=None)
+
+        response = api_client.get(f"/events/{event.pk}/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["participants"]) == 15
+
+    def test_get_cached_event(
+        self,
+        api_client: APIClient,
+        create_events,
+        django_assert_num_queries,
+    ) -> None:
+        event = create_events(1)[0]
+        api_client.get(f"/events/{event.pk}/", format="json")
+
+        # validators only
+        with django_assert_num_queries(1):
+            response = api_client.get(f"/events/{event.pk}/", format="json")
+
+        assert response.data["participants_number"] == 5
+
+    def test_get_event_after_changes(
+        self, api_client: APIClient, create_events
+    ) -> None:
+        event = create_events(1)[0]
+        api_client.get(f"/events/{event.pk}/", format="json")
+
+        baker.make(User).events_participant.add(event)
+        event.location.name = "new name"
+        event.location.save()
+        response = api_client.get(f"/events/{event.pk}/", format="json")
+
+        assert response.data["participants_number"] == 6
+        assert response.data["location"]["name"] == "new name"
+
+    def test_get_non_existing_event(self, api_client: APIClient) -> None:
+        response = api_client.get("/events/1/", format="json")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestEventFeed:
+    def test_get_feed_as_anonymous_user(self, api_client: APIClient) -> None:
+        response = api_client.get("/events/feed/", format="json")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_get_feed(self, api_client: APIClient) -> None:
+        user = baker.make(User)
+        api_client.force_authenticate(user)
+        open_event = baker.make(Event, type=EventType.OPEN, recurrences=None)
+        organized_event = baker.make(
+            Event, type=EventType.PRIVATE, recurrences=None
+        )
+        organized_event.organizers.add(user)
+        baker.make(Event, type=EventType.PRIVATE, recurrences=None)
+
+        response = api_client.get("/events/feed/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {event["id"] for event in response.data["results"]} == {
+            open_event.pk,
+            organized_event.pk,
+        }
+
+    def test_get_feed_next_page(self, api_client: APIClient) -> None:
+        user = baker.make(User)
+        api_client.force_authenticate(user)
+        baker.make(Event, type=EventType.OPEN, recurrences=None, _quantity=15)
+
+        first_page = api_client.get("/events/feed/", format="json")
+        second_page = api_client.get(first_page.data["next"], format="json")
+
+        assert len(first_page.data["results"]) == 10
+        assert len(second_page.data["results"]) == 5
+        assert second_page.data["next"] is None
+
+
+@pytest.fixture
+def calendar_events():
+    first_event = baker.make(
+        Event,
+        start_time=datetime(2023, 5, 1, 10, tzinfo=timezone.utc),
+        end_time=datetime(2023, 5, 1, 12, tzinfo=timezone.utc),
+        recurrences=None,
+    )
+    second_event = baker.make(
+        Event,
+        start_time=datetime(2023, 5, 3, 10, tzinfo=timezone.utc),
+        end_time=datetime(2023, 5, 5, 10, tzinfo=timezone.utc),
+        recurrences=None,
+    )
+    yield first_event, second_event
+    del first_event, second_event
+
+
+@pytest.mark.django_db
+class TestFilterEvent:
+    @pytest.mark.parametrize(
+        "query_params, expected_events",
+        [
+            ({"start_after": "2023-05-02T00:00:00Z"}, [1]),
+            ({"start_before": "2023-05-02T00:00:00Z"}, [0]),
+            ({"overlaps_after": "2023-05-04T00:00:00Z"}, [1]),
+            ({"overlaps_before": "2023-05-01T11:00:00Z"}, [0]),
+            (
+                {
+                    "overlaps_after": "2023-05-01T11:00:00Z",
+                    "overlaps_before": "2023-05-03T11:00:00Z",
+                },
+                [0, 1],
+            ),
+            (
+                {
+                    "overlaps_after": "2023-05-01T12:00:00Z",
+                    "overlaps_before": "2023-05-03T10:00:00Z",
+                },
+                [],
+            ),
+        ],
+    )
+    def test_filter_events_by_time(
+        self,
+        api_client: APIClient,
+        calendar_events,
+        query_params,
+        expected_events,
+    ) -> None:
+        response = api_client.get("/events/", query_params, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {event["id"] for event in response.data["results"]} == {
+            calendar_events[index].pk for index in expected_events
+        }
+
+    def test_filter_events_with_invalid_time(
+        self, api_client: APIClient
+    ) -> None:
+        response = api_client.get(
+            "/events/", {"start_after": "tomorrow"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_filter_events_with_inverted_time_window(
+        self, api_client: APIClient, calendar_events
+    ) -> None:
+        response = api_client.get(
+            "/events/",
+            {
+                "overlaps_after": "2023-05-03T11:00:00Z",
+                "overlaps_before": "2023-05-01T11:00:00Z",
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "overlaps" in response.data
+
+
+@pytest.mark.django_db
+class TestConditionalEvent:
+    def test_get_not_modified_event(
+        self,
+        api_client: APIClient,
+        create_events,
+        django_assert_num_queries,
+    ) -> None:
+        event = create_events(1)[0]
+        response = api_client.get(f"/events/{event.pk}/", format="json")
+
+        # validators only
+        with django_assert_num_queries(1):
+            not_modified = api_client.get(
+                f"/events/{event.pk}/",
+                format="json",
+                HTTP_IF_NONE_MATCH=response.headers["ETag"],
+            )
+
+        assert response.headers["ETag"].startswith('W/"')
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified.headers["ETag"] == response.headers["ETag"]
+        assert not_modified.content == b""
+
+    def test_get_event_modified_since(
+        self, api_client: APIClient, create_events
+    ) -> None:
+        event = create_events(1)[0]
+        response = api_client.get(f"/events/{event.pk}/", format="json")
+
+        not_modified = api_client.get(
+            f"/events/{event.pk}/",
+            format="json",
+            HTTP_IF_MODIFIED_SINCE=response.headers["Last-Modified"],
+        )
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_get_event_after_changes(
+        self, api_client: APIClient, create_events
+    ) -> None:
+        event = create_events(1)[0]
+        etags = [
+            api_client.get(f"/events/{event.pk}/").headers["ETag"],
+        ]
+
+        baker.make(User).events_participant.add(event)
+        etags.append(api_client.get(f"/events/{event.pk}/").headers["ETag"])
+        event.location.name = "new name"
+        event.location.save()
+        response = api_client.get(
+            f"/events/{event.pk}/", HTTP_IF_NONE_MATCH=", ".join(etags)
+        )
+
+        assert len(set(etags)) == 2
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["location"]["name"] == "new name"
+
+    def test_get_not_modified_events(
+        self, api_client: APIClient, create_events
+    ) -> None:
+        create_events(3)
+        response = api_client.get("/events/", format="json")
+
+        not_modified = api_client.get(
+            "/events/", format="json", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        other_page = api_client.get(
+            "/events/", {"fields": "id"}, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert other_page.status_code == status.HTTP_200_OK
+
+    def test_get_events_after_deletion(
+        self, api_client: APIClient, create_events
+    ) -> None:
+        events = create_events(3)
+        response = api_client.get("/events/", format="json")
+
+        events[0].delete()
+        response = api_client.get(
+            "/events/", format="json", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 2
@@ -0,0 +1,234 @@
+import pytest
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Event, Location
+
+
+@pytest.fixture
+def locations():
+    krakow = baker.make(
+        Location, name="Krakow", latitude=50.0614, longitude=19.9366
+    )
+    wieliczka = baker.make(
+        Location, name="Wieliczka", latitude=49.9870, longitude=20.0640
+    )
+    warsaw = baker.make(
+        Location, name="Warsaw", latitude=52.2297, longitude=21.0122
+    )
+    yield krakow, wieliczka, warsaw
+    del krakow, wieliczka, warsaw
+
+
+@pytest.mark.django_db
+class TestFilterLocation:
+    def test_filter_locations_near(
+        self, api_client: APIClient, locations
+    ) -> None:
+        response = api_client.get(
+            "/events/locations/",
+            {"near": "50.0647,19.9450", "radius_km": 20},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [location["name"] for location in response.data["results"]] == [
+            "Krakow",
+            "Wieliczka",
+        ]
+
+    def test_filter_locations_near_with_default_radius(
+        self, api_client: APIClient, locations
+    ) -> None:
+        response = api_client.get(
+            "/events/locations/", {"near": "52.23,21.01"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+        assert response.data["results"][0]["name"] == "Warsaw"
+
+    def test_filter_locations_near_with_large_radius(
+        self, api_client: APIClient, locations
+    ) -> None:
+        response = api_client.get(
+            "/events/locations/",
+            {"near": "52.23,21.01", "radius_km": 300},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [location["name"] for location in response.data["results"]] == [
+            "Warsaw",
+            "Krakow",
+            "Wieliczka",
+        ]
+
+    @pytest.mark.parametrize(
+        "near", ["50.06", "50.06,19.94,1", "north,east", "91,19.94"]
+    )
+    def test_filter_locations_near_with_invalid_coordinates(
+        self, api_client: APIClient, near
+    ) -> None:
+        response = api_client.get(
+            "/events/locations/", {"near": near}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestFilterEventByLocation:
+    def test_filter_events_near(
+        self, api_client: APIClient, locations
+    ) -> None:
+        krakow, wieliczka, warsaw = locations
+        wieliczka_event = baker.make(
+            Event, location=wieliczka, recurrences=None
+        )
+        krakow_event = baker.make(Event, location=krakow, recurrences=None)
+        baker.make(Event, location=warsaw, recurrences=None)
+
+        response = api_client.get(
+            "/events/",
+            {"near": "50.0647,19.9450", "radius_km": 20},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [event["id"] for event in response.data["results"]] == [
+            krakow_event.pk,
+            wieliczka_event.pk,
+        ]
+
+
+@pytest.mark.django_db
+class TestFilterLocationHasEvents:
+    @pytest.mark.parametrize(
+        "has_events, expected_names",
+        [("True", ["Krakow"]), ("False", ["Wieliczka", "Warsaw"])],
+    )
+    def test_filter_locations_by_events(
+        self, api_client: APIClient, locations, has_events, expected_names
+    ) -> None:
+        baker.make(Event, location=locations[0], recurrences=None, _quantity=3)
+
+        response = api_client.get(
+            "/events/locations/", {"has_events": has_events}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {
+            location["name"] for location in response.data["results"]
+        } == set(expected_names)
+
+
+@pytest.mark.django_db
+class TestCachedLocation:
+    def test_get_cached_location(
+        self, api_client: APIClient, locations, django_assert_num_queries
+    ) -> None:
+        url = f"/events/locations/{locations[0].pk}/"
+        api_client.get(url, format="json")
+
+        # validators only
+        with django_assert_num_queries(1):
+            response = api_client.get(url, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["name"] == "Krakow"
+
+    def test_get_locations_after_update(
+        self, api_client: APIClient, locations
+    ) -> None:
+        api_client.get("/events/locations/", format="json")
+
+        locations[0].name = "Cracow"
+        locations[0].save()
+        response = api_client.get("/events/locations/", format="json")
+
+        assert "Cracow" in {
+            location["name"] for location in response.data["results"]
+        }
+
+    def test_filter_locations_by_events_after_new_event(
+        self, api_client: APIClient, locations
+    ) -> None:
+        api_client.get(
+            "/events/locations/", {"has_events": "True"}, format="json"
+        )
+
+        baker.make(Event, location=locations[1], recurrences=None)
+        response = api_client.get(
+            "/events/locations/", {"has_events": "True"}, format="json"
+        )
+
+        assert [location["name"] for location in response.data["results"]] == [
+            "Wieliczka"
+        ]
+
+
+@pytest.mark.django_db
+class TestConditionalLocation:
+    def test_get_not_modified_locations(
+        self, api_client: APIClient, locations
+    ) -> None:
+        response = api_client.get("/events/locations/", format="json")
+
+        not_modified = api_client.get(
+            "/events/locations/",
+            format="json",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_get_locations_after_update(
+        self, api_client: APIClient, locations
+    ) -> None:
+        response = api_client.get("/events/locations/", format="json")
+
+        locations[2].name = "Warszawa"
+        locations[2].save()
+        response = api_client.get(
+            "/events/locations/",
+            format="json",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_get_non_existing_location_with_etag(
+        self, api_client: APIClient
+    ) -> None:
+        response = api_client.get(
+            "/events/locations/1/", format="json", HTTP_IF_NONE_MATCH="*"
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestDeleteLocation:
+    def test_delete_location_with_events(
+        self, api_client: APIClient, locations
+    ) -> None:
+        baker.make(Event, location=locations[0], recurrences=None)
+
+        response = api_client.delete(
+            f"/events/locations/{locations[0].pk}/", format="json"
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert Location.objects.filter(pk=locations[0].pk).exists()
+
+    def test_delete_location_without_events(
+        self, api_client: APIClient, locations
+    ) -> None:
+        response = api_client.delete(
+            f"/events/locations/{locations[1].pk}/", format="json"
+        )
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Location.objects.filter(pk=locations[1].pk).exists()
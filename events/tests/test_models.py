@@ -0,0 +1,236 @@
+from datetime import timedelta
+
+import pytest
+import recurrence
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+
+from events.constants import EventType
+from events.models import (
+    Event,
+    EventInvitation,
+    EventOccurrence,
+    EventVisibility,
+)
+from events.tasks import extend_event_occurrences
+from users.models import User, UserGroup
+
+
+@pytest.fixture
+def test_user():
+    user = baker.make(User, username="test_user")
+    yield user
+    del user
+
+
+@pytest.fixture
+def private_event():
+    event = baker.make(Event, type=EventType.PRIVATE, recurrences=None)
+    yield event
+    del event
+
+
+def visible_user_ids(event: Event) -> set:
+    return set(
+        EventVisibility.objects.filter(event=event).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestEventVisibility:
+    def test_open_event_is_visible_to_everyone(self):
+        event = baker.make(Event, type=EventType.OPEN, recurrences=None)
+
+        assert visible_user_ids(event) == {None}
+
+    def test_private_event_without_users_is_not_visible(self, private_event):
+        assert visible_user_ids(private_event) == set()
+
+    def test_organizers_and_participants_can_see_private_event(
+        self, private_event, test_user
+    ):
+        participant = baker.make(User)
+
+        private_event.organizers.add(test_user)
+        participant.events_participant.add(private_event)
+
+        assert visible_user_ids(private_event) == {
+            test_user.pk,
+            participant.pk,
+        }
+
+    def test_removed_participant_cannot_see_private_event(
+        self, private_event, test_user
+    ):
+        private_event.participants.add(test_user)
+        private_event.participants.remove(test_user)
+
+        assert visible_user_ids(private_event) == set()
+
+    def test_cleared_participant_can_still_see_organized_event(
+        self, private_event, test_user
+    ):
+        private_event.organizers.add(test_user)
+        private_event.participants.add(test_user)
+
+        test_user.events_participant.clear()
+
+        assert visible_user_ids(private_event) == {test_user.pk}
+
+    def test_invited_user_can_see_private_event(
+        self, private_event, test_user
+    ):
+        invitation = baker.make(
+            EventInvitation, event=private_event, receiver=test_user
+        )
+        assert visible_user_ids(private_event) == {test_user.pk}
+
+        invitation.status = EventInvitation.InvitationStatus.DECLINED
+        invitation.save()
+        assert visible_user_ids(private_event) == set()
+
+    def test_group_members_can_see_group_event(self, test_user):
+        group = baker.make(UserGroup)
+        event = baker.make(
+            Event, type=EventType.GROUP, group=group, recurrences=None
+        )
+
+        group.members.add(test_user)
+        assert visible_user_ids(event) == {test_user.pk}
+
+        group.is_deleted = True
+        group.save()
+        assert visible_user_ids(event) == set()
+
+    def test_changing_event_type_rebuilds_visibility(
+        self, private_event, test_user
+    ):
+        private_event.participants.add(test_user)
+
+        private_event.type = EventType.OPEN
+        private_event.save()
+
+        assert visible_user_ids(private_event) == {None}
+
+    def test_deleting_event_with_invitations(self, private_event, test_user):
+        baker.make(EventInvitation, event=private_event, receiver=test_user)
+
+        private_event.delete()
+
+        assert not EventVisibility.objects.exists()
+
+
+@pytest.fixture
+def weekly_event():
+    start_time = timezone.now().replace(microsecond=0)
+    event = baker.make(
+        Event,
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        recurrences=recurrence.deserialize("RRULE:FREQ=WEEKLY;COUNT=3"),
+    )
+    yield event
+    del event
+
+
+@pytest.mark.django_db
+class TestEventOccurrence:
+    def test_single_event_has_one_occurrence(self):
+        event = baker.make(Event, recurrences=None)
+
+        occurrence = EventOccurrence.objects.get(event=event)
+
+        assert occurrence.start_time == event.start_time
+        assert occurrence.end_time == event.end_time
+
+    def test_recurring_event_is_expanded(self, weekly_event):
+        occurrences = EventOccurrence.objects.filter(event=weekly_event)
+
+        assert [o.start_time for o in occurrences] == [
+            weekly_event.start_time + timedelta(weeks=week)
+            for week in range(3)
+        ]
+        assert all(
+            o.end_time - o.start_time == timedelta(hours=2)
+            for o in occurrences
+        )
+
+    def test_edited_event_is_expanded_again(self, weekly_event):
+        weekly_event.end_time = weekly_event.start_time + timedelta(hours=1)
+        weekly_event.recurrences = recurrence.deserialize(
+            "RRULE:FREQ=DAILY;COUNT=5"
+        )
+        weekly_event.save()
+
+        occurrences = EventOccurrence.objects.filter(event=weekly_event)
+
+        assert occurrences.count() == 5
+        assert all(
+            o.end_time - o.start_time == timedelta(hours=1)
+            for o in occurrences
+        )
+
+    def test_event_without_schedule_changes_keeps_occurrences(
+        self, weekly_event
+    ):
+        event = Event.objects.get(pk=weekly_event.pk)
+        event.name = "renamed"
+        event.start_time = weekly_event.start_time
+
+        with CaptureQueriesContext(connection) as context:
+            event.save()
+            weekly_event.description = "updated"
+            weekly_event.save()
+
+        assert not any(
+            "events_eventoccurrence" in query["sql"]
+            for query in context.captured_queries
+        )
+        assert EventOccurrence.objects.filter(event=event).count() == 3
+
+    def test_event_is_expanded_again_after_each_schedule_change(
+        self, weekly_event
+    ):
+        for hours in (1, 3):
+            weekly_event.end_time = weekly_event.start_time + timedelta(
+                hours=hours
+            )
+            weekly_event.save(update_fields=["end_time"])
+
+            assert all(
+                o.end_time - o.start_time == timedelta(hours=hours)
+                for o in EventOccurrence.objects.filter(event=weekly_event)
+            )
+
+    def test_occurrences_are_expanded_up_to_horizon(self, settings):
+        settings.EVENT_OCCURRENCES_HORIZON = timedelta(days=10)
+        start_time = timezone.now()
+        event = baker.make(
+            Event,
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=1),
+            recurrences=recurrence.deserialize("RRULE:FREQ=DAILY"),
+        )
+
+        assert EventOccurrence.objects.filter(event=event).count() == 11
+
+    def test_extend_event_occurrences_task(self, settings):
+        settings.EVENT_OCCURRENCES_HORIZON = timedelta(days=10)
+        start_time = timezone.now().replace(microsecond=0)
+        event = baker.make(
+            Event,
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=1),
+            recurrences=recurrence.deserialize("RRULE:FREQ=DAILY"),
+        )
+
+        settings.EVENT_OCCURRENCES_HORIZON = timedelta(days=20)
+        extend_event_occurrences()
+
+        occurrences = EventOccurrence.objects.filter(event=event)
+        assert occurrences.count() == 21
+        assert occurrences.last().start_time == start_time + timedelta(days=20)
@@ -7,6 +7,9 @@ app_name = "events"
 
 router = DefaultRouter()
 router.register("locations", views.LocationViewSet, basename="locations")
+router.register(
+    "occurrences", views.EventOccurrenceViewSet, basename="occurrences"
+)
 router.register("", views.EventViewSet, basename="events")
 
 urlpatterns = router.urls
@@ -1,23 +1,80 @@
+from django.db.models import (
+    Count,
+    Prefetch,
+    QuerySet,
+    prefetch_related_objects,
+)
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
+
+from core.queries import first_in_groups
+from core.views import (
+    CachedResponseMixin,
+    ConditionalResponseMixin,
+    DynamicFieldsViewMixin,
+)
+from users.models import User
 
-from .filters import EventFilter, LocationFilter
-from .models import Event, Location
-from .pagination import DefaultPagination
+from .filters import EventFilter, EventOccurrenceFilter, LocationFilter
+from .models import Event, EventOccurrence, EventVisibility, Location
+from .pagination import (
+    DefaultPagination,
+    EventKeysetPagination,
+    EventPagination,
+)
 from .serializers import (
     EventCreateUpdateSerializer,
+    EventListSerializer,
+    EventOccurrenceSerializer,
     EventRetrieveSerializer,
     LocationCreateUpdateSerializer,
     LocationRetrieveSerializer,
 )
 
 
-class EventViewSet(ModelViewSet):
+class EventViewSet(
+    ConditionalResponseMixin,
+    CachedResponseMixin,
+    DynamicFieldsViewMixin,
+    ModelViewSet,
+):
+    """
+    GET (list): Retrieve a list of events.
+        Note: Responses have an ETag, requests with a matching If-None-Match header are answered with 304.
+        Note: participants holds the first 10 participants of each event, participants_number their total.
+
+    Query Parameters:
+        - pagination: page, cursor (default: page)
+            Note: Cursor pagination orders events by the start time and does not return the total count.
+        - fields: comma-separated names of the returned fields (default: all)
+
+    GET (retrieve): Retrieve the details of a specific event.
+        Note: Responses are cached until the event or its location changes.
+        Note: Responses have an ETag and Last-Modified, requests with matching If-None-Match or
+            If-Modified-Since headers are answered with 304.
+
+    Query Parameters:
+        - fields: comma-separated names of the returned fields (default: all)
+
+    GET (feed): Retrieve a list of events visible to the current user: open events
+        and events the user organizes, participates in, is invited to or which belong to the user's group.
+        Note: The feed is paginated with a cursor and ordered by the start time.
+        Note: participants holds the first 10 participants of each event, like the list.
+
+    POST: Create a new event.
+
+    PUT/PATCH: Update the details of an event.
+
+    DELETE: Delete an event.
+    """
+
     queryset = Event.objects.all()  # TODO show only event's, that user can see
     filter_backends = [
         DjangoFilterBackend,
@@ -33,16 +90,132 @@ class EventViewSet(ModelViewSet):
         "location__country",
         "location__street",
     ]
-    pagination_class = DefaultPagination
+    pagination_class = EventPagination
+    cached_actions = ("retrieve",)
+    # the lists serialize only the first participants of each event
+    participants_preview_actions = ("list", "feed")
+    participants_preview_size = 10
 
     def get_serializer_class(self):
+        if self.is_participants_preview():
+            return EventListSerializer
         if self.request.method == "GET":
             return EventRetrieveSerializer
         return EventCreateUpdateSerializer
 
+    def get_cache_namespaces(self) -> list[str]:
+        # the location is serialized within the event
+        return [f"events:{self.kwargs['pk']}", "locations"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != "GET":
+            return queryset
+        queryset = self.prune_queryset(queryset)
+        if self.is_field_requested("location"):
+            queryset = queryset.select_related("location")
+        # organizers and participants are serialized as primary keys only,
+        # the organizers of an event are few, so they are not previewed
+        users = User.objects.only("id")
+        for name in ("organizers", "participants"):
+            if self.is_field_requested(name) and not (
+                name == "participants" and self.is_participants_preview()
+            ):
+                queryset = queryset.prefetch_related(
+                    Prefetch(name, queryset=users)
+                )
+        if self.is_field_requested("participants_number"):
+            queryset = queryset.annotate(
+                participants_number=Count("participants", distinct=True)
+            )
+        return queryset
+
+    def is_participants_preview(self) -> bool:
+        return self.action in self.participants_preview_actions
+
+    def paginate_queryset(self, queryset: QuerySet) -> list | None:
+        page = super().paginate_queryset(queryset)
+        if (
+            page
+            and self.is_participants_preview()
+            and self.is_field_requested("participants")
+        ):
+            self.prefetch_participants_preview(page)
+        return page
+
+    def prefetch_participants_preview(self, events: list[Event]) -> None:
+        """
+        Prefetches the first participants of each event into
+        participants_preview. Only the users among the first participants
+        of any event of the page are loaded, ranked by a window function,
+        so events with many participants are not loaded in full.
+        """
+        through = Event.participants.through
+        first_participants = through.objects.filter(
+            pk__in=first_in_groups(
+                through.objects.filter(event__in=events),
+                "event_id",
+                "user_id",
+                self.participants_preview_size,
+            )
+        )
+        users = (
+            User.objects.only("id")
+            .filter(pk__in=first_participants.values("user_id"))
+            .order_by("pk")
+        )
+        prefetch_related_objects(
+            events,
+            Prefetch(
+                "participants", queryset=users, to_attr="participants_preview"
+            ),
+        )
+        for event in events:
+            # the first participants of another event can follow them
+            del event.participants_preview[self.participants_preview_size :]
+
+    @action(
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        pagination_class=EventKeysetPagination,
+        filter_backends=[DjangoFilterBackend, SearchFilter],
+    )
+    def feed(self, request: Request) -> Response:
+        visible_events = EventVisibility.objects.for_user(request.user)
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            pk__in=visible_events.values("event_id")
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+@extend_schema(tags=["occurrences"])
+class EventOccurrenceViewSet(ReadOnlyModelViewSet):
+    """
+    GET (list): Retrieve a list of event occurrences, recurring events are expanded into
+        separate occurrences.
+
+    Query Parameters:
+        - after: occurrences that end after the given time
+        - before: occurrences that start before the given time
+
+    GET (retrieve): Retrieve the details of a specific event occurrence.
+    """
+
+    queryset = EventOccurrence.objects.select_related("event").only(
+        "id", "start_time", "end_time", "event__id", "event__name"
+    )
+    serializer_class = EventOccurrenceSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EventOccurrenceFilter
+    pagination_class = DefaultPagination
+
 
 @extend_schema(tags=["locations"])
-class LocationViewSet(ModelViewSet):
+class LocationViewSet(
+    ConditionalResponseMixin, CachedResponseMixin, ModelViewSet
+):
     queryset = Location.objects.all()
     # serializer_class = LocationSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -62,8 +235,13 @@ class LocationViewSet(ModelViewSet):
     def get_serializer_context(self):
         return {"request": self.request}
 
+    def get_cache_namespaces(self) -> list[str]:
+        if "has_events" in self.request.query_params:
+            return ["locations", "events"]
+        return ["locations"]
+
     def destroy(self, request: Request, *args, **kwargs):
-        if Event.objects.filter(location_id=kwargs["pk"]).count() > 0:
+        if Event.objects.filter(location_id=kwargs["pk"]).exists():
             return Response(
                 {
                     "error": "Location cannot be deleted, because it is associated with an event.",
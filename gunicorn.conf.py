@@ -0,0 +1,46 @@
+"""
+Gunicorn settings of the production server, see entrypoint.sh.
+
+    SERVER_MODE: asgi (default, serves WebSockets) or wsgi
+    PORT: listening port (default: 8000)
+    WEB_CONCURRENCY: number of worker processes (default: 2 * CPU cores + 1)
+    WEB_THREADS: number of threads of each wsgi worker (default: 1)
+    WEB_TIMEOUT: seconds before a silent worker is restarted (default: 30)
+    CACHE_URL: Redis cache shared by the workers, required with more than one
+
+The application is loaded before the workers are forked, so a HUP signal
+restarts the workers gracefully, but new code needs a server restart.
+"""
+
+import multiprocessing
+import os
+
+server_mode = os.environ.get("SERVER_MODE", "asgi")
+if server_mode == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+elif server_mode == "wsgi":
+    wsgi_app = "config.wsgi:application"
+    threads = int(os.environ.get("WEB_THREADS", 1))
+    worker_class = "gthread" if threads > 1 else "sync"
+else:
+    raise ValueError(f"Unknown SERVER_MODE: {server_mode}")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+)
+if workers > 1 and not os.environ.get("CACHE_URL"):
+    # the local memory cache of each worker would miss the invalidations
+    # made by the other workers and serve stale responses
+    raise ValueError("CACHE_URL is required with more than one worker")
+preload_app = True
+timeout = int(os.environ.get("WEB_TIMEOUT", 30))
+graceful_timeout = timeout
+keepalive = 5
+# recycles the workers now and then, to bound slow memory leaks
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
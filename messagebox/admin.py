@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Message, MessageThread
+from .models import Message, MessageThread, ReadMarker
 
 
 class MessageInline(admin.StackedInline):
@@ -24,11 +24,18 @@ class MessageAdmin(admin.ModelAdmin):
     list_filter = ["sender", "receiver"]
     search_fields = ["sender__username", "receiver__username"]
 
+    def get_queryset(self, request):
+        return Message.objects.with_read_status()
+
     def thread_id(self, obj: Message) -> int | None:
         if obj.thread:
             return obj.thread.id
         return None
 
+    @admin.display(boolean=True)
+    def read_status(self, obj: Message) -> bool:
+        return obj.read_status
+
 
 @admin.register(MessageThread)
 class MessageThreadAdmin(admin.ModelAdmin):
@@ -40,3 +47,9 @@ class MessageThreadAdmin(admin.ModelAdmin):
         return ", ".join([p.username for p in obj.participants.all()])
 
     participants_list.short_description = "Participants"
+
+
+@admin.register(ReadMarker)
+class ReadMarkerAdmin(admin.ModelAdmin):
+    list_display = ["id", "user", "thread", "correspondent", "last_read_id"]
+    search_fields = ["user__username"]
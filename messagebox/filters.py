@@ -1,24 +1,45 @@
 from django.db.models import Q
 from django_filters.rest_framework import CharFilter, FilterSet
 
-from .models import Message
+from .models import Message, MessageThread
+from .search import search_messages
 
 
 class MessageFilter(FilterSet):
     msg_direction = CharFilter(method="filter_message_direction")
+    q = CharFilter(method="filter_full_text", label="Full-text search")
 
     class Meta:
         model = Message
         fields = ["msg_direction"]
 
     def filter_message_direction(self, queryset, name, value):
+        # the queryset is already limited to the user's messages
         user = self.request.user
-        sent_filter = Q(sender=user, deleted_by_sender=False)
-        received_filter = Q(receiver=user, deleted_by_receiver=False)
         filter_conditions = {
-            "sent": queryset.filter(sent_filter),
-            "received": queryset.filter(received_filter),
+            "sent": Q(sender=user, deleted_by_sender=False),
+            "received": Q(receiver=user, deleted_by_receiver=False),
         }
-        return filter_conditions.get(
-            value, queryset.filter(sent_filter | received_filter)
+        if value not in filter_conditions:
+            return queryset
+        return queryset.filter(filter_conditions[value])
+
+    def filter_full_text(self, queryset, name, value):
+        return search_messages(queryset, value).order_by("-search_rank", "-id")
+
+
+class MessageThreadFilter(FilterSet):
+    q = CharFilter(method="filter_full_text", label="Full-text search")
+
+    class Meta:
+        model = MessageThread
+        fields = []
+
+    def filter_full_text(self, queryset, name, value):
+        user = self.request.user
+        visible_messages = Message.objects.filter(
+            thread__isnull=False
+        ).exclude(sender=user, deleted_by_sender=True)
+        return queryset.filter(
+            pk__in=search_messages(visible_messages, value).values("thread")
         )
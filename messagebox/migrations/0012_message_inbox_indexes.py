@@ -0,0 +1,29 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messagebox", "0011_alter_message_deleted_by_receiver"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("deleted_by_sender", False)),
+                fields=["sender", "date_sent"],
+                name="message_sent_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("deleted_by_receiver", False)),
+                fields=["receiver", "date_sent"],
+                name="message_received_idx",
+            ),
+        ),
+    ]
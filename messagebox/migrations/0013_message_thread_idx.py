@@ -0,0 +1,19 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messagebox", "0012_message_inbox_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["thread", "date_sent"], name="message_thread_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 4.1.13 on 2026-10-18 01:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Max
+
+
+def populate_read_markers(apps, schema_editor):
+    Message = apps.get_model("messagebox", "Message")
+    MessageThread = apps.get_model("messagebox", "MessageThread")
+    ReadMarker = apps.get_model("messagebox", "ReadMarker")
+
+    read_messages = Message.objects.filter(read_status=True).order_by()
+    markers = [
+        ReadMarker(
+            user_id=row["receiver_id"],
+            correspondent_id=row["sender_id"],
+            last_read_id=row["last_read_id"],
+        )
+        for row in read_messages.filter(thread__isnull=True)
+        .values("receiver_id", "sender_id")
+        .annotate(last_read_id=Max("id"))
+    ]
+    # the read status of thread messages was shared by all participants
+    thread_watermarks = dict(
+        read_messages.filter(thread__isnull=False)
+        .values("thread_id")
+        .annotate(last_read_id=Max("id"))
+        .values_list("thread_id", "last_read_id")
+    )
+    for thread in MessageThread.objects.filter(
+        pk__in=thread_watermarks
+    ).prefetch_related("participants"):
+        markers.extend(
+            ReadMarker(
+                user_id=participant.id,
+                thread_id=thread.id,
+                last_read_id=thread_watermarks[thread.id],
+            )
+            for participant in thread.participants.all()
+        )
+    ReadMarker.objects.bulk_create(markers, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("messagebox", "0013_message_thread_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReadMarker",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_read_id", models.PositiveBigIntegerField(default=0)),
+                (
+                    "correspondent",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "thread",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="read_markers",
+                        to="messagebox.messagethread",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="read_markers",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="readmarker",
+            constraint=models.UniqueConstraint(
+                fields=("user", "thread"), name="unique_user_thread_marker"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="readmarker",
+            constraint=models.UniqueConstraint(
+                fields=("user", "correspondent"),
+                name="unique_user_correspondent_marker",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="readmarker",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(
+                        ("thread__isnull", False),
+                        ("correspondent__isnull", True),
+                    ),
+                    models.Q(
+                        ("thread__isnull", True),
+                        ("correspondent__isnull", False),
+                    ),
+                    _connector="OR",
+                ),
+                name="thread_or_correspondent_set",
+            ),
+        ),
+        migrations.RunPython(populate_read_markers, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="message",
+            name="read_status",
+        ),
+    ]
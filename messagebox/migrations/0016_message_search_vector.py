@@ -0,0 +1,85 @@
+# Generated by Django 4.1.13 on 2026-10-18 02:05
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRESQL_CREATE_SEARCH = [
+    "CREATE INDEX message_search_vector_idx ON messagebox_message "
+    "USING gin (search_vector)",
+    "CREATE TRIGGER message_search_vector_update "
+    "BEFORE INSERT OR UPDATE OF content ON messagebox_message "
+    "FOR EACH ROW EXECUTE FUNCTION "
+    "tsvector_update_trigger(search_vector, 'pg_catalog.simple', content)",
+    "UPDATE messagebox_message "
+    "SET search_vector = to_tsvector('pg_catalog.simple', content)",
+]
+POSTGRESQL_DROP_SEARCH = [
+    "DROP TRIGGER IF EXISTS message_search_vector_update "
+    "ON messagebox_message",
+    "DROP INDEX IF EXISTS message_search_vector_idx",
+]
+
+# SQLite drops the triggers when a migration remakes the message table,
+# they have to be created again after such migrations
+SQLITE_CREATE_SEARCH = [
+    "CREATE VIRTUAL TABLE messagebox_message_fts USING fts5("
+    "content, content='messagebox_message', content_rowid='id')",
+    "CREATE TRIGGER messagebox_message_fts_insert "
+    "AFTER INSERT ON messagebox_message BEGIN "
+    "INSERT INTO messagebox_message_fts(rowid, content) "
+    "VALUES (new.id, new.content); END",
+    "CREATE TRIGGER messagebox_message_fts_delete "
+    "AFTER DELETE ON messagebox_message BEGIN "
+    "INSERT INTO messagebox_message_fts(messagebox_message_fts, rowid, content) "
+    "VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER messagebox_message_fts_update "
+    "AFTER UPDATE OF content ON messagebox_message BEGIN "
+    "INSERT INTO messagebox_message_fts(messagebox_message_fts, rowid, content) "
+    "VALUES ('delete', old.id, old.content); "
+    "INSERT INTO messagebox_message_fts(rowid, content) "
+    "VALUES (new.id, new.content); END",
+    "INSERT INTO messagebox_message_fts(messagebox_message_fts) "
+    "VALUES ('rebuild')",
+]
+SQLITE_DROP_SEARCH = [
+    "DROP TRIGGER IF EXISTS messagebox_message_fts_insert",
+    "DROP TRIGGER IF EXISTS messagebox_message_fts_delete",
+    "DROP TRIGGER IF EXISTS messagebox_message_fts_update",
+    "DROP TABLE IF EXISTS messagebox_message_fts",
+]
+
+
+def create_message_search(apps, schema_editor):
+    statements = {
+        "postgresql": POSTGRESQL_CREATE_SEARCH,
+        "sqlite": SQLITE_CREATE_SEARCH,
+    }
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_message_search(apps, schema_editor):
+    statements = {
+        "postgresql": POSTGRESQL_DROP_SEARCH,
+        "sqlite": SQLITE_DROP_SEARCH,
+    }
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messagebox", "0015_messagechange"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="message",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_message_search, drop_message_search),
+    ]
@@ -1,7 +1,10 @@
+from collections import defaultdict
+
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import Exists, ExpressionWrapper, OuterRef, Q
 
 
 # TODO add archived by participant in a future (if someone sends a new message thread will appear again)
@@ -23,13 +26,113 @@ class MessageThread(models.Model):
     def perform_soft_delete(self, user):
         self.deleted_by_users.add(user)
         self.save()
+        MessageChange.objects.record(
+            MessageChange.Kind.THREAD_DELETED, [user.pk], thread=self
+        )
+
+
+class MessageQuerySet(models.QuerySet):
+    def with_read_status(self, user=None) -> models.QuerySet:
+        """
+        Annotate read_status: a direct message is read by its receiver,
+        a thread message by the given user, who has read their own
+        messages. Without a user, a thread message is read by any
+        participant other than its sender.
+        """
+        if user is None:
+            thread_markers = Q(thread=OuterRef("thread")) & ~Q(
+                user=OuterRef("sender")
+            )
+        else:
+            thread_markers = Q(thread=OuterRef("thread"), user=user)
+        read_markers = ReadMarker.objects.filter(
+            thread_markers
+            | Q(correspondent=OuterRef("sender"), user=OuterRef("receiver")),
+            last_read_id__gte=OuterRef("pk"),
+        )
+        read_status = Exists(read_markers)
+        if user is not None:
+            read_status = ExpressionWrapper(
+                Q(read_status) | Q(thread__isnull=False, sender=user),
+                output_field=models.BooleanField(),
+            )
+        return self.annotate(read_status=read_status)
+
+    def visible_to(self, user) -> models.QuerySet:
+        """
+        Messages the user has not deleted: their direct messages
+        and the messages of the threads they take part in.
+        """
+        threads = MessageThread.objects.filter(participants=user).exclude(
+            deleted_by_users=user
+        )
+        return self.filter(
+            Q(receiver=user, deleted_by_receiver=False)
+            | Q(sender=user, deleted_by_sender=False, thread=None)
+            | Q(thread__in=threads.values("pk"))
+            & ~Q(sender=user, deleted_by_sender=True)
+        )
+
+
+class MessageManager(models.Manager.from_queryset(MessageQuerySet)):
+    def bulk_send(self, messages: list["Message"]) -> list["Message"]:
+        """
+        Create a batch of messages, checking that the senders
+        of thread messages are thread participants with a single query.
+        """
+        thread_senders = {
+            (message.thread_id, message.sender_id)
+            for message in messages
+            if message.thread_id is not None
+        }
+        if thread_senders:
+            thread_ids, sender_ids = zip(*thread_senders)
+            participants = set(
+                MessageThread.participants.through.objects.filter(
+                    messagethread_id__in=thread_ids, user_id__in=sender_ids
+                ).values_list("messagethread_id", "user_id")
+            )
+            if not thread_senders <= participants:
+                raise ValidationError(
+                    "Only a thread participant can send a thread message."
+                )
+        with transaction.atomic():
+            messages = self.bulk_create(messages)
+            MessageChange.objects.record_messages(
+                MessageChange.Kind.MESSAGE_CREATED, messages
+            )
+        return messages
+
+    def get_recipient_ids(self, messages: list["Message"]) -> list[set]:
+        """
+        The users who can see each of the messages: the sender and
+        the receiver of a direct message or the thread participants.
+        """
+        thread_participants = defaultdict(set)
+        thread_ids = {message.thread_id for message in messages}
+        thread_ids.discard(None)
+        if thread_ids:
+            for (
+                thread_id,
+                user_id,
+            ) in MessageThread.participants.through.objects.filter(
+                messagethread_id__in=thread_ids
+            ).values_list(
+                "messagethread_id", "user_id"
+            ):
+                thread_participants[thread_id].add(user_id)
+        return [
+            {message.sender_id, message.receiver_id}
+            if message.thread_id is None
+            else thread_participants[message.thread_id]
+            for message in messages
+        ]
 
 
-# TODO add read_by for thread message for each participant in the future
 class Message(models.Model):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        if self.thread is None and self.deleted_by_receiver is None:
+        if self.thread_id is None and self.deleted_by_receiver is None:
             self.deleted_by_receiver = False
 
     sender = models.ForeignKey(
@@ -52,13 +155,16 @@ class Message(models.Model):
         related_name="messages",
     )
     content = models.TextField()
+    # maintained by a database trigger on PostgreSQL, see search.py
+    search_vector = SearchVectorField(null=True, editable=False)
     date_sent = models.DateTimeField(auto_now_add=True)
-    read_status = models.BooleanField(default=False)
     deleted_by_sender = models.BooleanField(default=False)
     deleted_by_receiver = models.BooleanField(
         default=None, null=True, blank=True
     )
 
+    objects = MessageManager()
+
     def __str__(self) -> str:
         if self.receiver is None:
             return f"{self.sender.username} broadcasts: {self.content}"
@@ -66,8 +172,10 @@ class Message(models.Model):
 
     def save(self, *args, **kwargs) -> None:
         if (
-            self.thread is not None
-            and self.sender not in self.thread.participants.all()
+            self.thread_id is not None
+            and not MessageThread.participants.through.objects.filter(
+                messagethread_id=self.thread_id, user_id=self.sender_id
+            ).exists()
         ):
             raise ValidationError(
                 "Only a thread participant can send a thread message."
@@ -91,12 +199,31 @@ class Message(models.Model):
     def perform_soft_delete(self, user):
         if user == self.sender:
             self.deleted_by_sender = True
+            self.save(update_fields=["deleted_by_sender"])
         else:
             self.deleted_by_receiver = True
-        self.save()
+            self.save(update_fields=["deleted_by_receiver"])
+        MessageChange.objects.record(
+            MessageChange.Kind.MESSAGE_DELETED, [user.pk], message=self
+        )
 
     class Meta:
         ordering = ["-date_sent"]
+        indexes = [
+            models.Index(
+                fields=["sender", "date_sent"],
+                condition=Q(deleted_by_sender=False),
+                name="message_sent_idx",
+            ),
+            models.Index(
+                fields=["receiver", "date_sent"],
+                condition=Q(deleted_by_receiver=False),
+                name="message_received_idx",
+            ),
+            models.Index(
+                fields=["thread", "date_sent"], name="message_thread_idx"
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=(
@@ -113,3 +240,145 @@ class Message(models.Model):
                 name="deleted_by_receiver_null_when_thread_present",
             ),
         ]
+
+
+class ReadMarkerManager(models.Manager):
+    def mark_read(
+        self,
+        user_id: int,
+        last_read_id: int,
+        thread_id: int | None = None,
+        correspondent_id: int | None = None,
+    ) -> None:
+        """
+        Move the user's watermark of a thread or a direct conversation
+        forward. Markers are never moved back.
+        """
+        lookup = {
+            "user_id": user_id,
+            "thread_id": thread_id,
+            "correspondent_id": correspondent_id,
+        }
+        marker, created = self.get_or_create(
+            **lookup, defaults={"last_read_id": last_read_id}
+        )
+        if not created and (
+            marker.last_read_id >= last_read_id
+            or not self.filter(
+                pk=marker.pk, last_read_id__lt=last_read_id
+            ).update(last_read_id=last_read_id)
+        ):
+            return
+        # the sender of a direct message sees it has been read
+        MessageChange.objects.record(
+            MessageChange.Kind.READ,
+            {user_id, correspondent_id} - {None},
+            read_marker=marker,
+        )
+
+
+class ReadMarker(models.Model):
+    """
+    The id of the last message read by a user in a thread,
+    or in the direct conversation with a correspondent.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="read_markers",
+    )
+    thread = models.ForeignKey(
+        MessageThread,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="read_markers",
+    )
+    correspondent = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    last_read_id = models.PositiveBigIntegerField(default=0)
+
+    objects = ReadMarkerManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "thread"], name="unique_user_thread_marker"
+            ),
+            models.UniqueConstraint(
+                fields=["user", "correspondent"],
+                name="unique_user_correspondent_marker",
+            ),
+            models.CheckConstraint(
+                check=(
+                    Q(thread__isnull=False) & Q(correspondent__isnull=True)
+                    | Q(thread__isnull=True) & Q(correspondent__isnull=False)
+                ),
+                name="thread_or_correspondent_set",
+            ),
+        ]
+
+
+class MessageChangeManager(models.Manager):
+    def record(self, kind: str, user_ids, **target) -> None:
+        self.bulk_create(
+            [
+                MessageChange(user_id=user_id, kind=kind, **target)
+                for user_id in user_ids
+            ]
+        )
+
+    def record_messages(self, kind: str, messages: list[Message]) -> None:
+        recipient_ids = Message.objects.get_recipient_ids(messages)
+        self.bulk_create(
+            [
+                MessageChange(user_id=user_id, kind=kind, message=message)
+                for message, user_ids in zip(messages, recipient_ids)
+                for user_id in user_ids
+            ]
+        )
+
+
+class MessageChange(models.Model):
+    """
+    Append-only log of the messagebox changes seen by each user.
+    The id is the sequence number clients sync from.
+    """
+
+    class Kind(models.TextChoices):
+        MESSAGE_CREATED = "C", "Message created"
+        MESSAGE_UPDATED = "U", "Message updated"
+        MESSAGE_DELETED = "D", "Message deleted"
+        THREAD_DELETED = "T", "Thread deleted"
+        READ = "R", "Messages read"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="message_changes",
+    )
+    kind = models.CharField(max_length=1, choices=Kind.choices)
+    message = models.ForeignKey(
+        Message, null=True, on_delete=models.CASCADE, related_name="+"
+    )
+    thread = models.ForeignKey(
+        MessageThread, null=True, on_delete=models.CASCADE, related_name="+"
+    )
+    read_marker = models.ForeignKey(
+        ReadMarker, null=True, on_delete=models.CASCADE, related_name="+"
+    )
+
+    objects = MessageChangeManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "id"], name="message_change_user_seq_idx"
+            )
+        ]
@@ -2,6 +2,8 @@ from rest_framework import permissions
 from rest_framework.request import Request
 from rest_framework.views import APIView
 
+from core.permissions import get_permission_context
+
 from .models import Message, MessageThread
 
 
@@ -11,9 +13,7 @@ class MessageSenderReceiverPermission(permissions.BasePermission):
     def has_object_permission(
         self, request: Request, view: APIView, obj: Message
     ) -> bool:
-        if (obj.sender == request.user) or (obj.receiver == request.user):
-            return True
-        return False
+        return request.user.pk in (obj.sender_id, obj.receiver_id)
 
 
 class MessageUpdatePermission(permissions.BasePermission):
@@ -23,7 +23,7 @@ class MessageUpdatePermission(permissions.BasePermission):
         self, request: Request, view: APIView, obj: Message
     ) -> bool:
         if request.method in ["PUT", "PATCH"]:
-            return obj.sender == request.user
+            return obj.sender_id == request.user.pk
         return True
 
 
@@ -33,6 +33,4 @@ class MessageThreadParticipantPermission(permissions.BasePermission):
     def has_object_permission(
         self, request: Request, view: APIView, obj: MessageThread
     ) -> bool:
-        if request.user in obj.participants.all():
-            return True
-        return False
+        return obj.pk in get_permission_context(request).thread_ids
@@ -0,0 +1,37 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from .models import Message
+from .serializers import MessageSerializer
+
+
+def user_group_name(user_id: int) -> str:
+    return f"messagebox_user_{user_id}"
+
+
+def publish_messages(messages: list[Message]) -> None:
+    """
+    Push new messages to the connected receivers (or thread participants)
+    and to the other connections of their senders.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    events = []
+    serialized_messages = MessageSerializer(messages, many=True).data
+    recipient_ids = Message.objects.get_recipient_ids(messages)
+    for data, user_ids in zip(serialized_messages, recipient_ids):
+        events.extend(
+            (
+                user_group_name(user_id),
+                {"type": "message.created", "message": dict(data)},
+            )
+            for user_id in user_ids
+        )
+    async_to_sync(_group_send_all)(channel_layer, events)
+
+
+async def _group_send_all(channel_layer, events: list) -> None:
+    for group, event in events:
+        await channel_layer.group_send(group, event)
@@ -0,0 +1,54 @@
+"""
+Full-text search of the message content.
+
+On PostgreSQL Message.search_vector is kept up to date by a trigger
+and indexed with GIN. SQLite (used by the tests) falls back to an FTS5
+table synced by triggers, other databases to a plain icontains scan.
+The database objects are created by the 0016_message_search_vector
+migration.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "simple"
+FTS5_TABLE = "messagebox_message_fts"
+
+
+def search_messages(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Filter the messages containing all words of the text and annotate
+    their search_rank, the higher the better they match.
+    """
+    words = text.split()
+    if not words:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        )
+    if vendor == "sqlite":
+        # every word is quoted, so the FTS5 query syntax is not exposed
+        match = " ".join(
+            '"{}"'.format(word.replace('"', '""')) for word in words
+        )
+        matching_ids = RawSQL(
+            f"SELECT rowid FROM {FTS5_TABLE} WHERE {FTS5_TABLE} MATCH %s",
+            [match],
+        )
+        # bm25() is lower for better matches
+        rank = RawSQL(
+            f"SELECT -bm25({FTS5_TABLE}) FROM {FTS5_TABLE} "
+            f"WHERE {FTS5_TABLE} MATCH %s "
+            f"AND rowid = messagebox_message.id",
+            [match],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matching_ids).annotate(search_rank=rank)
+    for word in words:
+        queryset = queryset.filter(content__icontains=word)
+    return queryset.annotate(search_rank=Value(0.0))
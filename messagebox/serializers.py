@@ -1,13 +1,18 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from .models import Message, MessageThread
+from core.serializers import DynamicFieldsSerializerMixin
+
+from .models import Message, MessageThread, ReadMarker
 
 User = get_user_model()
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(
+    DynamicFieldsSerializerMixin, serializers.ModelSerializer
+):
     sender = serializers.PrimaryKeyRelatedField(read_only=True)
+    read_status = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = Message
@@ -36,7 +41,9 @@ class MessageContentUpdateSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "receiver", "sender"]
 
 
-class MessageThreadSerializer(serializers.ModelSerializer):
+class MessageThreadSerializer(
+    DynamicFieldsSerializerMixin, serializers.ModelSerializer
+):
     participants = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), many=True
     )
@@ -47,6 +54,27 @@ class MessageThreadSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "participants", "messages", "created_at"]
 
 
+class MessageThreadSummarySerializer(
+    DynamicFieldsSerializerMixin, serializers.ModelSerializer
+):
+    participants = serializers.PrimaryKeyRelatedField(
+        many=True, read_only=True
+    )
+    last_message = MessageSerializer(read_only=True)
+    unread_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = MessageThread
+        fields = [
+            "id",
+            "name",
+            "participants",
+            "last_message",
+            "unread_count",
+            "created_at",
+        ]
+
+
 class MessageThreadParticipantsUpdateSerializer(serializers.ModelSerializer):
     """Limits editable fields to participants only."""
 
@@ -58,3 +86,19 @@ class MessageThreadParticipantsUpdateSerializer(serializers.ModelSerializer):
         model = MessageThread
         fields = ["id", "participants", "name"]
         read_only_fields = ["id"]
+
+
+class ReadMarkerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReadMarker
+        fields = ["user", "thread", "correspondent", "last_read_id"]
+
+
+class MessageSyncSerializer(serializers.Serializer):
+    sync_token = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+    retry_after = serializers.IntegerField()
+    messages = MessageSerializer(many=True)
+    deleted_messages = serializers.ListField(child=serializers.IntegerField())
+    deleted_threads = serializers.ListField(child=serializers.IntegerField())
+    read_markers = ReadMarkerSerializer(many=True)
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from core.permissions import invalidate_permission_context
+
+from .models import Message, MessageChange, MessageThread
+from .realtime import publish_messages
+
+
+@receiver(post_save, sender=Message)
+def record_message_change(
+    sender, instance: Message, created: bool, update_fields, **kwargs
+) -> None:
+    if created:
+        kind = MessageChange.Kind.MESSAGE_CREATED
+    elif update_fields is None or "content" in update_fields:
+        kind = MessageChange.Kind.MESSAGE_UPDATED
+    else:
+        # soft deletions are recorded for the deleting user only
+        return
+    MessageChange.objects.record_messages(kind, [instance])
+
+
+@receiver(post_save, sender=Message)
+def publish_created_message(
+    sender, instance: Message, created: bool, **kwargs
+) -> None:
+    if created:
+        transaction.on_commit(lambda: publish_messages([instance]))
+
+
+@receiver(m2m_changed, sender=MessageThread.participants.through)
+def invalidate_participants_permissions(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    if action == "pre_clear" and not reverse:
+        instance._cleared_participant_ids = set(
+            sender.objects.filter(messagethread_id=instance.pk).values_list(
+                "user_id", flat=True
+            )
+        )
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_participant_ids", set())
+    elif action not in ("post_add", "post_remove"):
+        return
+    invalidate_permission_context([instance.pk] if reverse else pk_set)
@@ -0,0 +1,121 @@
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from model_bakery import baker
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.asgi import application
+from messagebox.models import MessageThread
+
+User = get_user_model()
+
+
+def connect(user=None) -> WebsocketCommunicator:
+    path = "/ws/messagebox/"
+    if user is not None:
+        path += f"?token={AccessToken.for_user(user)}"
+    return WebsocketCommunicator(
+        application, path, headers=[(b"origin", b"http://testserver")]
+    )
+
+
+# the consumers close the database connections between their queries
+@pytest.mark.django_db(transaction=True)
+class TestMessageConsumer:
+    def test_connect_as_anonymous_user(self) -> None:
+        async def run():
+            communicator = connect()
+            connected, _ = await communicator.connect()
+            await communicator.disconnect()
+            return connected
+
+        assert async_to_sync(run)() is False
+
+    def test_connect_with_invalid_token(self) -> None:
+        async def run():
+            communicator = WebsocketCommunicator(
+                application,
+                "/ws/messagebox/?token=invalid",
+                headers=[(b"origin", b"http://testserver")],
+            )
+            connected, _ = await communicator.connect()
+            await communicator.disconnect()
+            return connected
+
+        assert async_to_sync(run)() is False
+
+    def test_receive_direct_message(
+        self,
+        api_client: APIClient,
+        test_sender,
+        test_receiver,
+    ) -> None:
+        api_client.force_authenticate(test_sender)
+
+        def send_message():
+            return api_client.post(
+                "/messagebox/",
+                data={"content": "hello", "receiver": test_receiver.pk},
+                format="json",
+            )
+
+        async def run():
+            communicator = connect(test_receiver)
+            connected, _ = await communicator.connect()
+            assert connected
+            response = await sync_to_async(send_message)()
+            pushed_message = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return response, pushed_message
+
+        response, pushed_message = async_to_sync(run)()
+
+        assert pushed_message["id"] == response.data["id"]
+        assert pushed_message["content"] == "hello"
+        assert pushed_message["sender"] == test_sender.pk
+
+    def test_receive_bulk_thread_messages(
+        self,
+        api_client: APIClient,
+        test_sender,
+        test_receiver,
+    ) -> None:
+        thread = baker.make(
+            MessageThread, participants=[test_sender, test_receiver]
+        )
+        not_participant = baker.make(User)
+        api_client.force_authenticate(test_sender)
+
+        def send_messages():
+            api_client.post(
+                "/messagebox/bulk/",
+                data=[
+                    {"content": "first", "thread": thread.pk},
+                    {"content": "second", "thread": thread.pk},
+                ],
+                format="json",
+            )
+
+        async def run():
+            participant = connect(test_receiver)
+            outsider = connect(not_participant)
+            await participant.connect()
+            await outsider.connect()
+            await sync_to_async(send_messages)()
+            pushed_messages = [
+                await participant.receive_json_from() for _ in range(2)
+            ]
+            outsider_received_nothing = await outsider.receive_nothing()
+            await participant.disconnect()
+            await outsider.disconnect()
+            return pushed_messages, outsider_received_nothing
+
+        pushed_messages, outsider_received_nothing = async_to_sync(run)()
+
+        assert [message["content"] for message in pushed_messages] == [
+            "first",
+            "second",
+        ]
+        assert outsider_received_nothing
@@ -1,10 +1,12 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from model_bakery import baker
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from messagebox.models import Message, MessageThread
+from messagebox.models import Message, MessageThread, ReadMarker
 
 User = get_user_model()
 
@@ -112,6 +114,30 @@ class TestListMessageThread:
         # check number of messages in last thread
         assert len(results[-1].get("messages")) == 25
 
+    def test_get_threads_without_messages_field(
+        self,
+        api_client: APIClient,
+        thread_with_messages,  # quantity = 1, messages quantity = 25
+        test_sender,
+        django_assert_num_queries,
+    ) -> None:
+        api_client.force_authenticate(test_sender)
+
+        # count, threads and participants, the messages are not prefetched
+        with django_assert_num_queries(3):
+            response = api_client.get(
+                "/messagebox/threads/",
+                {"fields": "id,name,participants"},
+                format="json",
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"][0].keys() == {
+            "id",
+            "name",
+            "participants",
+        }
+
     def test_get_threads_as_participant_with_deleted_thread(
         self,
         api_client: APIClient,
@@ -165,6 +191,279 @@ class TestListMessageThread:
         assert response.data["count"] == 0
 
 
+@pytest.mark.django_db
+class TestListMessageThreadSummary:
+    def test_get_threads_summary(
+        self,
+        api_client: APIClient,
+        create_thread_with_deleted_messages,  # messages = 10, without deleted = 5
+        test_sender,
+    ) -> None:
+        thread = create_thread_with_deleted_messages
+        other_participant = thread.participants.exclude(
+            pk=test_sender.pk
+        ).first()
+        baker.make(
+            Message,
+            thread=thread,
+            sender=other_participant,
+            receiver=None,
+            _quantity=3,
+        )
+        last_message = baker.make(
+            Message, thread=thread, sender=test_sender, receiver=None
+        )
+        api_client.force_authenticate(test_sender)
+
+        response = api_client.get(
+            "/messagebox/threads/", {"mode": "summary"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 1
+        result = response.data["results"][0]
+        assert "messages" not in result
+        assert result["last_message"]["id"] == last_message.pk
+        assert result["unread_count"] == 3
+
+    def test_get_threads_summary_without_messages(
+        self,
+        api_client: APIClient,
+        create_threads,  # quantity = 10
+        test_sender,
+    ) -> None:
+        api_client.force_authenticate(test_sender)
+
+        response = api_client.get(
+            "/messagebox/threads/", {"mode": "summary"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        for result in response.data["results"]:
+            assert result["last_message"] is None
+            assert result["unread_count"] == 0
+
+    def test_get_threads_summary_after_reading_thread(
+        self,
+        api_client: APIClient,
+        thread_with_messages,  # messages quantity = 25
+        test_sender,
+    ) -> None:
+        reader, other_participant = thread_with_messages.participants.exclude(
+            pk=test_sender.pk
+        )[:2]
+        api_client.force_authenticate(reader)
+        api_client.get(
+            f"/messagebox/threads/{thread_with_messages.pk}/", format="json"
+        )
+
+        reader_summary = api_client.get(
+            "/messagebox/threads/", {"mode": "summary"}, format="json"
+        )
+        api_client.force_authenticate(other_participant)
+        other_summary = api_client.get(
+            "/messagebox/threads/", {"mode": "summary"}, format="json"
+        )
+
+        assert reader_summary.data["results"][0]["unread_count"] == 0
+        assert other_summary.data["results"][0]["unread_count"] == 25
+
+    def test_get_threads_summary_last_message_read_status(
+        self,
+        api_client: APIClient,
+        thread_with_messages,  # messages quantity = 25
+        test_sender,
+    ) -> None:
+        reader = thread_with_messages.participants.exclude(
+            pk=test_sender.pk
+        ).first()
+        api_client.force_authenticate(reader)
+        unread_summary = api_client.get(
+            "/messagebox/threads/", {"mode": "summary"}, format="json"
+        )
+
+        api_client.get(
+            f"/messagebox/threads/{thread_with_messages.pk}/", format="json"
+        )
+        read_summary = api_client.get(
+            "/messagebox/threads/", {"mode": "summary"}, format="json"
+        )
+
+        last_message = unread_summary.data["results"][0]["last_message"]
+        assert last_message["read_status"] is False
+        last_message = read_summary.data["results"][0]["last_message"]
+        assert last_message["read_status"] is True
+
+    @pytest.mark.parametrize("quantity", [1, 10])
+    def test_get_threads_summary_query_count_is_constant(
+        self,
+        api_client: APIClient,
+        django_assert_num_queries,
+        test_sender,
+        quantity,
+    ) -> None:
+        for thread in baker.make(
+            MessageThread, participants=[test_sender], _quantity=quantity
+        ):
+            baker.make(
+                Message,
+                thread=thread,
+                sender=test_sender,
+                receiver=None,
+                _quantity=5,
+            )
+        api_client.force_authenticate(test_sender)
+
+        # count, threads with annotations, participants, last messages
+        with django_assert_num_queries(4):
+            response = api_client.get(
+                "/messagebox/threads/", {"mode": "summary"}, format="json"
+            )
+
+        assert len(response.data["results"]) == quantity
+
+
+@pytest.mark.django_db
+class TestListMessageThreadMessages:
+    def test_get_thread_messages_as_participant(
+        self,
+        api_client: APIClient,
+        thread_with_messages,  # messages quantity = 25
+        test_sender,
+    ) -> None:
+        baker.make(
+            Message,
+            thread=thread_with_messages,
+            sender=test_sender,
+            receiver=None,
+            _quantity=35,
+        )
+        api_client.force_authenticate(test_sender)
+        url = f"/messagebox/threads/{thread_with_messages.pk}/messages/"
+
+        first_page = api_client.get(url, format="json")
+        second_page = api_client.get(first_page.data["next"], format="json")
+
+        assert first_page.status_code == status.HTTP_200_OK
+        assert len(first_page.data["results"]) == 50
+        assert len(second_page.data["results"]) == 10
+        assert second_page.data["next"] is None
+        assert [
+            message["id"]
+            for page in (first_page, second_page)
+            for message in page.data["results"]
+        ] == list(
+            thread_with_messages.messages.order_by(
+                "-date_sent", "-id"
+            ).values_list("id", flat=True)
+        )
+
+    def test_get_thread_messages_without_deleted_messages(
+        self,
+        api_client: APIClient,
+        create_thread_with_deleted_messages,  # messages = 10, without deleted = 5
+        test_sender,
+    ) -> None:
+        api_client.force_authenticate(test_sender)
+        thread = create_thread_with_deleted_messages
+
+        response = api_client.get(
+            f"/messagebox/threads/{thread.pk}/messages/", format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 5
+        assert response.data["next"] is None
+
+    def test_get_thread_messages_read_status(
+        self,
+        api_client: APIClient,
+        thread_with_messages,  # messages quantity = 25
+        test_sender,
+    ) -> None:
+        reader = thread_with_messages.participants.exclude(
+            pk=test_sender.pk
+        ).first()
+        api_client.force_authenticate(reader)
+
+        detail = api_client.get(
+            f"/messagebox/threads/{thread_with_messages.pk}/", format="json"
+        )
+        response = api_client.get(
+            f"/messagebox/threads/{thread_with_messages.pk}/messages/",
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        read_statuses = {
+            message["id"]: message["read_status"]
+            for message in detail.data["messages"]
+        }
+        assert all(read_statuses.values())
+        assert {
+            message["id"]: message["read_status"]
+            for message in response.data["results"]
+        } == read_statuses
+
+    def test_get_thread_messages_as_not_participant(
+        self,
+        api_client: APIClient,
+        thread_with_messages,
+        not_participant,
+    ) -> None:
+        api_client.force_authenticate(not_participant)
+
+        response = api_client.get(
+            f"/messagebox/threads/{thread_with_messages.pk}/messages/",
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestSearchMessageThread:
+    def test_search_threads_by_message_content(
+        self, api_client: APIClient, test_sender
+    ) -> None:
+        matching_thread, other_thread, deleted_message_thread = baker.make(
+            MessageThread, participants=[test_sender], _quantity=3
+        )
+        baker.make(
+            Message,
+            thread=matching_thread,
+            sender=test_sender,
+            receiver=None,
+            content="lunch tomorrow",
+            _quantity=2,
+        )
+        baker.make(
+            Message,
+            thread=other_thread,
+            sender=test_sender,
+            receiver=None,
+            content="dinner tonight",
+        )
+        baker.make(
+            Message,
+            thread=deleted_message_thread,
+            sender=test_sender,
+            receiver=None,
+            content="lunch tomorrow",
+            deleted_by_sender=True,
+        )
+        api_client.force_authenticate(test_sender)
+
+        response = api_client.get(
+            "/messagebox/threads/", {"q": "lunch"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [thread["id"] for thread in response.data["results"]] == [
+            matching_thread.pk
+        ]
+
+
 @pytest.mark.django_db
 class TestRetrieveMessageThread:
     def test_get_thread_as_anonymous_user(
@@ -209,6 +508,58 @@ class TestRetrieveMessageThread:
         assert response.data["name"] == thread_with_messages.name
         assert len(response.data["messages"]) == 25
 
+    def test_get_thread_after_joining(
+        self,
+        api_client: APIClient,
+        thread_with_messages,
+        not_participant,
+    ) -> None:
+        other_thread = baker.make(
+            MessageThread, participants=[not_participant]
+        )
+        api_client.force_authenticate(not_participant)
+        api_client.get(
+            f"/messagebox/threads/{other_thread.pk}/", format="json"
+        )
+
+        thread_with_messages.participants.add(not_participant)
+        response = api_client.get(
+            f"/messagebox/threads/{thread_with_messages.pk}/", format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_get_thread_marks_messages_read_without_writing_them(
+        self,
+        api_client: APIClient,
+        thread_with_messages,  # quantity = 1, messages quantity = 25
+        test_sender,
+    ) -> None:
+        reader = thread_with_messages.participants.exclude(
+            pk=test_sender.pk
+        ).first()
+        api_client.force_authenticate(reader)
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(
+                f"/messagebox/threads/{thread_with_messages.pk}/",
+                format="json",
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert all(
+            message["read_status"] for message in response.data["messages"]
+        )
+        assert not any(
+            query["sql"].startswith('UPDATE "messagebox_message"')
+            for query in context.captured_queries
+        )
+        assert ReadMarker.objects.get(
+            user=reader, thread=thread_with_messages
+        ).last_read_id == max(
+            thread_with_messages.messages.values_list("id", flat=True)
+        )
+
     def test_get_non_existing_thread(
         self,
         api_client: APIClient,
@@ -1,10 +1,13 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from model_bakery import baker
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from messagebox.models import Message
+from messagebox.models import Message, MessageChange, MessageThread
+from messagebox.views import MessageViewSet
 
 User = get_user_model()
 
@@ -187,6 +190,38 @@ class TestListMessage:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["count"] == 20
 
+    def test_get_messages_with_sparse_fields(
+        self,
+        api_client: APIClient,
+        create_messages,
+        test_receiver,
+    ) -> None:
+        api_client.force_authenticate(test_receiver)
+
+        response = api_client.get(
+            "/messagebox/",
+            {"fields": "id,content", "pagination": "cursor"},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert all(
+            message.keys() == {"id", "content"}
+            for message in response.data["results"]
+        )
+
+    def test_create_message_ignores_fields(
+        self, api_client: APIClient, message_payload, test_sender
+    ) -> None:
+        api_client.force_authenticate(test_sender)
+
+        response = api_client.post(
+            "/messagebox/?fields=id", message_payload, format="json"
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["content"] == message_payload["content"]
+
     def test_get_messages_as_anonymous_user(
         self, api_client: APIClient
     ) -> None:
@@ -206,6 +241,144 @@ class TestListMessage:
         assert response.data["count"] == 0
 
 
+@pytest.mark.django_db
+class TestListMessageWithCursor:
+    def test_get_messages_with_cursor(
+        self, api_client: APIClient, test_receiver, test_sender
+    ) -> None:
+        messages = baker.make(
+            Message,
+            sender=test_sender,
+            receiver=test_receiver,
+            thread=None,
+            _quantity=60,
+        )
+        api_client.force_authenticate(test_receiver)
+
+        first_page = api_client.get(
+            "/messagebox/?pagination=cursor", format="json"
+        )
+        second_page = api_client.get(first_page.data["next"], format="json")
+
+        assert first_page.status_code == status.HTTP_200_OK
+        assert "count" not in first_page.data
+        assert len(first_page.data["results"]) == 50
+        assert len(second_page.data["results"]) == 10
+        assert second_page.data["next"] is None
+        received_ids = [
+            message["id"]
+            for page in (first_page, second_page)
+            for message in page.data["results"]
+        ]
+        assert received_ids == [message.pk for message in reversed(messages)]
+
+    def test_get_sent_and_received_messages_with_cursor(
+        self, api_client: APIClient, test_receiver, test_sender
+    ) -> None:
+        for _ in range(30):
+            baker.make(
+                Message,
+                sender=test_sender,
+                receiver=test_receiver,
+                thread=None,
+            )
+            baker.make(
+                Message,
+                sender=test_receiver,
+                receiver=test_sender,
+                thread=None,
+            )
+        api_client.force_authenticate(test_receiver)
+
+        first_page = api_client.get(
+            "/messagebox/?pagination=cursor", format="json"
+        )
+        second_page = api_client.get(first_page.data["next"], format="json")
+
+        assert len(first_page.data["results"]) == 50
+        assert second_page.data["next"] is None
+        assert [
+            message["id"]
+            for page in (first_page, second_page)
+            for message in page.data["results"]
+        ] == list(
+            Message.objects.order_by("-date_sent", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def test_get_messages_with_invalid_cursor(
+        self, api_client: APIClient, test_receiver
+    ) -> None:
+        api_client.force_authenticate(test_receiver)
+
+        response = api_client.get("/messagebox/?cursor=invalid", format="json")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestSearchMessage:
+    def test_search_messages_by_content(
+        self, api_client: APIClient, test_sender, test_receiver
+    ) -> None:
+        def make_message(content: str, **kwargs) -> Message:
+            return baker.make(
+                Message,
+                content=content,
+                thread=None,
+                **{"sender": test_sender, "receiver": test_receiver, **kwargs},
+            )
+
+        best_match = make_message("concert tickets, concert at eight")
+        match = make_message("Are there tickets for the concert?")
+        make_message("see you at the cinema")
+        make_message("concert tickets", deleted_by_receiver=True)
+        make_message(
+            "concert tickets",
+            sender=test_receiver,
+            receiver=baker.make(User),
+            deleted_by_sender=True,
+        )
+        make_message("concert tickets", receiver=baker.make(User))
+        api_client.force_authenticate(test_receiver)
+
+        response = api_client.get(
+            "/messagebox/", {"q": "Concert tickets"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [message["id"] for message in response.data["results"]] == [
+            best_match.pk,
+            match.pk,
+        ]
+
+    def test_search_messages_with_query_syntax(
+        self, api_client: APIClient, message, test_receiver
+    ) -> None:
+        api_client.force_authenticate(test_receiver)
+
+        response = api_client.get(
+            "/messagebox/", {"q": 'NOT "a OR (b*'}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 0
+
+    def test_search_updated_message(
+        self, api_client: APIClient, message, test_receiver
+    ) -> None:
+        message.content = "rescheduled meeting"
+        message.save()
+        api_client.force_authenticate(test_receiver)
+
+        response = api_client.get(
+            "/messagebox/", {"q": "rescheduled"}, format="json"
+        )
+
+        assert [m["id"] for m in response.data["results"]] == [message.pk]
+
+
 @pytest.mark.django_db
 class TestRetrieveMessage:
     def test_get_message_as_sender(
@@ -344,6 +517,88 @@ class TestCreateMessage:
         assert message.content == message_payload["content"]
 
 
+@pytest.mark.django_db
+class TestBulkCreateMessage:
+    def test_bulk_create_messages(
+        self,
+        api_client: APIClient,
+        test_sender,
+        test_receiver,
+        django_assert_max_num_queries,
+    ) -> None:
+        thread = baker.make(
+            MessageThread, participants=[test_sender, test_receiver]
+        )
+        payload = [
+            {"content": f"direct {number}", "receiver": test_receiver.pk}
+            for number in range(5)
+        ] + [
+            {"content": f"thread {number}", "thread": thread.pk}
+            for number in range(5)
+        ]
+        api_client.force_authenticate(test_sender)
+
+        # validation per message; one membership check, savepoint,
+        # insert, change log recipients and change log insert
+        with django_assert_max_num_queries(len(payload) + 6):
+            response = api_client.post(
+                "/messagebox/bulk/", data=payload, format="json"
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data) == 10
+        assert all(message["id"] for message in response.data)
+        assert Message.objects.filter(sender=test_sender).count() == 10
+
+    def test_bulk_create_messages_as_not_thread_participant(
+        self, api_client: APIClient, test_sender, test_receiver
+    ) -> None:
+        thread = baker.make(MessageThread, participants=[test_receiver])
+        payload = [
+            {"content": "direct", "receiver": test_receiver.pk},
+            {"content": "thread", "thread": thread.pk},
+        ]
+        api_client.force_authenticate(test_sender)
+
+        response = api_client.post(
+            "/messagebox/bulk/", data=payload, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Message.objects.exists()
+
+    def test_bulk_create_too_many_messages(
+        self, api_client: APIClient, test_sender, test_receiver
+    ) -> None:
+        payload = [{"content": "direct", "receiver": test_receiver.pk}] * 101
+        api_client.force_authenticate(test_sender)
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(
+                "/messagebox/bulk/", data=payload, format="json"
+            )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        # rejected before the receivers are looked up
+        assert not any(
+            "users_user" in query["sql"] for query in context.captured_queries
+        )
+        assert not Message.objects.exists()
+
+    def test_bulk_create_messages_not_in_list(
+        self, api_client: APIClient, test_sender, test_receiver
+    ) -> None:
+        payload = {"content": "direct", "receiver": test_receiver.pk}
+        api_client.force_authenticate(test_sender)
+
+        response = api_client.post(
+            "/messagebox/bulk/", data=payload, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Message.objects.exists()
+
+
 @pytest.mark.django_db
 class TestUpdateMessage:
     def test_update_message_as_sender_valid_data(
@@ -528,3 +783,185 @@ class TestDeleteMessage:
 
         assert message.deleted_by_sender is False
         assert message.deleted_by_receiver is True
+
+
+def sync(api_client: APIClient, user, **params):
+    api_client.force_authenticate(user)
+    return api_client.get("/messagebox/sync/", params, format="json")
+
+
+@pytest.mark.django_db
+class TestSyncMessage:
+    def test_sync_as_anonymous_user(self, api_client: APIClient) -> None:
+        response = api_client.get("/messagebox/sync/", format="json")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_sync_without_token(
+        self, api_client: APIClient, message, test_receiver
+    ) -> None:
+        response = sync(api_client, test_receiver)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["sync_token"] > 0
+        assert response.data["messages"] == []
+
+    def test_sync_with_invalid_token(
+        self, api_client: APIClient, test_receiver
+    ) -> None:
+        response = sync(api_client, test_receiver, since="invalid")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_sync_new_and_updated_messages(
+        self, api_client: APIClient, test_sender, test_receiver, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(MessageViewSet, "sync_rescan_window", 0)
+        since = sync(api_client, test_receiver).data["sync_token"]
+        message = baker.make(
+            Message, sender=test_sender, receiver=test_receiver, thread=None
+        )
+        message.content = "updated"
+        message.save()
+
+        response = sync(api_client, test_receiver, since=since)
+
+        assert [m["id"] for m in response.data["messages"]] == [message.pk]
+        assert response.data["messages"][0]["content"] == "updated"
+        assert response.data["has_more"] is False
+        assert response.data["retry_after"] == MessageViewSet.sync_retry_after
+
+        next_response = sync(
+            api_client, test_receiver, since=response.data["sync_token"]
+        )
+        assert next_response.data["messages"] == []
+        assert next_response.data["sync_token"] == response.data["sync_token"]
+
+    def test_sync_deleted_message(
+        self, api_client: APIClient, message, test_sender, test_receiver
+    ) -> None:
+        since = sync(api_client, test_receiver).data["sync_token"]
+        message.perform_soft_delete(test_receiver)
+
+        receiver_response = sync(api_client, test_receiver, since=since)
+        sender_response = sync(api_client, test_sender, since=since)
+
+        assert receiver_response.data["deleted_messages"] == [message.pk]
+        assert sender_response.data["deleted_messages"] == []
+
+    def test_sync_message_updated_after_deletion(
+        self, api_client: APIClient, message, test_sender, test_receiver
+    ) -> None:
+        message.perform_soft_delete(test_receiver)
+        since = sync(api_client, test_receiver).data["sync_token"]
+        message.content = "updated"
+        message.save()
+
+        receiver_response = sync(api_client, test_receiver, since=since)
+        sender_response = sync(api_client, test_sender, since=since)
+
+        assert receiver_response.data["messages"] == []
+        assert [m["id"] for m in sender_response.data["messages"]] == [
+            message.pk
+        ]
+
+    def test_sync_thread_message_updated_after_thread_deletion(
+        self, api_client: APIClient, test_sender, test_receiver
+    ) -> None:
+        thread = baker.make(
+            MessageThread, participants=[test_sender, test_receiver]
+        )
+        message = baker.make(Message, sender=test_sender, thread=thread)
+        thread.perform_soft_delete(test_receiver)
+        since = sync(api_client, test_receiver).data["sync_token"]
+        message.content = "updated"
+        message.save()
+
+        response = sync(api_client, test_receiver, since=since)
+
+        assert response.data["messages"] == []
+
+    def test_sync_read_message(
+        self, api_client: APIClient, message, test_sender, test_receiver
+    ) -> None:
+        since = sync(api_client, test_sender).data["sync_token"]
+        api_client.force_authenticate(test_receiver)
+        api_client.get(f"/messagebox/{message.pk}/", format="json")
+
+        response = sync(api_client, test_sender, since=since)
+
+        assert response.data["read_markers"] == [
+            {
+                "user": test_receiver.pk,
+                "thread": None,
+                "correspondent": test_sender.pk,
+                "last_read_id": message.pk,
+            }
+        ]
+
+    def test_sync_deleted_thread(
+        self, api_client: APIClient, test_sender
+    ) -> None:
+        thread = baker.make(MessageThread, participants=[test_sender])
+        since = sync(api_client, test_sender).data["sync_token"]
+        thread.perform_soft_delete(test_sender)
+
+        response = sync(api_client, test_sender, since=since)
+
+        assert response.data["deleted_threads"] == [thread.pk]
+
+    def test_sync_in_batches(
+        self, api_client: APIClient, test_sender, test_receiver, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(MessageViewSet, "sync_batch_size", 3)
+        monkeypatch.setattr(MessageViewSet, "sync_rescan_window", 0)
+        since = sync(api_client, test_receiver).data["sync_token"]
+        messages = baker.make(
+            Message,
+            sender=test_sender,
+            receiver=test_receiver,
+            thread=None,
+            _quantity=5,
+        )
+
+        first_batch = sync(api_client, test_receiver, since=since)
+        second_batch = sync(
+            api_client,
+            test_receiver,
+            since=first_batch.data["sync_token"],
+        )
+
+        assert first_batch.data["has_more"] is True
+        assert first_batch.data["retry_after"] == 0
+        assert second_batch.data["has_more"] is False
+        assert [
+            message["id"]
+            for batch in (first_batch, second_batch)
+            for message in batch.data["messages"]
+        ] == [message.pk for message in messages]
+
+    def test_sync_change_committed_below_token(
+        self, api_client: APIClient, test_sender, test_receiver
+    ) -> None:
+        since = sync(api_client, test_receiver).data["sync_token"]
+        late_message, message = baker.make(
+            Message,
+            sender=test_sender,
+            receiver=test_receiver,
+            thread=None,
+            _quantity=2,
+        )
+        # the change of the first message is not committed yet
+        late_changes = MessageChange.objects.filter(message=late_message)
+        late_changes.update(user=test_sender)
+        response = sync(api_client, test_receiver, since=since)
+        late_changes.update(user=test_receiver)
+
+        next_response = sync(
+            api_client, test_receiver, since=response.data["sync_token"]
+        )
+
+        assert [m["id"] for m in response.data["messages"]] == [message.pk]
+        assert late_message.pk in [
+            m["id"] for m in next_response.data["messages"]
+        ]
@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from model_bakery import baker
 
-from messagebox.models import Message, MessageThread
+from messagebox.models import Message, MessageThread, ReadMarker
 
 User = get_user_model()
 
@@ -69,6 +69,19 @@ class TestMessageModel:
         ):
             message.save()
 
+    def test_save_checks_participant_without_loading_participants(
+        self, test_sender, django_assert_num_queries
+    ):
+        thread_participants = baker.make(User, _quantity=50)
+        thread_participants.append(test_sender)
+        thread = baker.make(MessageThread, participants=thread_participants)
+        message = Message(thread=thread, sender=test_sender, content="test")
+
+        # participant existence check, insert, change log recipients
+        # and change log insert
+        with django_assert_num_queries(4):
+            message.save()
+
     def test_clean_thread_and_receiver_are_both_none(self):
         message = Message(thread=None, receiver=None)
 
@@ -129,3 +142,76 @@ class TestMessageThreadModel:
         test_thread.perform_soft_delete(user=user)
 
         assert user in test_thread.deleted_by_users.all()
+
+
+@pytest.mark.django_db
+class TestReadMarkerModel:
+    def test_read_status_of_direct_message(self, test_private_message):
+        ReadMarker.objects.mark_read(
+            test_private_message.receiver_id,
+            test_private_message.pk,
+            correspondent_id=test_private_message.sender_id,
+        )
+
+        message = Message.objects.with_read_status().get(
+            pk=test_private_message.pk
+        )
+        assert message.read_status is True
+
+    def test_mark_read_does_not_move_marker_back(self, test_private_message):
+        older_message = test_private_message
+        newer_message = baker.make(
+            Message,
+            thread=None,
+            sender=older_message.sender,
+            receiver=older_message.receiver,
+        )
+        for message in (newer_message, older_message):
+            ReadMarker.objects.mark_read(
+                message.receiver_id,
+                message.pk,
+                correspondent_id=message.sender_id,
+            )
+
+        marker = ReadMarker.objects.get()
+        assert marker.last_read_id == newer_message.pk
+        assert all(
+            message.read_status
+            for message in Message.objects.with_read_status()
+        )
+
+    def test_read_status_of_thread_message(self, test_sender):
+        participant = baker.make(User)
+        thread = baker.make(
+            MessageThread, participants=[test_sender, participant]
+        )
+        message = baker.make(Message, thread=thread, sender=test_sender)
+
+        ReadMarker.objects.mark_read(
+            test_sender.pk, message.pk, thread_id=thread.pk
+        )
+        assert Message.objects.with_read_status().get().read_status is False
+
+        ReadMarker.objects.mark_read(
+            participant.pk, message.pk, thread_id=thread.pk
+        )
+        assert Message.objects.with_read_status().get().read_status is True
+
+    def test_read_status_of_thread_message_per_reader(self, test_sender):
+        reader, other_participant = baker.make(User, _quantity=2)
+        thread = baker.make(
+            MessageThread,
+            participants=[test_sender, reader, other_participant],
+        )
+        message = baker.make(Message, thread=thread, sender=test_sender)
+
+        ReadMarker.objects.mark_read(
+            reader.pk, message.pk, thread_id=thread.pk
+        )
+
+        def read_status(user) -> bool:
+            return Message.objects.with_read_status(user).get().read_status
+
+        assert read_status(reader) is True
+        assert read_status(other_participant) is False
+        assert read_status(test_sender) is True
@@ -0,0 +1,122 @@
+import pytest
+from django.db import connection
+from model_bakery import baker
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from messagebox.filters import MessageFilter
+from messagebox.models import Message
+from messagebox.search import FTS5_TABLE
+from messagebox.views import MessageViewSet
+
+
+@pytest.fixture
+def prefer_indexes():
+    # small test tables are cheaper to scan sequentially
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+def make_inbox_request(user, **params) -> Request:
+    request = Request(APIRequestFactory().get("/messagebox/", params))
+    request.user = user
+    return request
+
+
+@pytest.fixture
+def inbox_request(test_receiver, test_sender):
+    baker.make(
+        Message,
+        sender=test_sender,
+        receiver=test_receiver,
+        thread=None,
+        _quantity=10,
+    )
+    request = make_inbox_request(test_receiver)
+    yield request
+    del request
+
+
+def get_inbox_view(request) -> MessageViewSet:
+    return MessageViewSet(request=request, format_kwarg=None, action="list")
+
+
+def get_inbox_queryset(request):
+    return get_inbox_view(request).get_queryset()
+
+
+def count_sorts(query_plan: str) -> int:
+    if connection.vendor == "postgresql":
+        return query_plan.count("Sort Key")
+    return query_plan.count("USE TEMP B-TREE FOR ORDER BY")
+
+
+@pytest.mark.django_db
+class TestMessageQueryPlans:
+    def test_inbox_uses_partial_indexes(self, prefer_indexes, inbox_request):
+        query_plan = get_inbox_queryset(inbox_request).explain()
+
+        assert "message_sent_idx" in query_plan
+        assert "message_received_idx" in query_plan
+
+    @pytest.mark.parametrize("direction", ["sent", "received"])
+    def test_filtered_inbox_uses_partial_indexes(
+        self, prefer_indexes, inbox_request, direction
+    ):
+        queryset = MessageFilter(
+            {"msg_direction": direction},
+            queryset=get_inbox_queryset(inbox_request),
+            request=inbox_request,
+        ).qs
+
+        query_plan = queryset.explain()
+
+        assert "message_sent_idx" in query_plan
+        assert "message_received_idx" in query_plan
+
+    def test_full_text_search_uses_search_index(
+        self, prefer_indexes, inbox_request
+    ):
+        queryset = MessageFilter(
+            {"q": "hello"},
+            queryset=get_inbox_queryset(inbox_request),
+            request=inbox_request,
+        ).qs
+
+        query_plan = queryset.explain()
+
+        if connection.vendor == "postgresql":
+            assert "message_search_vector_idx" in query_plan
+        else:
+            assert f"{FTS5_TABLE} VIRTUAL TABLE INDEX" in query_plan
+
+    def test_inbox_returns_message_sent_to_self_once(
+        self, inbox_request, test_receiver
+    ):
+        message = baker.make(
+            Message, sender=test_receiver, receiver=test_receiver, thread=None
+        )
+
+        queryset = get_inbox_queryset(inbox_request)
+
+        assert queryset.filter(pk=message.pk).count() == 1
+        assert queryset.count() == 11
+
+    def test_cursor_page_merges_newest_messages_of_each_part(
+        self, prefer_indexes, inbox_request, test_receiver
+    ):
+        request = make_inbox_request(test_receiver, pagination="cursor")
+        view = get_inbox_view(request)
+        queryset = view.get_keyset_page_queryset(view.get_queryset())
+        page_size = view.paginator.keyset_pagination_class.page_size
+
+        page_queryset = queryset[: page_size + 1]
+        query_plan = page_queryset.explain()
+
+        assert "message_sent_idx" in query_plan
+        assert "message_received_idx" in query_plan
+        # each part is read in the index order and limited to a page,
+        # so only the merged rows of both pages are sorted
+        assert count_sorts(query_plan) == 1
+        assert str(page_queryset.query).count(f"LIMIT {page_size + 1}") == 3
@@ -1,38 +1,89 @@
-from django.db.models import Prefetch, Q
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import (
+    BigIntegerField,
+    Count,
+    IntegerField,
+    Max,
+    OuterRef,
+    Prefetch,
+    QuerySet,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema
-from rest_framework import viewsets
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
 
-from .filters import MessageFilter
-from .models import Message, MessageThread
-from .pagination import DefaultPagination
+from core.authentication import StatelessJWTAuthentication
+from core.views import DynamicFieldsViewMixin
+
+from .filters import MessageFilter, MessageThreadFilter
+from .models import Message, MessageChange, MessageThread, ReadMarker
+from .pagination import (
+    DefaultPagination,
+    MessageKeysetPagination,
+    MessagePagination,
+)
 from .permissions import (
     MessageSenderReceiverPermission,
     MessageThreadParticipantPermission,
     MessageUpdatePermission,
 )
+from .realtime import publish_messages
 from .serializers import (
     MessageContentUpdateSerializer,
     MessageSerializer,
+    MessageSyncSerializer,
     MessageThreadParticipantsUpdateSerializer,
     MessageThreadSerializer,
+    MessageThreadSummarySerializer,
 )
 
+User = get_user_model()
 
-class MessageViewSet(viewsets.ModelViewSet):
+
+class MessageViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     """
     GET (list): Retrieve a list of the current user's messages(excluding deleted messages).
 
     Query Parameters:
         - msg_direction: sent, received (default: received)
+        - pagination: page, cursor (default: page)
+            Note: Cursor pagination orders messages from the newest and does not return the total count.
+        - q: full-text search of the message content
+            Note: Matching messages are ordered from the best match, unless cursor pagination is used.
+        - fields: comma-separated names of the returned fields (default: all)
 
     GET (retrieve): Retrieve the details of a specific user's message.
 
+    Query Parameters:
+        - fields: comma-separated names of the returned fields (default: all)
+
+    GET (sync): Retrieve the changes of the user's messages since the given sync token.
+
+    Query Parameters:
+        - since: sync token returned by the previous sync (omit it to get the current token)
+            Note: Changes are returned in batches, has_more is true when there are more to sync,
+            otherwise retry_after is the number of seconds to wait before the next sync.
+            Recent changes may be returned again, applying them is idempotent.
+
     POST: Create and send a private/thread message.
 
+    POST (bulk): Create and send a list of private/thread messages at once.
+        Note: At most 100 messages can be sent in a single request.
+
     PUT: Update the content of a message. It can be done only by the message sender.
         Note: This action replaces the entire message object with the new data.
 
@@ -46,7 +97,8 @@ class MessageViewSet(viewsets.ModelViewSet):
         - date_sent for ordering_fields
     """
 
-    pagination_class = DefaultPagination
+    pagination_class = MessagePagination
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [
         IsAuthenticated,
         MessageSenderReceiverPermission,
@@ -56,26 +108,194 @@ class MessageViewSet(viewsets.ModelViewSet):
     filterset_class = MessageFilter
     search_fields = ["content", "receiver__username"]
     ordering_fields = ["date_sent"]
+    # used by the permissions and Message.__init__
+    required_fields = ("sender", "receiver", "thread", "deleted_by_receiver")
 
     def get_serializer_class(self):
         if self.request.method in ["PUT", "PATCH"]:
             return MessageContentUpdateSerializer
         return MessageSerializer
 
+    bulk_send_limit = 100
+    sync_batch_size = 500
+    # change ids are assigned on insert, a change committed after a later
+    # one can land below the client's token, so the ids just below it
+    # are scanned again on every sync
+    sync_rescan_window = 1000
+    sync_retry_after = 5
+
     def perform_create(self, serializer: BaseSerializer):
         serializer.save(sender=self.request.user)
 
+    @extend_schema(request=MessageSerializer(many=True))
+    @action(detail=False, methods=["post"])
+    def bulk(self, request: Request) -> Response:
+        # checked before the messages are validated one by one
+        if not isinstance(request.data, list):
+            raise ValidationError("Expected a list of messages.")
+        if len(request.data) > self.bulk_send_limit:
+            raise ValidationError(
+                f"Ensure this list has at most {self.bulk_send_limit} messages."
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        messages = [
+            Message(**attrs, sender=request.user)
+            for attrs in serializer.validated_data
+        ]
+        try:
+            Message.objects.bulk_send(messages)
+        except DjangoValidationError as error:
+            raise ValidationError(error.messages)
+        # bulk_create does not send post_save signals
+        transaction.on_commit(lambda: publish_messages(messages))
+        return Response(
+            self.get_serializer(messages, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        parameters=[OpenApiParameter("since", int)],
+        responses=MessageSyncSerializer,
+    )
+    @action(detail=False)
+    def sync(self, request: Request) -> Response:
+        since = self.get_sync_token(request)
+        user_changes = MessageChange.objects.filter(user=request.user)
+        if since is None:
+            last_change = user_changes.order_by("id").last()
+            changes = []
+        else:
+            changes = list(
+                user_changes.filter(id__gt=since).order_by("id")[
+                    : self.sync_batch_size + 1
+                ]
+            )
+            last_change = changes[-1] if changes else None
+        has_more = len(changes) > self.sync_batch_size
+        if has_more:
+            changes = changes[: self.sync_batch_size]
+            last_change = changes[-1]
+        if since is not None:
+            changes += user_changes.filter(
+                id__gt=since - self.sync_rescan_window, id__lte=since
+            )
+
+        sync_token = since or 0
+        if last_change is not None:
+            sync_token = last_change.pk
+        data = {
+            "sync_token": sync_token,
+            "has_more": has_more,
+            "retry_after": 0 if has_more else self.sync_retry_after,
+        }
+        data.update(self.collect_changes(changes))
+        return Response(MessageSyncSerializer(data).data)
+
+    def get_sync_token(self, request: Request) -> int | None:
+        since = request.query_params.get("since")
+        if since is None:
+            return None
+        try:
+            return int(since)
+        except ValueError:
+            raise ValidationError("since must be a number.")
+
+    def collect_changes(self, changes: list[MessageChange]) -> dict:
+        kinds = MessageChange.Kind
+        target_fields = {
+            kinds.THREAD_DELETED: "thread_id",
+            kinds.READ: "read_marker_id",
+        }
+        changed_ids = defaultdict(set)
+        for change in changes:
+            target_field = target_fields.get(change.kind, "message_id")
+            changed_ids[change.kind].add(getattr(change, target_field))
+
+        deleted_message_ids = changed_ids[kinds.MESSAGE_DELETED]
+        # e.g. a message edited by its sender after the receiver deleted it
+        messages = (
+            Message.objects.with_read_status(self.request.user)
+            .visible_to(self.request.user)
+            .filter(
+                pk__in=changed_ids[kinds.MESSAGE_CREATED]
+                | changed_ids[kinds.MESSAGE_UPDATED]
+            )
+            .exclude(pk__in=deleted_message_ids)
+            .order_by("id")
+        )
+        return {
+            "messages": messages,
+            "deleted_messages": sorted(deleted_message_ids),
+            "deleted_threads": sorted(changed_ids[kinds.THREAD_DELETED]),
+            "read_markers": ReadMarker.objects.filter(
+                pk__in=changed_ids[kinds.READ]
+            ),
+        }
+
+    def get_inbox_parts(self, queryset: QuerySet) -> list[QuerySet]:
+        """The user's sent and received messages of the queryset."""
+        user = self.request.user
+        # each part of the union is resolved by its own partial index,
+        # a single OR condition over both columns cannot use them
+        return [
+            queryset.filter(sender=user, deleted_by_sender=False),
+            queryset.filter(receiver=user, deleted_by_receiver=False).exclude(
+                sender=user, deleted_by_sender=False
+            ),
+        ]
+
     def get_queryset(self):
-        return Message.objects.filter(
-            Q(sender=self.request.user, deleted_by_sender=False)
-            | Q(receiver=self.request.user, deleted_by_receiver=False)
+        queryset = self.prune_queryset(
+            Message.objects.with_read_status(self.request.user)
         )
+        if self.action == "list" and self.paginator.is_keyset_requested(
+            self.request
+        ):
+            # limited to the user's messages by paginate_queryset
+            return queryset
+        sent, received = self.get_inbox_parts(Message.objects.order_by())
+        inbox = sent.values("pk").union(received.values("pk"), all=True)
+        return queryset.filter(pk__in=inbox)
+
+    def get_keyset_page_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Limits the filtered queryset to the user's messages of the requested
+        cursor page. Each part of the inbox is sought and limited by its own
+        index, so only their first rows are merged and sorted, not all the
+        user's messages.
+        """
+        keyset = self.paginator.keyset_pagination_class()
+        queryset = keyset.seek(queryset, self.request)
+        limit = keyset.page_size + 1
+        # SQLite allows no LIMIT directly in the parts of a union
+        sent, received = [
+            Message.objects.filter(pk__in=part.values("pk")[:limit])
+            .order_by()
+            .values("pk")
+            for part in self.get_inbox_parts(queryset)
+        ]
+        return queryset.filter(pk__in=sent.union(received, all=True))
+
+    def paginate_queryset(self, queryset: QuerySet) -> list | None:
+        if self.action == "list" and self.paginator.is_keyset_requested(
+            self.request
+        ):
+            queryset = self.get_keyset_page_queryset(queryset)
+        return super().paginate_queryset(queryset)
 
     def get_object(self) -> Message:
         message: Message = super().get_object()
-        if self.request.user == message.receiver and not message.read_status:
+        if (
+            self.request.user.pk == message.receiver_id
+            and not message.read_status
+        ):
+            ReadMarker.objects.mark_read(
+                message.receiver_id,
+                message.pk,
+                correspondent_id=message.sender_id,
+            )
             message.read_status = True
-            message.save()
         return message
 
     def perform_destroy(self, instance: Message):
@@ -83,10 +303,27 @@ class MessageViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema(tags=["threads"])
-class MessageThreadViewSet(viewsets.ModelViewSet):
+class MessageThreadViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     """
+    GET (list): Retrieve a list of the current user's message threads, including their messages.
+
+    Query Parameters:
+        - mode: full, summary (default: full)
+            Note: Summary lists only the last message and the number of unread messages of each thread.
+        - q: full-text search of the thread messages content
+        - fields: comma-separated names of the returned fields (default: all)
+
     GET (retrieve): Retrieve the details of a specific message thread, including it's messages.
 
+    Query Parameters:
+        - fields: comma-separated names of the returned fields (default: all)
+
+    GET (messages): Retrieve the messages of a specific message thread, from the newest.
+        Note: Messages are paginated with a cursor.
+
+    Query Parameters:
+        - fields: comma-separated names of the returned message fields (default: all)
+
     POST: Create a new message thread with the specified participants.
 
     PUT: Update the participants of a message thread.
@@ -102,38 +339,134 @@ class MessageThreadViewSet(viewsets.ModelViewSet):
         - created_at for ordering_fields
     """
 
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticated, MessageThreadParticipantPermission]
     pagination_class = DefaultPagination
-    filter_backends = [SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_class = MessageThreadFilter
     search_fields = ["messages__content", "participants__username"]
     ordering_fields = ["created_at"]
 
     def get_serializer_class(self):
         if self.request.method in ["PUT", "PATCH"]:
             return MessageThreadParticipantsUpdateSerializer
+        if self.is_summary_requested():
+            return MessageThreadSummarySerializer
         return MessageThreadSerializer
 
+    def is_summary_requested(self) -> bool:
+        return (
+            self.action == "list"
+            and self.request.query_params.get("mode") == "summary"
+        )
+
     def perform_create(self, serializer: BaseSerializer):
         participants = serializer.validated_data.get("participants", [])
         participants.append(self.request.user)
         serializer.save(participants=participants)
 
     def get_queryset(self):
-        filtered_messages = Message.objects.exclude(
-            sender=self.request.user, deleted_by_sender=True
-        )
-        return (
+        filtered_messages = Message.objects.with_read_status(
+            self.request.user
+        ).exclude(sender=self.request.user, deleted_by_sender=True)
+        queryset = (
             MessageThread.objects.filter(participants=self.request.user)
             .exclude(deleted_by_users=self.request.user)
-            .prefetch_related(Prefetch("messages", queryset=filtered_messages))
+            .prefetch_related(
+                Prefetch("participants", queryset=User.objects.only("id"))
+            )
+        )
+        if self.action == "messages":
+            return queryset
+        queryset = self.prune_queryset(queryset)
+        if self.is_summary_requested():
+            return self.annotate_summary(queryset, filtered_messages)
+        if not self.is_field_requested("messages"):
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch("messages", queryset=filtered_messages)
+        )
+
+    def annotate_summary(self, queryset, filtered_messages):
+        user = self.request.user
+        thread_messages = filtered_messages.filter(
+            thread=OuterRef("pk")
+        ).order_by()
+        last_message = thread_messages.order_by("-date_sent", "-id")
+        last_read_id = ReadMarker.objects.filter(
+            thread=OuterRef("pk"), user=user
+        ).values("last_read_id")
+        unread_messages = (
+            thread_messages.filter(id__gt=OuterRef("last_read_id"))
+            .exclude(sender=user)
+            .values("thread")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        if self.is_field_requested("last_message"):
+            queryset = queryset.annotate(
+                last_message_id=Subquery(last_message.values("id")[:1])
+            )
+        if not self.is_field_requested("unread_count"):
+            return queryset
+        return queryset.annotate(
+            last_read_id=Coalesce(
+                Subquery(last_read_id), 0, output_field=BigIntegerField()
+            ),
+            unread_count=Coalesce(
+                Subquery(unread_messages, output_field=IntegerField()), 0
+            ),
+        )
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        if not self.is_summary_requested():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if self.is_field_requested("last_message"):
+            last_messages = Message.objects.with_read_status(
+                request.user
+            ).in_bulk([thread.last_message_id for thread in page])
+            for thread in page:
+                thread.last_message = last_messages.get(thread.last_message_id)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, pagination_class=MessageKeysetPagination)
+    def messages(self, request: Request, pk=None) -> Response:
+        message_thread = self.get_object()
+        messages = (
+            Message.objects.with_read_status(request.user)
+            .filter(thread=message_thread)
+            .exclude(sender=request.user, deleted_by_sender=True)
+        )
+        page = self.paginate_queryset(messages)
+        serializer = MessageSerializer(
+            page, many=True, context=self.get_serializer_context()
         )
+        return self.get_paginated_response(serializer.data)
 
     def get_object(self) -> MessageThread:
         message_thread: MessageThread = super().get_object()
-        message_thread.messages.filter(read_status=False).update(
-            read_status=True
-        )
+        if self.request.method == "GET":
+            self.mark_thread_read(message_thread)
         return message_thread
 
+    def mark_thread_read(self, message_thread: MessageThread) -> None:
+        user = self.request.user
+        last_message_id = message_thread.messages.aggregate(
+            last_message_id=Max("id")
+        )["last_message_id"]
+        if last_message_id is None:
+            return
+        ReadMarker.objects.mark_read(
+            user.pk, last_message_id, thread_id=message_thread.pk
+        )
+        if self.action == "retrieve":
+            # the prefetched messages were annotated before being read
+            for message in message_thread.messages.all():
+                if message.sender_id != user.pk:
+                    message.read_status = True
+
     def perform_destroy(self, instance: MessageThread) -> None:
         instance.perform_soft_delete(self.request.user)
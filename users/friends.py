@@ -0,0 +1,100 @@
+"""
+Friend graph lookups backed by an adjacency cache.
+
+Each user's active friends are cached as a sorted tuple of ids,
+so mutual friends and suggestions are computed without joins.
+The cached entries are dropped by the signal handlers in signals.py.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.queries import first_in_groups
+
+from .models import User
+
+
+def friends_cache_key(user_id: int) -> str:
+    return f"users:friends:{user_id}"
+
+
+def get_friend_ids(user_ids: Iterable[int]) -> dict[int, tuple[int, ...]]:
+    """Map each of the users to the sorted ids of their active friends."""
+    keys = {user_id: friends_cache_key(user_id) for user_id in user_ids}
+    cached = cache.get_many(keys.values())
+    friend_ids = {
+        user_id: cached[key] for user_id, key in keys.items() if key in cached
+    }
+
+    missing_ids = keys.keys() - friend_ids.keys()
+    if missing_ids:
+        loaded = {user_id: [] for user_id in missing_ids}
+        for user_id, friend_id in (
+            User.friends.through.objects.filter(
+                from_user_id__in=missing_ids, to_user__is_active=True
+            )
+            .order_by("from_user_id", "to_user_id")
+            .values_list("from_user_id", "to_user_id")
+        ):
+            loaded[user_id].append(friend_id)
+        loaded = {user_id: tuple(ids) for user_id, ids in loaded.items()}
+        cache.set_many(
+            {keys[user_id]: ids for user_id, ids in loaded.items()},
+            settings.USERS_FRIENDS_CACHE_TIMEOUT,
+        )
+        friend_ids.update(loaded)
+    return friend_ids
+
+
+def get_first_friend_ids(
+    user_ids: Iterable[int], limit: int
+) -> dict[int, list[int]]:
+    """
+    Map each of the users to the lowest ids of their active friends,
+    at most limit of them, bounded in the database instead of the cache.
+    """
+    friendships = User.friends.through.objects.filter(
+        from_user_id__in=user_ids, to_user__is_active=True
+    )
+    first_friend_ids = {user_id: [] for user_id in user_ids}
+    for user_id, friend_id in (
+        User.friends.through.objects.filter(
+            pk__in=first_in_groups(
+                friendships, "from_user_id", "to_user_id", limit
+            )
+        )
+        .order_by("from_user_id", "to_user_id")
+        .values_list("from_user_id", "to_user_id")
+    ):
+        first_friend_ids[user_id].append(friend_id)
+    return first_friend_ids
+
+
+def invalidate_friend_ids(user_ids: Iterable[int]) -> None:
+    cache.delete_many([friends_cache_key(user_id) for user_id in user_ids])
+
+
+def get_mutual_friend_ids(user_id: int, other_user_id: int) -> list[int]:
+    friend_ids = get_friend_ids([user_id, other_user_id])
+    return sorted(
+        set(friend_ids[user_id]).intersection(friend_ids[other_user_id])
+    )
+
+
+def suggest_friend_ids(user_id: int, limit: int) -> list[tuple[int, int]]:
+    """
+    Friends of the user's friends, who are not their friends yet,
+    with the number of mutual friends, from the most mutual friends.
+    """
+    friend_ids = get_friend_ids([user_id])[user_id]
+    mutual_friends_counts = Counter()
+    for ids in get_friend_ids(friend_ids).values():
+        mutual_friends_counts.update(ids)
+    for excluded_id in (user_id, *friend_ids):
+        mutual_friends_counts.pop(excluded_id, None)
+    return sorted(
+        mutual_friends_counts.items(), key=lambda item: (-item[1], item[0])
+    )[:limit]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.13 on 2026-10-18 02:20
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TRIGRAM_INDEXED_FIELDS = ["username", "first_name", "last_name", "email"]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes are PostgreSQL specific, other databases
+    # search the users with icontains
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in TRIGRAM_INDEXED_FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX user_{field}_trgm_idx ON users_user "
+            f"USING gin ({field} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in TRIGRAM_INDEXED_FIELDS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS user_{field}_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0008_usergroup_is_deleted"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.13 on 2026-10-18 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_user_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="usergroup",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
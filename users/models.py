@@ -12,6 +12,7 @@ class User(AbstractUser):
         null=True,
         blank=True,
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return self.username
@@ -30,6 +31,7 @@ class UserGroup(models.Model):
     administrators = models.ManyToManyField(User, related_name="groups_admin")
     members = models.ManyToManyField(User, related_name="groups_member")
     is_deleted = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return self.name
@@ -1,5 +1,17 @@
 from rest_framework.pagination import PageNumberPagination
 
+from core.pagination import KeysetPagination, PageNumberOrKeysetPagination
+
 
 class DefaultPagination(PageNumberPagination):
     page_size = 50
+
+
+class UserKeysetPagination(KeysetPagination):
+    page_size = 50
+    ordering = ("username", "id")
+
+
+class UserPagination(PageNumberOrKeysetPagination):
+    page_size = 50
+    keyset_pagination_class = UserKeysetPagination
@@ -2,6 +2,8 @@ from rest_framework import permissions
 from rest_framework.request import Request
 from rest_framework.views import APIView
 
+from core.permissions import get_permission_context
+
 from .models import User, UserGroup
 
 
@@ -26,6 +28,6 @@ class UserGroupPermission(permissions.BasePermission):
     def has_object_permission(
         self, request: Request, view: APIView, obj: UserGroup
     ) -> bool:
-        if request.user in obj.administrators.all():
+        if obj.pk in get_permission_context(request).admin_group_ids:
             return True
         return request.method in permissions.SAFE_METHODS
@@ -0,0 +1,160 @@
+"""
+Type-ahead search of users.
+
+search_users() uses the pg_trgm GIN indexes created by the
+0009_user_trigram_indexes migration on PostgreSQL, other databases fall
+back to icontains. UserPrefixIndex answers autocomplete requests from
+memory, without querying the database once it is built.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, FloatField, Q, QuerySet, Value, When
+from django.db.models.functions import Greatest
+
+from .models import User
+
+SEARCH_FIELDS = ("username", "first_name", "last_name", "email")
+
+
+def search_users(queryset: QuerySet, text: str, limit: int) -> QuerySet:
+    """
+    Return at most limit users matching the text, annotated with
+    their similarity and ordered from the most similar.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        # "field %> text" is resolved by the field's trigram index
+        matches = Q()
+        for field in SEARCH_FIELDS:
+            matches |= Q(**{f"{field}__trigram_word_similar": text})
+        similarity = Greatest(
+            *(TrigramWordSimilarity(text, field) for field in SEARCH_FIELDS)
+        )
+    else:
+        matches = Q()
+        for field in SEARCH_FIELDS:
+            matches |= Q(**{f"{field}__icontains": text})
+        similarity = Case(
+            When(username__iexact=text, then=Value(1.0)),
+            When(username__istartswith=text, then=Value(0.8)),
+            When(
+                Q(first_name__istartswith=text)
+                | Q(last_name__istartswith=text),
+                then=Value(0.6),
+            ),
+            default=Value(0.3),
+            output_field=FloatField(),
+        )
+    return (
+        queryset.filter(matches)
+        .annotate(similarity=similarity)
+        .order_by("-similarity", "username")[:limit]
+    )
+
+
+def autocomplete_users(queryset: QuerySet, prefix: str, limit: int) -> list:
+    """
+    The users whose username or names start with the prefix, looked up in
+    the database while the prefix index is not built yet.
+    """
+    matches = Q()
+    for field in ("username", "first_name", "last_name"):
+        matches |= Q(**{f"{field}__istartswith": prefix})
+    return list(
+        queryset.filter(matches)
+        .order_by("username")
+        .values("id", "username", "first_name", "last_name")[:limit]
+    )
+
+
+class UserPrefixIndex:
+    """
+    Sorted (word, user) pairs of the active users' usernames and names,
+    looked up with a binary search. The index is rebuilt in a background
+    thread after a user changes in this process or when it gets older
+    than the ttl, the previous one is served in the meantime.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.index = None
+        self.built_at = None
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self.stale = True
+
+    def is_stale(self) -> bool:
+        return (
+            self.stale
+            or self.index is None
+            or time.monotonic() - self.built_at > self.ttl
+        )
+
+    def build(self) -> None:
+        # changes saved during the build make it stale again
+        self.stale = False
+        users = {}
+        words = []
+        for user_id, username, first_name, last_name in User.objects.filter(
+            is_active=True
+        ).values_list("id", "username", "first_name", "last_name"):
+            users[user_id] = {
+                "id": user_id,
+                "username": username,
+                "first_name": first_name,
+                "last_name": last_name,
+            }
+            for word in {username, first_name, last_name}:
+                if word:
+                    words.append(
+                        (word.casefold(), username.casefold(), user_id)
+                    )
+        words.sort()
+        # replaced at once, lookups may run in other threads
+        self.index = (users, words)
+        self.built_at = time.monotonic()
+
+    def refresh(self) -> None:
+        """Rebuild the index in a background thread, unless one is running."""
+        if self.lock.acquire(blocking=False):
+            threading.Thread(target=self.build_in_thread, daemon=True).start()
+
+    def build_in_thread(self) -> None:
+        try:
+            self.build()
+        finally:
+            self.lock.release()
+            # the thread's own database connection
+            connections.close_all()
+
+    def lookup(self, prefix: str, limit: int) -> list[dict] | None:
+        """The matching users, None until the index is built."""
+        if self.is_stale():
+            self.refresh()
+        index = self.index
+        if index is None:
+            return None
+        users, words = index
+        prefix = prefix.casefold()
+        user_ids = []
+        position = bisect_left(words, (prefix,))
+        while (
+            position < len(words)
+            and words[position][0].startswith(prefix)
+            and len(user_ids) < limit
+        ):
+            user_id = words[position][2]
+            if user_id not in user_ids:
+                user_ids.append(user_id)
+            position += 1
+        return [users[user_id] for user_id in user_ids]
+
+
+prefix_index = UserPrefixIndex(ttl=settings.USERS_AUTOCOMPLETE_INDEX_TTL)
@@ -1,9 +1,16 @@
+from django.db import transaction
 from rest_framework import serializers
 
+from core.serializers import DynamicFieldsSerializerMixin, PrimaryKeyListField
+
 from .models import User, UserGroup
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(
+    DynamicFieldsSerializerMixin, serializers.ModelSerializer
+):
+    friends_count = serializers.IntegerField(read_only=True)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         request = self.context["request"]
@@ -12,7 +19,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             request.user.is_authenticated and request.user == self.instance
         ):
             # TODO move this logic to a view and add group_member, and group_admin
-            self.fields.pop("email")
+            self.fields.pop("email", None)
 
     class Meta:
         model = User
@@ -24,20 +31,129 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "profile_picture",
             "birth_date",
             "friends",
+            "friends_count",
             "email",
         ]
         read_only_fields = ["id", "username", "email"]
 
 
-class UserGroupSerializer(serializers.ModelSerializer):
-    administrators = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(), many=True
+class UserListSerializer(UserProfileSerializer):
+    """
+    Profiles listed with the number of friends only, unless the friends
+    are expanded with a bounded list of ids set by the view.
+    """
+
+    friends = serializers.ListField(
+        child=serializers.IntegerField(),
+        source="expanded_friend_ids",
+        read_only=True,
     )
-    members = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(), many=True
+
+    class Meta(UserProfileSerializer.Meta):
+        expandable_fields = ["friends"]
+
+
+class UserAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ["id", "username", "first_name", "last_name"]
+
+
+class UserSearchSerializer(serializers.ModelSerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "username",
+            "first_name",
+            "last_name",
+            "profile_picture",
+            "similarity",
+        ]
+
+
+def filter_active_user_ids(
+    fields: dict[str, list[int]], leave_out_unknown: bool = False
+) -> dict[str, list[int]]:
+    """
+    Checks the users listed in all the fields with a single query.
+    Returns the ids without duplicates and inactive users. Unknown ids
+    are rejected like PrimaryKeyRelatedField does, unless they are left
+    out as well.
+    """
+    is_active = dict(
+        User.objects.filter(
+            pk__in={pk for ids in fields.values() for pk in ids}
+        ).values_list("pk", "is_active")
     )
+    if not leave_out_unknown:
+        does_not_exist = (
+            serializers.PrimaryKeyRelatedField.default_error_messages[
+                "does_not_exist"
+            ]
+        )
+        errors = {}
+        for field, ids in fields.items():
+            unknown_ids = [
+                pk for pk in dict.fromkeys(ids) if pk not in is_active
+            ]
+            if unknown_ids:
+                errors[field] = [
+                    does_not_exist.format(pk_value=pk) for pk in unknown_ids
+                ]
+        if errors:
+            raise serializers.ValidationError(errors)
+    return {
+        field: [pk for pk in dict.fromkeys(ids) if is_active.get(pk)]
+        for field, ids in fields.items()
+    }
+
+
+class UserGroupSerializer(serializers.ModelSerializer):
+    administrators = PrimaryKeyListField()
+    members = PrimaryKeyListField()
 
     class Meta:
         model = UserGroup
         fields = ["id", "name", "description", "administrators", "members"]
         read_only_fields = ["id"]
+
+    def validate(self, attrs: dict) -> dict:
+        user_fields = {
+            field: attrs[field]
+            for field in ("administrators", "members")
+            if field in attrs
+        }
+        # new groups leave out unknown users, updates reject them
+        attrs.update(
+            filter_active_user_ids(
+                user_fields, leave_out_unknown=self.instance is None
+            )
+        )
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data: dict) -> UserGroup:
+        administrators = validated_data.pop("administrators", [])
+        members = validated_data.pop("members", [])
+        usergroup = UserGroup.objects.create(**validated_data)
+        # add() inserts all memberships of a relation with a single query
+        usergroup.administrators.add(*administrators)
+        usergroup.members.add(*members)
+        return usergroup
+
+
+class UserGroupMembershipSerializer(serializers.Serializer):
+    users = PrimaryKeyListField(allow_empty=False)
+
+
+class UserSuggestionSerializer(UserAutocompleteSerializer):
+    mutual_friends_count = serializers.IntegerField(read_only=True)
+
+    class Meta(UserAutocompleteSerializer.Meta):
+        fields = UserAutocompleteSerializer.Meta.fields + [
+            "profile_picture",
+            "mutual_friends_count",
+        ]
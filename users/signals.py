@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.authentication import invalidate_user_active
+from core.cache import bump_version
+from core.permissions import invalidate_permission_context
+
+from .friends import get_friend_ids, invalidate_friend_ids
+from .models import User, UserGroup
+from .search import prefix_index
+
+INDEXED_FIELDS = {"username", "first_name", "last_name", "is_active"}
+PROFILE_FIELDS = {
+    "username",
+    "first_name",
+    "last_name",
+    "profile_picture",
+    "birth_date",
+    "email",
+    "is_active",
+}
+
+
+@receiver(post_save, sender=User)
+def invalidate_prefix_index(
+    sender, instance: User, update_fields, **kwargs
+) -> None:
+    # e.g. logging in only updates last_login
+    if update_fields is None or INDEXED_FIELDS & set(update_fields):
+        prefix_index.invalidate()
+        transaction.on_commit(prefix_index.refresh)
+
+
+@receiver(post_save, sender=User)
+def invalidate_friends_of_user(
+    sender, instance: User, created: bool, update_fields, **kwargs
+) -> None:
+    # the cached friend lists skip inactive users
+    if created or not (update_fields is None or "is_active" in update_fields):
+        return
+    invalidate_friend_ids(get_friend_ids([instance.pk])[instance.pk])
+
+
+@receiver(post_save, sender=User)
+def revoke_user_tokens(
+    sender, instance: User, created: bool, update_fields, **kwargs
+) -> None:
+    # tokens of the deactivated users are rejected once their cached
+    # is_active flag is dropped
+    if created or not (update_fields is None or "is_active" in update_fields):
+        return
+    invalidate_user_active(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_profiles(
+    sender, instance: User, created: bool, update_fields, **kwargs
+) -> None:
+    if created or not (
+        update_fields is None or PROFILE_FIELDS & set(update_fields)
+    ):
+        return
+    user_ids = [instance.pk]
+    if update_fields is None or "is_active" in update_fields:
+        # the friends counts of the friends include active users only
+        friend_ids = get_friend_ids([instance.pk])[instance.pk]
+        user_ids.extend(friend_ids)
+        User.objects.filter(pk__in=friend_ids).update(
+            updated_at=timezone.now()
+        )
+        # and so do the groups' members and administrators
+        UserGroup.objects.filter(
+            Q(members=instance) | Q(administrators=instance)
+        ).update(updated_at=timezone.now())
+    bump_version(*(f"users:{user_id}" for user_id in user_ids))
+
+
+@receiver(m2m_changed, sender=User.friends.through)
+def invalidate_changed_friends(
+    sender, instance: User, action: str, pk_set, **kwargs
+) -> None:
+    if action == "pre_clear":
+        # the cleared friends are unknown once they are removed
+        instance._cleared_pk_set = set(
+            sender.objects.filter(from_user_id=instance.pk).values_list(
+                "to_user_id", flat=True
+            )
+        )
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_pk_set", set())
+    elif action not in ("post_add", "post_remove"):
+        return
+    user_ids = {instance.pk, *pk_set}
+    invalidate_friend_ids(user_ids)
+    bump_version(*(f"users:{user_id}" for user_id in user_ids))
+    User.objects.filter(pk__in=user_ids).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=UserGroup.administrators.through)
+@receiver(m2m_changed, sender=UserGroup.members.through)
+def invalidate_group_users_permissions(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    if action == "pre_clear":
+        # events.signals keeps the cleared members under its own name
+        instance._cleared_membership_ids = set(
+            sender.objects.filter(
+                **{"user_id" if reverse else "usergroup_id": instance.pk}
+            ).values_list("usergroup_id" if reverse else "user_id", flat=True)
+        )
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_membership_ids", set())
+    elif action not in ("post_add", "post_remove"):
+        return
+    invalidate_permission_context([instance.pk] if reverse else pk_set)
+    group_ids = pk_set if reverse else [instance.pk]
+    UserGroup.objects.filter(pk__in=group_ids).update(
+        updated_at=timezone.now()
+    )
@@ -1,9 +1,18 @@
 import pytest
 from rest_framework.test import APIClient
 
+from users.search import prefix_index
+
 
 @pytest.fixture
 def api_client():
     client = APIClient()
     yield client
     del client
+
+
+@pytest.fixture(autouse=True)
+def prefix_index_built_in_place(monkeypatch):
+    # a background thread would not see the data of the test transaction
+    monkeypatch.setattr(prefix_index, "refresh", prefix_index.build)
+    prefix_index.invalidate()
@@ -4,6 +4,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from users.models import User
+from users.search import prefix_index
 
 
 @pytest.fixture
@@ -40,6 +41,362 @@ class TestListUser:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["count"] == 10
 
+    def test_get_users_with_cursor(self, api_client: APIClient) -> None:
+        for username in ["carol", "alice", "dave", "bob"]:
+            baker.make(User, username=username)
+        baker.make(User, username="eve", is_active=False)
+
+        response = api_client.get("/users/?pagination=cursor", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["next"] is None
+        assert [user["username"] for user in response.data["results"]] == [
+            "alice",
+            "bob",
+            "carol",
+            "dave",
+        ]
+
+    def test_get_users_without_friends(self, api_client: APIClient) -> None:
+        user = baker.make(User)
+        user.friends.add(*baker.make(User, _quantity=3))
+
+        response = api_client.get("/users/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert all("friends" not in user for user in response.data["results"])
+        assert {
+            user["id"]: user["friends_count"]
+            for user in response.data["results"]
+        }[user.pk] == 3
+
+    def test_get_users_with_expanded_friends(
+        self, api_client: APIClient
+    ) -> None:
+        user = baker.make(User, username="a")
+        friends = baker.make(User, _quantity=60)
+        user.friends.add(*friends)
+        friends[0].is_active = False
+        friends[0].save()
+
+        response = api_client.get(
+            "/users/", {"expand": "friends", "ordering": "id"}, format="json"
+        )
+
+        profile = response.data["results"][0]
+        assert profile["friends_count"] == 59
+        assert profile["friends"] == [friend.pk for friend in friends[1:51]]
+
+    @pytest.mark.parametrize("quantity", [1, 10])
+    @pytest.mark.parametrize("expand, queries", [("", 3), ("friends", 4)])
+    def test_get_users_query_count_is_constant(
+        self,
+        api_client: APIClient,
+        django_assert_num_queries,
+        quantity,
+        expand,
+        queries,
+    ) -> None:
+        for user in baker.make(User, _quantity=quantity):
+            user.friends.add(*baker.make(User, _quantity=3))
+
+        # validators, count, users with friends counts
+        # (and their first friend ids)
+        with django_assert_num_queries(queries):
+            response = api_client.get(
+                "/users/", {"expand": expand}, format="json"
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == quantity * 4
+
+    def test_get_users_with_sparse_fields(
+        self, api_client: APIClient, django_assert_num_queries
+    ) -> None:
+        baker.make(User, _quantity=3)
+
+        # validators, count and users, without the friends counts
+        with django_assert_num_queries(3) as context:
+            response = api_client.get(
+                "/users/", {"fields": "id,username"}, format="json"
+            )
+
+        assert all(
+            user.keys() == {"id", "username"}
+            for user in response.data["results"]
+        )
+        assert "birth_date" not in context.captured_queries[-1]["sql"]
+
+    def test_get_own_profile_with_sparse_fields(
+        self, api_client: APIClient
+    ) -> None:
+        user = baker.make(User)
+        api_client.force_authenticate(user)
+
+        response = api_client.get(
+            f"/users/{user.pk}/", {"fields": "email"}, format="json"
+        )
+
+        assert response.data == {"email": user.email}
+
+
+@pytest.fixture
+def friend_graph():
+    # alice - bob, carol, dave; bob - carol, eve; carol - eve; dave - frank
+    users = {
+        username: baker.make(User, username=username)
+        for username in ["alice", "bob", "carol", "dave", "eve", "frank"]
+    }
+    for username, friends in [
+        ("alice", ["bob", "carol", "dave"]),
+        ("bob", ["carol", "eve"]),
+        ("carol", ["eve"]),
+        ("dave", ["frank"]),
+    ]:
+        users[username].friends.add(*(users[friend] for friend in friends))
+    yield users
+    del users
+
+
+@pytest.mark.django_db
+class TestUserFriends:
+    def test_get_friends(self, api_client: APIClient, friend_graph) -> None:
+        response = api_client.get(
+            f"/users/{friend_graph['alice'].pk}/friends/", format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 3
+        assert {user["username"] for user in response.data["results"]} == {
+            "bob",
+            "carol",
+            "dave",
+        }
+
+    def test_get_friends_next_page(self, api_client: APIClient) -> None:
+        user = baker.make(User)
+        user.friends.add(*baker.make(User, _quantity=60))
+
+        first_page = api_client.get(f"/users/{user.pk}/friends/")
+        second_page = api_client.get(first_page.data["next"])
+
+        assert first_page.data["count"] == 60
+        assert len(first_page.data["results"]) == 50
+        assert len(second_page.data["results"]) == 10
+
+    def test_get_friends_skips_inactive_users(
+        self, api_client: APIClient, friend_graph
+    ) -> None:
+        api_client.get(f"/users/{friend_graph['alice'].pk}/friends/")
+        friend_graph["bob"].is_active = False
+        friend_graph["bob"].save()
+
+        response = api_client.get(
+            f"/users/{friend_graph['alice'].pk}/friends/", format="json"
+        )
+
+        assert {user["username"] for user in response.data["results"]} == {
+            "carol",
+            "dave",
+        }
+
+    def test_get_friends_after_change(
+        self, api_client: APIClient, friend_graph
+    ) -> None:
+        alice = friend_graph["alice"]
+        api_client.get(f"/users/{alice.pk}/friends/")
+
+        alice.friends.remove(friend_graph["bob"])
+        friend_graph["eve"].friends.add(alice)
+
+        response = api_client.get(f"/users/{alice.pk}/friends/", format="json")
+
+        assert {user["username"] for user in response.data["results"]} == {
+            "carol",
+            "dave",
+            "eve",
+        }
+
+    def test_get_mutual_friends_as_anonymous_user(
+        self, api_client: APIClient, friend_graph
+    ) -> None:
+        response = api_client.get(
+            f"/users/{friend_graph['bob'].pk}/mutual_friends/", format="json"
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_get_mutual_friends(
+        self, api_client: APIClient, friend_graph
+    ) -> None:
+        api_client.force_authenticate(friend_graph["alice"])
+
+        response = api_client.get(
+            f"/users/{friend_graph['eve'].pk}/mutual_friends/", format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [user["username"] for user in response.data["results"]] == [
+            "bob",
+            "carol",
+        ]
+
+    def test_get_suggestions(
+        self, api_client: APIClient, friend_graph
+    ) -> None:
+        api_client.force_authenticate(friend_graph["alice"])
+
+        response = api_client.get("/users/suggestions/", format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [
+            (user["username"], user["mutual_friends_count"])
+            for user in response.data
+        ] == [("eve", 2), ("frank", 1)]
+
+    def test_get_suggestions_with_limit(
+        self, api_client: APIClient, friend_graph
+    ) -> None:
+        api_client.force_authenticate(friend_graph["alice"])
+
+        response = api_client.get(
+            "/users/suggestions/", {"limit": 1}, format="json"
+        )
+
+        assert [user["username"] for user in response.data] == ["eve"]
+
+    def test_get_suggestions_query_count(
+        self,
+        api_client: APIClient,
+        friend_graph,
+        django_assert_num_queries,
+    ) -> None:
+        api_client.force_authenticate(friend_graph["alice"])
+        api_client.get("/users/suggestions/")
+
+        # only the suggested users, friend lists are cached
+        with django_assert_num_queries(1):
+            api_client.get("/users/suggestions/")
+
+
+@pytest.fixture
+def searched_users():
+    users = [
+        baker.make(
+            User, username="johnny", first_name="John", last_name="Doe"
+        ),
+        baker.make(User, username="jdoe", first_name="Jane", last_name="Doe"),
+        baker.make(User, username="mark", first_name="Johnathan"),
+        baker.make(User, username="alice", first_name="Alice"),
+        baker.make(User, username="john_old", is_active=False),
+    ]
+    yield users
+    del users
+
+
+@pytest.mark.django_db
+class TestSearchUser:
+    def test_search_users(self, api_client: APIClient, searched_users) -> None:
+        response = api_client.get(
+            "/users/search/", {"q": "john"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [user["username"] for user in response.data] == [
+            "johnny",
+            "mark",
+        ]
+        assert "email" not in response.data[0]
+
+    def test_search_users_with_limit(
+        self, api_client: APIClient, searched_users
+    ) -> None:
+        response = api_client.get(
+            "/users/search/", {"q": "doe", "limit": 1}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+    @pytest.mark.parametrize(
+        "query_params",
+        [{}, {"q": "john", "limit": 0}, {"q": "a", "limit": 51}],
+    )
+    def test_search_users_with_invalid_params(
+        self, api_client: APIClient, query_params
+    ) -> None:
+        response = api_client.get(
+            "/users/search/", query_params, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestAutocompleteUser:
+    def test_autocomplete_users(
+        self, api_client: APIClient, searched_users, django_assert_num_queries
+    ) -> None:
+        # builds the index
+        api_client.get("/users/autocomplete/", {"q": "j"}, format="json")
+
+        with django_assert_num_queries(0):
+            response = api_client.get(
+                "/users/autocomplete/", {"q": "Jo"}, format="json"
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [user["username"] for user in response.data] == [
+            "johnny",
+            "mark",
+        ]
+
+    def test_autocomplete_users_after_profile_change(
+        self, api_client: APIClient, searched_users
+    ) -> None:
+        api_client.get("/users/autocomplete/", {"q": "a"}, format="json")
+        alice = searched_users[3]
+        alice.last_name = "Johnson"
+        alice.save()
+
+        response = api_client.get(
+            "/users/autocomplete/", {"q": "johns"}, format="json"
+        )
+
+        assert [user["username"] for user in response.data] == ["alice"]
+
+    def test_autocomplete_users_while_index_is_rebuilt(
+        self, api_client: APIClient, searched_users, monkeypatch
+    ) -> None:
+        api_client.get("/users/autocomplete/", {"q": "a"}, format="json")
+        monkeypatch.setattr(prefix_index, "refresh", lambda: None)
+        alice = searched_users[3]
+        alice.last_name = "Johnson"
+        alice.save()
+
+        response = api_client.get(
+            "/users/autocomplete/", {"q": "johns"}, format="json"
+        )
+
+        # the previous index is served
+        assert response.data == []
+
+    def test_autocomplete_users_before_index_is_built(
+        self, api_client: APIClient, searched_users, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(prefix_index, "refresh", lambda: None)
+        monkeypatch.setattr(prefix_index, "index", None)
+
+        response = api_client.get(
+            "/users/autocomplete/", {"q": "Jo"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [user["username"] for user in response.data] == [
+            "johnny",
+            "mark",
+        ]
+
 
 @pytest.mark.django_db
 class TestRetrieveUser:
@@ -60,6 +417,50 @@ class TestRetrieveUser:
         assert response.status_code == status.HTTP_200_OK
         assert response.data.get("email") is not None
 
+    def test_get_cached_user_profile(
+        self, api_client: APIClient, django_assert_num_queries
+    ) -> None:
+        user = baker.make(User)
+        api_client.get(f"/users/{user.pk}/", format="json")
+
+        # validators only
+        with django_assert_num_queries(1):
+            response = api_client.get(f"/users/{user.pk}/", format="json")
+
+        assert response.data["username"] == user.username
+
+    def test_get_user_profile_after_changes(
+        self, api_client: APIClient
+    ) -> None:
+        user = baker.make(User)
+        friend = baker.make(User)
+        api_client.get(f"/users/{user.pk}/", format="json")
+
+        user.first_name = "changed"
+        user.save()
+        friend.friends.add(user)
+        response = api_client.get(f"/users/{user.pk}/", format="json")
+
+        assert response.data["first_name"] == "changed"
+        assert response.data["friends"] == [friend.pk]
+
+        friend.is_active = False
+        friend.save()
+        response = api_client.get(f"/users/{user.pk}/", format="json")
+
+        assert response.data["friends_count"] == 0
+
+    def test_get_own_profile_is_not_cached(
+        self, api_client: APIClient
+    ) -> None:
+        user = baker.make(User)
+        api_client.get(f"/users/{user.pk}/", format="json")
+        api_client.force_authenticate(user)
+
+        response = api_client.get(f"/users/{user.pk}/", format="json")
+
+        assert response.data["email"] == user.email
+
     def test_get_non_existing_user(self, api_client: APIClient) -> None:
 
         response = api_client.get("/users/1/", format="json")
@@ -67,6 +468,69 @@ class TestRetrieveUser:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestConditionalUser:
+    def test_get_not_modified_user_profile(
+        self, api_client: APIClient
+    ) -> None:
+        user = baker.make(User)
+        response = api_client.get(f"/users/{user.pk}/", format="json")
+
+        not_modified = api_client.get(
+            f"/users/{user.pk}/",
+            format="json",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_get_own_profile_with_anonymous_etag(
+        self, api_client: APIClient
+    ) -> None:
+        user = baker.make(User)
+        response = api_client.get(f"/users/{user.pk}/", format="json")
+        api_client.force_authenticate(user)
+
+        response = api_client.get(
+            f"/users/{user.pk}/",
+            format="json",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["email"] == user.email
+
+    def test_get_user_profile_after_friend_changes(
+        self, api_client: APIClient
+    ) -> None:
+        user = baker.make(User)
+        friend = baker.make(User)
+        user.friends.add(friend)
+        etags = [api_client.get(f"/users/{user.pk}/")["ETag"]]
+
+        friend.is_active = False
+        friend.save()
+        etags.append(api_client.get(f"/users/{user.pk}/")["ETag"])
+        friend.friends.remove(user)
+        response = api_client.get(
+            f"/users/{user.pk}/", HTTP_IF_NONE_MATCH=", ".join(etags)
+        )
+
+        assert len(set(etags)) == 2
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["friends"] == []
+
+    def test_get_not_modified_users(self, api_client: APIClient) -> None:
+        baker.make(User, _quantity=3)
+        response = api_client.get("/users/", format="json")
+
+        not_modified = api_client.get(
+            "/users/", format="json", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
 @pytest.mark.django_db
 class TestUpdateUser:
     def test_update_user_as_anonymous_user(
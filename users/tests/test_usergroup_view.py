@@ -3,6 +3,8 @@ from model_bakery import baker
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from core import permissions
+from core.permissions import PermissionContext
 from users.models import User, UserGroup
 
 
@@ -252,6 +254,32 @@ class TestCreateUserGroup:
         assert user in usergroup.members.all()
         assert usergroup.administrators.count() == 6
 
+    @pytest.mark.parametrize("quantity", [1, 50])
+    def test_create_usergroup_query_count_is_constant(
+        self,
+        api_client: APIClient,
+        usergroup_payload,
+        django_assert_max_num_queries,
+        quantity,
+    ) -> None:
+        user = baker.make(User)
+        api_client.force_authenticate(user)
+        members_ids = [
+            member.pk for member in baker.make(User, _quantity=quantity)
+        ]
+        usergroup_payload["members"] = members_ids
+        usergroup_payload["administrators"] = members_ids[:1]
+
+        with django_assert_max_num_queries(15):
+            response = api_client.post(
+                path=f"/users/{user.pk}/groups/",
+                data=usergroup_payload,
+                format="json",
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data["members"]) == quantity + 1
+
 
 @pytest.mark.django_db
 class TestRetrieveUserGroup:
@@ -439,6 +467,30 @@ class TestUpdateUserGroup:
         assert updated_usergroup.name == "updated_test"
         assert updated_usergroup.description == "updated_test"
 
+    def test_update_usergroup_with_not_existing_member(
+        self, api_client: APIClient, group_admin, usergroup
+    ) -> None:
+        api_client.force_authenticate(group_admin)
+
+        updated_payload = {
+            "name": "updated_test",
+            "description": "updated_test",
+            "members": [group_admin.pk, 9999],
+            "administrators": [group_admin.pk],
+        }
+        response = api_client.put(
+            f"/users/{group_admin.pk}/groups/{usergroup.pk}/",
+            data=updated_payload,
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["members"] == [
+            'Invalid pk "9999" - object does not exist.'
+        ]
+        usergroup.refresh_from_db()
+        assert usergroup.name != "updated_test"
+
     def test_update_other_users_usergroup(
         self, api_client: APIClient, group_admin, usergroup
     ) -> None:
@@ -497,6 +549,238 @@ class TestUpdateUserGroup:
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
+    def test_update_usergroup_after_losing_admin_rights(
+        self, api_client: APIClient, group_admin, usergroup
+    ) -> None:
+        api_client.force_authenticate(group_admin)
+        url = f"/users/{group_admin.pk}/groups/{usergroup.pk}/"
+        api_client.patch(url, data={"name": "updated_test"}, format="json")
+
+        usergroup.administrators.remove(group_admin)
+        response = api_client.patch(
+            url, data={"name": "updated_again"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_update_usergroup_after_administrators_cleared(
+        self, api_client: APIClient, group_admin, usergroup
+    ) -> None:
+        api_client.force_authenticate(group_admin)
+        url = f"/users/{group_admin.pk}/groups/{usergroup.pk}/"
+        api_client.patch(url, data={"name": "updated_test"}, format="json")
+
+        usergroup.administrators.clear()
+        response = api_client.patch(
+            url, data={"name": "updated_again"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_update_usergroup_after_becoming_admin(
+        self, api_client: APIClient, group_member, usergroup
+    ) -> None:
+        api_client.force_authenticate(group_member)
+        url = f"/users/{group_member.pk}/groups/{usergroup.pk}/"
+        api_client.patch(url, data={"name": "updated_test"}, format="json")
+
+        group_member.groups_admin.add(usergroup)
+        response = api_client.patch(
+            url, data={"name": "updated_test"}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestUserGroupPermissionContext:
+    def test_cleared_members_lose_memberships(
+        self, usergroup, group_member
+    ) -> None:
+        assert (
+            usergroup.pk in PermissionContext(group_member.pk).member_group_ids
+        )
+
+        usergroup.members.clear()
+
+        assert PermissionContext(group_member.pk).member_group_ids == set()
+
+    def test_cleared_memberships_of_user(self, usergroup, group_admin) -> None:
+        assert (
+            usergroup.pk in PermissionContext(group_admin.pk).admin_group_ids
+        )
+
+        group_admin.groups_member.clear()
+        group_admin.groups_admin.clear()
+
+        context = PermissionContext(group_admin.pk)
+        assert context.member_group_ids == context.admin_group_ids == set()
+
+    def test_memberships_changed_while_loading_are_not_cached(
+        self, monkeypatch, usergroup, group_member
+    ) -> None:
+        load_memberships = permissions.load_memberships
+
+        def load_memberships_before_change(user_id: int) -> dict:
+            memberships = load_memberships(user_id)
+            # another request removes the member before these are cached
+            usergroup.members.remove(group_member)
+            return memberships
+
+        monkeypatch.setattr(
+            permissions, "load_memberships", load_memberships_before_change
+        )
+        assert (
+            usergroup.pk in PermissionContext(group_member.pk).member_group_ids
+        )
+        monkeypatch.setattr(permissions, "load_memberships", load_memberships)
+
+        assert PermissionContext(group_member.pk).member_group_ids == set()
+
+    def test_memberships_not_cached_without_shared_cache(
+        self, settings, usergroup, group_admin
+    ) -> None:
+        settings.PERMISSION_CONTEXT_CACHE = None
+        assert (
+            usergroup.pk in PermissionContext(group_admin.pk).admin_group_ids
+        )
+
+        # as if removed by another process, without the signal handlers
+        UserGroup.administrators.through.objects.filter(
+            user_id=group_admin.pk
+        ).delete()
+
+        assert PermissionContext(group_admin.pk).admin_group_ids == set()
+
+
+@pytest.mark.django_db
+class TestUserGroupMembers:
+    def test_add_members(
+        self, api_client: APIClient, group_admin, usergroup
+    ) -> None:
+        api_client.force_authenticate(group_admin)
+        new_members = baker.make(User, _quantity=3)
+        not_active_user = baker.make(User, is_active=False)
+
+        response = api_client.post(
+            f"/users/{group_admin.pk}/groups/{usergroup.pk}/members/",
+            data={
+                "users": [user.pk for user in new_members]
+                + [not_active_user.pk]
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert usergroup.members.count() == 10
+        assert not usergroup.members.filter(pk=not_active_user.pk).exists()
+
+    def test_add_not_existing_members(
+        self, api_client: APIClient, group_admin, group_member, usergroup
+    ) -> None:
+        api_client.force_authenticate(group_admin)
+        usergroup.members.remove(group_member)
+
+        response = api_client.post(
+            f"/users/{group_admin.pk}/groups/{usergroup.pk}/members/",
+            data={"users": [group_member.pk, 9999]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "users" in response.data
+        assert not usergroup.members.filter(pk=group_member.pk).exists()
+
+    def test_remove_administrators(
+        self, api_client: APIClient, group_admin, group_member, usergroup
+    ) -> None:
+        usergroup.administrators.add(group_member)
+        api_client.force_authenticate(group_admin)
+
+        response = api_client.delete(
+            f"/users/{group_admin.pk}/groups/{usergroup.pk}/administrators/",
+            data={"users": [group_member.pk]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert list(usergroup.administrators.all()) == [group_admin]
+
+    def test_add_members_as_member(
+        self, api_client: APIClient, group_member, usergroup
+    ) -> None:
+        api_client.force_authenticate(group_member)
+
+        response = api_client.post(
+            f"/users/{group_member.pk}/groups/{usergroup.pk}/members/",
+            data={"users": [baker.make(User).pk]},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_add_members_with_empty_list(
+        self, api_client: APIClient, group_admin, usergroup
+    ) -> None:
+        api_client.force_authenticate(group_admin)
+
+        response = api_client.post(
+            f"/users/{group_admin.pk}/groups/{usergroup.pk}/members/",
+            data={"users": []},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestConditionalUserGroup:
+    def test_get_not_modified_usergroup(
+        self, api_client: APIClient, usergroup, group_member
+    ) -> None:
+        api_client.force_authenticate(group_member)
+        url = f"/users/{group_member.pk}/groups/{usergroup.pk}/"
+        response = api_client.get(url, format="json")
+
+        not_modified = api_client.get(
+            url, format="json", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_get_usergroup_after_membership_changes(
+        self, api_client: APIClient, usergroup, group_member
+    ) -> None:
+        api_client.force_authenticate(group_member)
+        url = f"/users/{group_member.pk}/groups/{usergroup.pk}/"
+        etags = [api_client.get(url)["ETag"]]
+
+        new_member = baker.make(User)
+        new_member.groups_member.add(usergroup)
+        etags.append(api_client.get(url)["ETag"])
+        new_member.is_active = False
+        new_member.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=", ".join(etags))
+
+        assert len(set(etags)) == 2
+        assert response.status_code == status.HTTP_200_OK
+        assert new_member.pk not in response.data["members"]
+
+    def test_get_usergroups_after_leaving_group(
+        self, api_client: APIClient, usergroup, group_member
+    ) -> None:
+        api_client.force_authenticate(group_member)
+        url = f"/users/{group_member.pk}/groups/"
+        response = api_client.get(url, format="json")
+
+        group_member.groups_member.clear()
+        response = api_client.get(
+            url, format="json", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 0
+
 
 @pytest.mark.django_db
 class TestDeleteUserGroup:
@@ -1,23 +1,100 @@
-from django.db.models import Prefetch
+from django.db.models import Count, Prefetch, Q
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema
-from rest_framework import status, viewsets
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from core.authentication import StatelessJWTAuthentication
+from core.views import (
+    CachedResponseMixin,
+    ConditionalResponseMixin,
+    DynamicFieldsViewMixin,
+)
+
+from .friends import (
+    get_first_friend_ids,
+    get_friend_ids,
+    get_mutual_friend_ids,
+    suggest_friend_ids,
+)
 from .models import User, UserGroup
-from .pagination import DefaultPagination
+from .pagination import DefaultPagination, UserPagination
 from .permissions import UserGroupPermission, UserOwnProfileOrReadOnly
-from .serializers import UserGroupSerializer, UserProfileSerializer
+from .search import autocomplete_users, prefix_index, search_users
+from .serializers import (
+    UserAutocompleteSerializer,
+    UserGroupMembershipSerializer,
+    UserGroupSerializer,
+    UserListSerializer,
+    UserProfileSerializer,
+    UserSearchSerializer,
+    UserSuggestionSerializer,
+    filter_active_user_ids,
+)
+
+search_parameters = [
+    OpenApiParameter("q", str, required=True),
+    OpenApiParameter("limit", int),
+]
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    ConditionalResponseMixin,
+    CachedResponseMixin,
+    DynamicFieldsViewMixin,
+    viewsets.ModelViewSet,
+):
     """
     GET (list): Retrieve a list of active users.
+        Note: Responses have an ETag, requests with a matching If-None-Match header are answered with 304.
+
+    Query Parameters:
+        - pagination: page, cursor (default: page)
+            Note: Cursor pagination orders users by the username and does not return the total count.
+        - fields: comma-separated names of the returned fields (default: all)
+        - expand: friends
+            Note: Listed profiles only include the number of friends, unless expanded with up to 50 ids of their friends.
 
     GET(retrieve): Retrieve a specific user's profile by their ID.
+        Note: Profiles of other users are cached until they change.
+        Note: Responses have an ETag and Last-Modified, requests with matching If-None-Match or
+            If-Modified-Since headers are answered with 304.
+
+    Query Parameters:
+        - fields: comma-separated names of the returned fields (default: all)
+
+    GET (friends): Retrieve a list of the user's active friends.
+
+    Query Parameters:
+        - fields, expand: same as in the list
+
+    GET (mutual_friends): Retrieve a list of the friends the current user and the specified user have in common.
+
+    Query Parameters:
+        - fields, expand: same as in the list
+
+    GET (suggestions): Retrieve the users who are friends of the current user's friends, from the most mutual friends.
+
+    Query Parameters:
+        - limit: number of returned users (default: 10, max: 50)
+
+    GET (search): Retrieve the active users most similar to the searched text, for type-ahead search.
+
+    Query Parameters:
+        - q: searched username, first name, last name or email
+        - limit: number of returned users (default: 10, max: 50)
+
+    GET (autocomplete): Retrieve the active users whose username, first or last name starts with the searched text.
+        Note: Users are looked up in an in-memory index, which may lag behind the latest profile changes up to a minute.
+
+    Query Parameters:
+        - q: searched prefix
+        - limit: number of returned users (default: 10, max: 50)
 
     PUT/PATCH: Update current user's profile. Users can only update their own profiles.
 
@@ -26,28 +103,168 @@ class UserViewSet(viewsets.ModelViewSet):
 
     http_method_names = ["get", "put", "patch", "delete", "options", "head"]
     permission_classes = [UserOwnProfileOrReadOnly]
-    pagination_class = DefaultPagination
-    serializer_class = UserProfileSerializer
+    pagination_class = UserPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     search_fields = ["first_name", "last_name", "email"]
     ordering_fields = ["first_name", "last_name"]
     queryset = User.objects.filter(is_active=True)
+    search_default_limit = 10
+    search_max_limit = 50
+    friends_expand_limit = 50
+    cached_actions = ("retrieve",)
+
+    @extend_schema(
+        parameters=search_parameters,
+        responses=UserSearchSerializer(many=True),
+    )
+    @action(detail=False, pagination_class=None)
+    def search(self, request: Request) -> Response:
+        text, limit = self.get_search_params(request)
+        users = search_users(self.get_queryset(), text, limit)
+        serializer = UserSearchSerializer(
+            users, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=search_parameters,
+        responses=UserAutocompleteSerializer(many=True),
+    )
+    @action(detail=False, pagination_class=None)
+    def autocomplete(self, request: Request) -> Response:
+        text, limit = self.get_search_params(request)
+        users = prefix_index.lookup(text, limit)
+        if users is None:
+            users = autocomplete_users(self.get_queryset(), text, limit)
+        return Response(users)
+
+    @action(detail=True)
+    def friends(self, request: Request, pk=None) -> Response:
+        user = self.get_object()
+        friend_ids = get_friend_ids([user.pk])[user.pk]
+        return self.list_users(friend_ids)
+
+    @action(detail=True, permission_classes=[IsAuthenticated])
+    def mutual_friends(self, request: Request, pk=None) -> Response:
+        user = self.get_object()
+        return self.list_users(get_mutual_friend_ids(request.user.pk, user.pk))
+
+    @extend_schema(
+        parameters=[OpenApiParameter("limit", int)],
+        responses=UserSuggestionSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        pagination_class=None,
+    )
+    def suggestions(self, request: Request) -> Response:
+        suggested = dict(
+            suggest_friend_ids(request.user.pk, self.get_limit(request))
+        )
+        users = self.get_queryset().filter(pk__in=suggested).in_bulk()
+        for user_id, user in users.items():
+            user.mutual_friends_count = suggested[user_id]
+        serializer = UserSuggestionSerializer(
+            [users[user_id] for user_id in suggested if user_id in users],
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return Response(serializer.data)
+
+    def list_users(self, user_ids: list[int]) -> Response:
+        queryset = self.filter_queryset(
+            self.get_queryset().filter(pk__in=user_ids)
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("search", "autocomplete", "suggestions"):
+            return queryset
+        queryset = self.prune_queryset(queryset)
+        if not self.is_field_requested("friends_count"):
+            return queryset
+        return queryset.annotate(
+            friends_count=Count("friends", filter=Q(friends__is_active=True))
+        )
+
+    def is_response_cacheable(self) -> bool:
+        # own profiles include the email
+        return super().is_response_cacheable() and (
+            str(self.request.user.pk) != self.kwargs["pk"]
+        )
+
+    def get_cache_namespaces(self) -> list[str]:
+        return [f"users:{self.kwargs['pk']}"]
+
+    def get_serializer_class(self):
+        if self.action in ("list", "friends", "mutual_friends"):
+            return UserListSerializer
+        return UserProfileSerializer
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.is_field_requested("friends"):
+            # a bounded number of ids of each user, in one query
+            friend_ids = get_first_friend_ids(
+                [user.pk for user in page], self.friends_expand_limit
+            )
+            for user in page:
+                user.expanded_friend_ids = friend_ids[user.pk]
+        return page
+
+    def perform_update(self, serializer) -> None:
+        super().perform_update(serializer)
+        user = serializer.instance
+        user.friends_count = user.friends.filter(is_active=True).count()
+
+    def get_search_params(self, request: Request) -> tuple[str, int]:
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": "This query parameter is required."})
+        return text, self.get_limit(request)
+
+    def get_limit(self, request: Request) -> int:
+        limit = serializers.IntegerField(
+            min_value=1, max_value=self.search_max_limit
+        )
+        try:
+            return limit.run_validation(
+                request.query_params.get("limit", self.search_default_limit)
+            )
+        except ValidationError as error:
+            raise ValidationError({"limit": error.detail})
 
 
 @extend_schema(tags=["user groups"])
-class UserGroupViewSet(viewsets.ModelViewSet):
+class UserGroupViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
     """
     GET (list): Retrieve a list of User Groups the current user is a member of, excluding deleted groups.
+        Note: Responses have an ETag, requests with a matching If-None-Match header are answered with 304.
 
     GET (retrieve): Retrieve a specific User Group by its ID, along with its members and administrators.
+        Note: Responses have an ETag and Last-Modified, requests with matching If-None-Match or
+            If-Modified-Since headers are answered with 304.
 
     POST (create): Create a new User Group. The current user will be automatically added as a member and administrator.
+        Note: Inactive and non-existing users are left out of the members and administrators.
 
     PUT/PATCH (update): Update the details of a User Group, such as its name or description. Only administrators can update a User Group.
+        Note: Inactive users are left out of the members and administrators, non-existing users are rejected.
 
     DELETE: Soft-delete a User Group, marking it as deleted. Only administrators can delete a User Group.
+
+    POST (members/administrators): Add the listed users to the members/administrators of a User Group at once.
+        Note: Inactive users are left out, non-existing users are rejected. Only administrators can add users.
+
+    DELETE (members/administrators): Remove the listed users from the members/administrators of a User Group at once.
+        Note: Only administrators can remove users.
     """
 
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticated, UserGroupPermission]
     pagination_class = DefaultPagination
     serializer_class = UserGroupSerializer
@@ -55,33 +272,50 @@ class UserGroupViewSet(viewsets.ModelViewSet):
     search_fields = ["name", "members__username"]
     ordering_fields = ["name"]
 
-    def create(self, request: Request, *args, **kwargs) -> Response:
-        members_ids = request.data["members"]
-        administrators_ids = request.data["administrators"]
-
-        active_members_ids = list(  # TODO
-            User.objects.filter(
-                id__in=members_ids, is_active=True
-            ).values_list("id", flat=True)
-        )
-        active_administrators_ids = list(
-            User.objects.filter(
-                id__in=administrators_ids, is_active=True
-            ).values_list("id", flat=True)
+    def perform_create(self, serializer: UserGroupSerializer) -> None:
+        user_id = self.request.user.pk
+        serializer.save(
+            administrators=[
+                *serializer.validated_data.get("administrators", []),
+                user_id,
+            ],
+            members=[*serializer.validated_data.get("members", []), user_id],
         )
 
-        active_members_ids.append(request.user.id)
-        active_administrators_ids.append(request.user.id)
-        request.data["members"] = active_members_ids
-        request.data["administrators"] = active_administrators_ids
+    @extend_schema(
+        request=UserGroupMembershipSerializer, responses={204: None}
+    )
+    @action(detail=True, methods=["post", "delete"])
+    def members(self, request: Request, user_pk=None, pk=None) -> Response:
+        return self.change_memberships(request, "members")
 
-        serializer = self.get_serializer(data=request.data)
+    @extend_schema(
+        request=UserGroupMembershipSerializer, responses={204: None}
+    )
+    @action(detail=True, methods=["post", "delete"])
+    def administrators(
+        self, request: Request, user_pk=None, pk=None
+    ) -> Response:
+        return self.change_memberships(request, "administrators")
+
+    def change_memberships(self, request: Request, relation: str) -> Response:
+        usergroup = self.get_object()
+        serializer = UserGroupMembershipSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        user_ids = serializer.validated_data["users"]
+        users = getattr(usergroup, relation)
+        # both insert or delete all the memberships with a single query
+        if request.method == "POST":
+            users.add(*filter_active_user_ids({"users": user_ids})["users"])
+        else:
+            users.remove(*user_ids)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-        self.perform_create(serializer)
-        headers = self.get_success_headers(serializer.data)
-        return Response(
-            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+    def get_validators_queryset(self):
+        return self.filter_queryset(
+            UserGroup.objects.filter(is_deleted=False).filter(
+                members=self.request.user
+            )
         )
 
     def get_queryset(self):